@@ -1,12 +1,16 @@
+import glob
 import logging
 import os
 
+import pandas as pd
+
 from src.cloud_export import upload_processed_to_gcs, load_tables_to_bigquery
 
 from src.config import (
     get_project_root,
     get_raw_data_path,
     get_processed_data_path,
+    get_cache_path,
     ENABLE_GCS_EXPORT,
     GCP_BUCKET_NAME,
     GCS_PREFIX,
@@ -16,36 +20,77 @@ from src.config import (
     BQ_DATASET_ID,
     BQ_TABLE_PREFIX,
     BQ_LOCATION,
+    ENABLE_PARTITIONED_FACTS,
+    ENABLE_RUN_CACHE,
 )
 
 from src.logging_utils import setup_logging
-from src.ingestion import load_fact_datasets, load_metadata_datasets
+from src.ingestion import (
+    load_fact_datasets,
+    load_metadata_datasets,
+    get_fact_input_files,
+    get_metadata_input_files,
+)
 from src.profiling import profile_fact_datasets, profile_metadata_datasets
 from src.preprocessing import (
     drop_unnamed_columns,
     reshape_facts_wide_to_long,
-    year_coverage_report,
-    select_common_year_range,
+    YearCoverageMatrix,
     filter_by_year_range,
 )
-from src.modeling import build_dim_country, build_dim_indicator, build_fact_table, save_processed_outputs
+from src.modeling import (
+    build_dim_country,
+    build_dim_indicator,
+    build_fact_table,
+    save_processed_outputs,
+    save_partitioned_fact_table,
+    build_rollup_table,
+    save_rollup_table,
+)
 from src.data_quality import validate_and_clean_dimensions, validate_and_clean_fact_table
+from src.run_manifest import RunManifest, compute_code_version, hash_files
 
 
-def main() -> None:
-    project_root = get_project_root()
-    log_file = setup_logging(project_root, keep_last=10)
-
-    raw_data_path = get_raw_data_path(project_root)
-    processed_path = get_processed_data_path(project_root)
-
-    # -------------------- 2) Ingestion --------------------
+def prepare_long_facts(raw_data_path: str) -> tuple[pd.DataFrame, pd.DataFrame, int, int]:
+    """
+    Ingestion, profiling and structural preprocessing of the fact datasets.
+    Returns the long-format GDP and unemployment frames restricted to the common year range.
+    """
+    # -------------------- 2) Ingestion + profiling --------------------
     logging.info("Starting data ingestion (raw CSV files)")
     gdp_df, uem_df = load_fact_datasets(raw_data_path)
-    gdp_country_meta_df, uem_country_meta_df, gdp_indicator_meta_df, uem_indicator_meta_df = load_metadata_datasets(raw_data_path)
-
-    # -------------------- 2) Profiling --------------------
     profile_fact_datasets(gdp_df, uem_df)
+
+    # -------------------- 3) Structural preprocessing --------------------
+    gdp_df = drop_unnamed_columns(gdp_df, "GDP facts dataset")
+    uem_df = drop_unnamed_columns(uem_df, "Unemployment facts dataset")
+
+    # Wide -> long
+    gdp_long_df = reshape_facts_wide_to_long(gdp_df, "GDP facts dataset")
+    uem_long_df = reshape_facts_wide_to_long(uem_df, "Unemployment facts dataset")
+
+    logging.info(f"GDP long dataset missing values: {int(gdp_long_df['value'].isnull().sum())}")
+    logging.info(f"Unemployment long dataset missing values: {int(uem_long_df['value'].isnull().sum())}")
+
+    # Coverage-based common year range (one pass over both indicators)
+    coverage_matrix = YearCoverageMatrix(pd.concat([gdp_long_df, uem_long_df], ignore_index=True))
+
+    start_year, end_year = coverage_matrix.select_common_year_range(min_coverage_ratio=0.80)
+
+    gdp_long_df = filter_by_year_range(gdp_long_df, start_year, end_year, "GDP facts dataset")
+    uem_long_df = filter_by_year_range(uem_long_df, start_year, end_year, "Unemployment facts dataset")
+
+    logging.info(f"Final common year range used in facts: {start_year}-{end_year}")
+    return gdp_long_df, uem_long_df, start_year, end_year
+
+
+def prepare_dimensions(raw_data_path: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Ingestion, profiling and preprocessing of the metadata files, then dimension building + DQ.
+    Returns (dim_country_clean, dim_indicator_clean).
+    """
+    # -------------------- 2) Ingestion + profiling --------------------
+    gdp_country_meta_df, uem_country_meta_df, gdp_indicator_meta_df, uem_indicator_meta_df = load_metadata_datasets(raw_data_path)
     profile_metadata_datasets(
         gdp_country_meta_df,
         uem_country_meta_df,
@@ -54,9 +99,6 @@ def main() -> None:
     )
 
     # -------------------- 3) Structural preprocessing --------------------
-    gdp_df = drop_unnamed_columns(gdp_df, "GDP facts dataset")
-    uem_df = drop_unnamed_columns(uem_df, "Unemployment facts dataset")
-
     gdp_country_meta_df = drop_unnamed_columns(gdp_country_meta_df, "GDP country metadata")
     uem_country_meta_df = drop_unnamed_columns(uem_country_meta_df, "Unemployment country metadata")
     gdp_indicator_meta_df = drop_unnamed_columns(gdp_indicator_meta_df, "GDP indicator metadata")
@@ -72,35 +114,28 @@ def main() -> None:
     else:
         logging.info("Country metadata files differ in shape or columns, content comparison skipped")
 
-    # Wide -> long
-    gdp_long_df = reshape_facts_wide_to_long(gdp_df, "GDP facts dataset")
-    uem_long_df = reshape_facts_wide_to_long(uem_df, "Unemployment facts dataset")
-
-    logging.info(f"GDP long dataset missing values: {int(gdp_long_df['value'].isnull().sum())}")
-    logging.info(f"Unemployment long dataset missing values: {int(uem_long_df['value'].isnull().sum())}")
-
-    # Coverage-based common year range
-    gdp_coverage_df = year_coverage_report(gdp_long_df, "GDP facts dataset")
-    uem_coverage_df = year_coverage_report(uem_long_df, "Unemployment facts dataset")
+    # -------------------- 4) Dimensional model + 3.2) DQ --------------------
+    dim_country = build_dim_country(gdp_country_meta_df)
+    dim_indicator = build_dim_indicator(gdp_indicator_meta_df, uem_indicator_meta_df)
 
-    start_year, end_year = select_common_year_range(gdp_coverage_df, uem_coverage_df, min_coverage_ratio=0.80)
+    return validate_and_clean_dimensions(dim_country, dim_indicator)
 
-    gdp_long_df = filter_by_year_range(gdp_long_df, start_year, end_year, "GDP facts dataset")
-    uem_long_df = filter_by_year_range(uem_long_df, start_year, end_year, "Unemployment facts dataset")
 
-    logging.info(f"Final common year range used in facts: {start_year}-{end_year}")
+def prepare_fact_table(
+    long_facts: tuple[pd.DataFrame, pd.DataFrame, int, int],
+    dimensions: tuple[pd.DataFrame, pd.DataFrame],
+) -> pd.DataFrame:
+    """
+    Fact table building + data cleaning and validation (DQ) against the clean dimensions.
+    """
+    gdp_long_df, uem_long_df, start_year, end_year = long_facts
+    dim_country_clean, dim_indicator_clean = dimensions
 
-    # -------------------- 4) Dimensional model --------------------
-    dim_country = build_dim_country(gdp_country_meta_df)
-    dim_indicator = build_dim_indicator(gdp_indicator_meta_df, uem_indicator_meta_df)
     fact_df = build_fact_table(gdp_long_df, uem_long_df)
 
-    # -------------------- 3.2) Data cleaning + validation (DQ) --------------------
     allowed_indicators = {"NY.GDP.PCAP.CD", "SL.UEM.TOTL.ZS"}
 
-    dim_country_clean, dim_indicator_clean = validate_and_clean_dimensions(dim_country, dim_indicator)
-
-    fact_clean = validate_and_clean_fact_table(
+    return validate_and_clean_fact_table(
         fact_df=fact_df,
         dim_country=dim_country_clean,
         dim_indicator=dim_indicator_clean,
@@ -109,11 +144,103 @@ def main() -> None:
         allowed_indicators=allowed_indicators,
     )
 
-    # -------------------- Save processed outputs --------------------
+
+def save_all_processed_outputs(
+    processed_path: str,
+    dim_country_clean: pd.DataFrame,
+    dim_indicator_clean: pd.DataFrame,
+    fact_clean: pd.DataFrame,
+    rollup_df: pd.DataFrame,
+) -> list[str]:
+    """
+    Write every processed output and return the list of files written.
+    """
     save_processed_outputs(processed_path, dim_country_clean, dim_indicator_clean, fact_clean)
     logging.info(f"Processed outputs saved in: {processed_path}")
 
+    written = [
+        os.path.join(processed_path, "dim_country.csv"),
+        os.path.join(processed_path, "dim_indicator.csv"),
+        os.path.join(processed_path, "fact_economic_indicators.csv"),
+        save_rollup_table(processed_path, rollup_df),
+    ]
+
+    if ENABLE_PARTITIONED_FACTS:
+        manifest_file = save_partitioned_fact_table(processed_path, fact_clean)
+        # Indicator codes contain dots, so "*.*" also matches partition directories: keep files only
+        partition_files = glob.glob(os.path.join(os.path.dirname(manifest_file), "**", "*.*"), recursive=True)
+        written += [path for path in partition_files if os.path.isfile(path)]
+    else:
+        logging.info("Partitioned fact output skipped (ENABLE_PARTITIONED_FACTS=False)")
+
+    return written
+
+
+def main() -> None:
+    project_root = get_project_root()
+    log_file = setup_logging(project_root, keep_last=10)
+
+    raw_data_path = get_raw_data_path(project_root)
+    processed_path = get_processed_data_path(project_root)
+
+    # -------------------- Run manifest (stage-level fingerprints) --------------------
+    # Each stage is keyed by the hashes of its raw inputs, the code version, the config values it uses
+    # and its upstream stages: unchanged stages are served from cached intermediates instead of being recomputed.
+    manifest = RunManifest(get_cache_path(project_root), compute_code_version(project_root), enabled=ENABLE_RUN_CACHE)
+
+    long_facts_key = manifest.stage_key("long_facts", hash_files(get_fact_input_files(raw_data_path), project_root))
+    dimensions_key = manifest.stage_key("dimensions", hash_files(get_metadata_input_files(raw_data_path), project_root))
+    facts_key = manifest.stage_key("facts", upstream=[long_facts_key, dimensions_key])
+    rollups_key = manifest.stage_key("rollups", upstream=[facts_key, dimensions_key])
+    outputs_key = manifest.stage_key(
+        "outputs",
+        upstream=[facts_key, dimensions_key, rollups_key],
+        config={"ENABLE_PARTITIONED_FACTS": ENABLE_PARTITIONED_FACTS},
+    )
+    export_key = manifest.stage_key(
+        "export",
+        upstream=[outputs_key],
+        config={
+            "ENABLE_GCS_EXPORT": ENABLE_GCS_EXPORT,
+            "GCP_BUCKET_NAME": GCP_BUCKET_NAME.strip(),
+            "GCS_PREFIX": GCS_PREFIX.strip(),
+            "INCLUDE_LOGS_IN_GCS": INCLUDE_LOGS_IN_GCS,
+            "ENABLE_BQ_EXPORT": ENABLE_BQ_EXPORT,
+            "BQ_PROJECT_ID": BQ_PROJECT_ID.strip(),
+            "BQ_DATASET_ID": BQ_DATASET_ID.strip(),
+            "BQ_TABLE_PREFIX": BQ_TABLE_PREFIX.strip(),
+            "BQ_LOCATION": BQ_LOCATION.strip(),
+        },
+    )
+
+    long_facts = manifest.run_stage("long_facts", long_facts_key, lambda: prepare_long_facts(raw_data_path))
+    dimensions = manifest.run_stage("dimensions", dimensions_key, lambda: prepare_dimensions(raw_data_path))
+    fact_clean = manifest.run_stage("facts", facts_key, lambda: prepare_fact_table(long_facts, dimensions))
+
+    dim_country_clean, dim_indicator_clean = dimensions
+
+    # Pre-aggregated rollups (year x indicator x region x income group) for dashboards
+    rollup_df = manifest.run_stage("rollups", rollups_key, lambda: build_rollup_table(fact_clean, dim_country_clean))
+
+    # -------------------- Save processed outputs --------------------
+    if manifest.outputs_unchanged("outputs", outputs_key):
+        logging.info(f"Processed outputs unchanged since last run, writing skipped: {processed_path}")
+    else:
+        written = save_all_processed_outputs(processed_path, dim_country_clean, dim_indicator_clean, fact_clean, rollup_df)
+        manifest.record_outputs("outputs", outputs_key, written, processed_path)
+
+    manifest.save()
+
     # ---------- Cloud export (GCS + BigQuery) ----------
+    if manifest.stage_completed("export", export_key):
+        logging.info("Cloud export skipped: the same processed outputs were already exported in a previous run")
+        manifest.save()
+        logging.info("Pipeline finished successfully")
+        logging.info(f"Log file saved at: {log_file}")
+        return
+
+    exported = False
+
     if ENABLE_GCS_EXPORT:
         if not GCP_BUCKET_NAME.strip():
             raise ValueError("ENABLE_GCS_EXPORT=True but GCP_BUCKET_NAME is empty")
@@ -127,6 +254,7 @@ def main() -> None:
             logs_dir=logs_dir,
         )
         logging.info(f"GCS export done. Uploaded files: {len(uploaded)}")
+        exported = True
     else:
         logging.info("GCS export skipped (ENABLE_GCS_EXPORT=False)")
 
@@ -141,12 +269,19 @@ def main() -> None:
             dim_country_df=dim_country_clean,
             dim_indicator_df=dim_indicator_clean,
             fact_df=fact_clean,
+            rollup_df=rollup_df,
             location=BQ_LOCATION.strip(),
         )
         logging.info("BigQuery export done.")
+        exported = True
     else:
         logging.info("BigQuery export skipped (ENABLE_BQ_EXPORT=False)")
 
+    # Only a real export is recorded: with both exports disabled there is nothing to skip next time
+    if exported:
+        manifest.record_stage("export", export_key)
+        manifest.save()
+
     logging.info("Pipeline finished successfully")
     logging.info(f"Log file saved at: {log_file}")
 
@@ -19,6 +19,7 @@ def upload_processed_to_gcs(
 
     Uploads:
     - data/processed/*.csv
+    - data/processed/<table>/** for partitioned tables (folders with a _manifest.json)
     - optionally logs/*.log
 
     Returns a list of GCS URIs uploaded.
@@ -48,6 +49,20 @@ def upload_processed_to_gcs(
         uploaded.append(uri)
         logging.info(f"Uploaded -> {uri}")
 
+    # Upload Hive-style partitioned tables (sub-folders containing a _manifest.json), keeping their layout
+    for manifest_path in sorted(glob.glob(os.path.join(processed_dir, "*", "_manifest.json"))):
+        table_dir = os.path.dirname(manifest_path)
+        part_paths = sorted(glob.glob(os.path.join(table_dir, "**", "*.*"), recursive=True))
+        logging.info(f"GCS export: uploading {len(part_paths)} files of partitioned table '{os.path.basename(table_dir)}'")
+        for local_path in part_paths:
+            relative_path = os.path.relpath(local_path, processed_dir).replace(os.sep, "/")
+            blob_path = f"{gcs_prefix}{relative_path}"
+            blob = bucket.blob(blob_path)
+            blob.upload_from_filename(local_path)
+            uri = f"gs://{bucket_name}/{blob_path}"
+            uploaded.append(uri)
+            logging.info(f"Uploaded -> {uri}")
+
     # Optional: upload logs
     if include_logs:
         if not logs_dir:
@@ -75,6 +90,7 @@ def load_tables_to_bigquery(
     dim_indicator_df,
     fact_df,
     location: str = "EU",
+    rollup_df=None,
 ) -> None:
     """
     Load the dimensional model into BigQuery (overwrite per run).
@@ -83,6 +99,7 @@ def load_tables_to_bigquery(
     - {table_prefix}_dim_country
     - {table_prefix}_dim_indicator
     - {table_prefix}_fact_economic_indicators
+    - {table_prefix}_rollup_economic_indicators (only if rollup_df is given)
     """
     if not project_id or not dataset_id:
         raise ValueError("project_id and dataset_id are required")
@@ -109,3 +126,5 @@ def load_tables_to_bigquery(
     _load_df(dim_country_df, f"{table_prefix}_dim_country")
     _load_df(dim_indicator_df, f"{table_prefix}_dim_indicator")
     _load_df(fact_df, f"{table_prefix}_fact_economic_indicators")
+    if rollup_df is not None:
+        _load_df(rollup_df, f"{table_prefix}_rollup_economic_indicators")
@@ -13,6 +13,19 @@ def get_processed_data_path(project_root: str) -> str:
     return os.path.join(project_root, "data", "processed")
 
 
+def get_cache_path(project_root: str) -> str:
+    return os.path.join(project_root, "data", "cache")
+
+
+# -------------------- Processed outputs config --------------------
+# Also write the fact table as a Hive-style partitioned dataset (indicator_code=.../year=...)
+ENABLE_PARTITIONED_FACTS = True
+
+# Skip stages whose inputs (raw file hashes + code/config version) are unchanged since the last run,
+# serving their results from data/cache (run_manifest.json + cached intermediates)
+ENABLE_RUN_CACHE = True
+
+
 # -------------------- Cloud export config --------------------
 # Default: disabled
 ENABLE_GCS_EXPORT = False
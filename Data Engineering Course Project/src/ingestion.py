@@ -3,6 +3,24 @@ import pandas as pd
 import logging
 
 
+def get_fact_input_files(raw_data_path: str) -> list[str]:
+    """Raw files read by load_fact_datasets (used to fingerprint the run)."""
+    return [
+        os.path.join(raw_data_path, "gdp_per_capita", "data_gdp.csv"),
+        os.path.join(raw_data_path, "unemployment_rate", "data_uem.csv"),
+    ]
+
+
+def get_metadata_input_files(raw_data_path: str) -> list[str]:
+    """Raw files read by load_metadata_datasets (used to fingerprint the run)."""
+    return [
+        os.path.join(raw_data_path, "gdp_per_capita", "metadata_country_gdp.csv"),
+        os.path.join(raw_data_path, "unemployment_rate", "metadata_country_uem.csv"),
+        os.path.join(raw_data_path, "gdp_per_capita", "metadata_indicator_gdp.csv"),
+        os.path.join(raw_data_path, "unemployment_rate", "metadata_indicator_uem.csv"),
+    ]
+
+
 def load_fact_datasets(raw_data_path: str) -> tuple[pd.DataFrame, pd.DataFrame]:
     #--------- Paths to raw data ----------
     GDP_FOLDER = os.path.join(raw_data_path, "gdp_per_capita")
@@ -0,0 +1,211 @@
+import os
+import time
+import sqlite3
+import logging
+from typing import Dict, Optional, Tuple
+import pandas as pd
+
+
+# Processed outputs registered as tables (table name -> CSV file in data/processed)
+LOCAL_TABLES = {
+    "dim_country": "dim_country.csv",
+    "dim_indicator": "dim_indicator.csv",
+    "fact_economic_indicators": "fact_economic_indicators.csv",
+}
+
+# Optional processed outputs, registered only if present (built by modeling.build_rollup_table)
+OPTIONAL_LOCAL_TABLES = {
+    "rollup_economic_indicators": "rollup_economic_indicators.csv",
+}
+
+# Indexes on the join / filter keys of the star schema
+LOCAL_INDEXES = [
+    'CREATE UNIQUE INDEX IF NOT EXISTS ix_dim_country_code ON dim_country ("Country Code")',
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_dim_indicator_code ON dim_indicator (indicator_code)",
+    "CREATE INDEX IF NOT EXISTS ix_fact_country ON fact_economic_indicators (country_code)",
+    "CREATE INDEX IF NOT EXISTS ix_fact_indicator_year ON fact_economic_indicators (indicator_code, year)",
+]
+
+# Same semantic layer as create_view.sql (BigQuery), in SQLite syntax
+ENRICHED_VIEW_SQL = """
+CREATE VIEW IF NOT EXISTS vw_fact_enriched AS
+SELECT
+  f.country_code,
+  c.TableName AS country_name,
+  c.Region AS region,
+  c.IncomeGroup AS income_group,
+  f.indicator_code,
+  i.indicator_name,
+  f.year,
+  f.value
+FROM fact_economic_indicators f
+LEFT JOIN dim_country c
+  ON f.country_code = c."Country Code"
+LEFT JOIN dim_indicator i
+  ON f.indicator_code = i.indicator_code
+"""
+
+# Rollup levels available in the local cache (level name -> column of vw_fact_enriched)
+ROLLUP_LEVELS = {
+    "region": "region",
+    "income_group": "income_group",
+}
+
+
+class LocalQueryLayer:
+    """
+    Embedded (SQLite) query layer over the processed star schema in data/processed.
+
+    Registers dim_country, dim_indicator and fact_economic_indicators, indexes the join keys,
+    exposes vw_fact_enriched and materializes rollups by region and income group
+    so dashboard-style queries can be answered offline without loading anything into BigQuery.
+
+    The rollups are read from rollup_economic_indicators (written by the pipeline) when it is present,
+    so both give the same numbers; otherwise they are aggregated from the fact table.
+    """
+
+    def __init__(self, processed_path: str, db_path: str = ":memory:"):
+        self.processed_path = processed_path
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self._rollup_cache: Dict[Tuple[str, Optional[str]], pd.DataFrame] = {}
+        self.rollup_source: Optional[str] = None
+
+        start = time.perf_counter()
+        self._register_tables()
+        self._create_rollups()
+        logging.info(f"Local query layer ready ({db_path}) in {time.perf_counter() - start:.3f}s")
+
+    def _register_tables(self) -> None:
+        for table_name, filename in LOCAL_TABLES.items():
+            file_path = os.path.join(self.processed_path, filename)
+            if not os.path.isfile(file_path):
+                raise FileNotFoundError(f"Processed file not found for {table_name}: {file_path}")
+
+            # keep_default_na=False: 'NA' is a valid country code (Namibia), only empty cells are missing
+            df = pd.read_csv(file_path, keep_default_na=False, na_values=[""])
+            df.to_sql(table_name, self.conn, if_exists="replace", index=False)
+            logging.info(f"Local query layer - registered {table_name}: {len(df)} rows")
+
+        for table_name, filename in OPTIONAL_LOCAL_TABLES.items():
+            file_path = os.path.join(self.processed_path, filename)
+            if os.path.isfile(file_path):
+                df = pd.read_csv(file_path, keep_default_na=False, na_values=[""])
+                df.to_sql(table_name, self.conn, if_exists="replace", index=False)
+                logging.info(f"Local query layer - registered {table_name}: {len(df)} rows")
+
+        for statement in LOCAL_INDEXES:
+            self.conn.execute(statement)
+        self.conn.execute("DROP VIEW IF EXISTS vw_fact_enriched")
+        self.conn.execute(ENRICHED_VIEW_SQL)
+        self.conn.commit()
+
+    def _has_table(self, table_name: str) -> bool:
+        row = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table_name,)
+        ).fetchone()
+        return row is not None
+
+    def _create_rollups(self) -> None:
+        """
+        Materialize rollup_<level> tables: one row per (year, indicator_code, level value).
+        They are taken from the materialized rollup_economic_indicators when it was registered, and
+        aggregated from the facts only when it is absent. In both cases only real countries (with
+        both Region and IncomeGroup) are counted: aggregate rows of the World Bank metadata (World,
+        income groups, regions) have neither.
+        """
+        from_materialized = self._has_table("rollup_economic_indicators")
+        self.rollup_source = "rollup_economic_indicators" if from_materialized else "fact_economic_indicators"
+
+        for level, column in ROLLUP_LEVELS.items():
+            table_name = f"rollup_{level}"
+            self.conn.execute(f"DROP TABLE IF EXISTS {table_name}")
+            if from_materialized:
+                self.conn.execute(
+                    f"""
+                    CREATE TABLE {table_name} AS
+                    SELECT
+                      year,
+                      indicator_code,
+                      {column},
+                      countries_with_value,
+                      mean_value,
+                      min_value,
+                      max_value
+                    FROM rollup_economic_indicators
+                    WHERE rollup_level = ?
+                    """,
+                    (level,),
+                )
+            else:
+                self.conn.execute(
+                    f"""
+                    CREATE TABLE {table_name} AS
+                    SELECT
+                      year,
+                      indicator_code,
+                      {column},
+                      COUNT(value) AS countries_with_value,
+                      AVG(value) AS mean_value,
+                      MIN(value) AS min_value,
+                      MAX(value) AS max_value
+                    FROM vw_fact_enriched
+                    WHERE region IS NOT NULL AND income_group IS NOT NULL
+                    GROUP BY year, indicator_code, {column}
+                    """
+                )
+            self.conn.execute(
+                f"CREATE INDEX IF NOT EXISTS ix_{table_name} ON {table_name} (indicator_code, {column}, year)"
+            )
+        self.conn.commit()
+        logging.info(f"Local query layer - rollups served from {self.rollup_source}")
+
+    def query(self, sql: str, params: tuple = ()) -> pd.DataFrame:
+        """Run an arbitrary SQL query against the local star schema."""
+        return pd.read_sql_query(sql, self.conn, params=params)
+
+    def enriched(
+        self,
+        indicator_code: Optional[str] = None,
+        year_min: Optional[int] = None,
+        year_max: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """Read vw_fact_enriched, optionally filtered by indicator and year range."""
+        conditions = []
+        params = []
+        if indicator_code is not None:
+            conditions.append("indicator_code = ?")
+            params.append(indicator_code)
+        if year_min is not None:
+            conditions.append("year >= ?")
+            params.append(year_min)
+        if year_max is not None:
+            conditions.append("year <= ?")
+            params.append(year_max)
+
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self.query(f"SELECT * FROM vw_fact_enriched{where}", tuple(params))
+
+    def rollup(self, level: str = "region", indicator_code: Optional[str] = None) -> pd.DataFrame:
+        """
+        Return the pre-aggregated rollup for a level ('region' or 'income_group').
+        Results are cached in memory per (level, indicator_code).
+        """
+        if level not in ROLLUP_LEVELS:
+            raise ValueError(f"Unknown rollup level: {level}. Expected one of {sorted(ROLLUP_LEVELS)}")
+
+        cache_key = (level, indicator_code)
+        if cache_key not in self._rollup_cache:
+            sql = f"SELECT * FROM rollup_{level}"
+            params: tuple = ()
+            if indicator_code is not None:
+                sql += " WHERE indicator_code = ?"
+                params = (indicator_code,)
+            sql += f" ORDER BY indicator_code, {ROLLUP_LEVELS[level]}, year"
+            self._rollup_cache[cache_key] = self.query(sql, params)
+
+        return self._rollup_cache[cache_key]
+
+    def close(self) -> None:
+        self._rollup_cache.clear()
+        self.conn.close()
@@ -1,5 +1,10 @@
 import os
+import glob
+import json
 import logging
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List
 import pandas as pd
 
 
@@ -79,8 +84,8 @@ def build_fact_table(gdp_long_df: pd.DataFrame, uem_long_df: pd.DataFrame) -> pd
         }
     )
 
-    # Optional sorting for readability
-    fact_df = fact_df.sort_values(["country_code", "indicator_code", "year"]).reset_index(drop=True)
+    # No global sort here: the flat CSV is sorted when it is written (save_processed_outputs)
+    # and each partition is sorted on its own (save_partitioned_fact_table).
 
     logging.info(f"fact_economic_indicators shape: {fact_df.shape}")
     logging.info(f"fact_economic_indicators missing values in 'value': {int(fact_df['value'].isnull().sum())}")
@@ -89,6 +94,103 @@ def build_fact_table(gdp_long_df: pd.DataFrame, uem_long_df: pd.DataFrame) -> pd
     return fact_df
 
 
+# Marker used in rollup rows that aggregate over a whole dimension (e.g. all regions)
+ROLLUP_ALL = "All"
+
+# Rollup levels: grouping keys on top of (year, indicator_code)
+ROLLUP_LEVELS = {
+    "region_income_group": ["region", "income_group"],
+    "region": ["region"],
+    "income_group": ["income_group"],
+    "global": [],
+}
+
+
+def build_rollup_table(fact_df: pd.DataFrame, dim_country: pd.DataFrame) -> pd.DataFrame:
+    """
+    Pre-aggregate the fact table by year, indicator, region and income group, so dashboards
+    can read a small table instead of joining and scanning the full fact table.
+
+    The finest level (region x income group) is aggregated once from the facts; the region,
+    income group and global levels are derived from it using mergeable statistics
+    (counts, sums, sums of squares, min/max), so no extra pass over the facts is needed.
+
+    Output columns: rollup_level, year, indicator_code, region, income_group, countries,
+    countries_with_value, sum_value, sum_sq_value, mean_value, std_value, min_value, max_value
+    """
+    logging.info("Building rollup_economic_indicators")
+
+    required_cols = {"country_code", "year", "indicator_code", "value"}
+    missing = required_cols - set(fact_df.columns)
+    if missing:
+        raise ValueError(f"fact_economic_indicators is missing required columns: {sorted(missing)}")
+
+    country_attrs = dim_country[["Country Code", "Region", "IncomeGroup"]].rename(
+        columns={"Country Code": "country_code", "Region": "region", "IncomeGroup": "income_group"}
+    )
+    df = fact_df[["country_code", "year", "indicator_code", "value"]].merge(country_attrs, on="country_code", how="inner")
+
+    # Aggregates (World, regions, income groups) have no Region / IncomeGroup in the metadata:
+    # keep only real countries so they are not double counted
+    df = df.dropna(subset=["region", "income_group"])
+    df["value_sq"] = df["value"] ** 2
+
+    agg_spec = {
+        "countries": ("value", "size"),
+        "countries_with_value": ("value", "count"),
+        "sum_value": ("value", "sum"),
+        "sum_sq_value": ("value_sq", "sum"),
+        "min_value": ("value", "min"),
+        "max_value": ("value", "max"),
+    }
+
+    base_keys = ["year", "indicator_code"]
+    finest = df.groupby(base_keys + ROLLUP_LEVELS["region_income_group"]).agg(**agg_spec).reset_index()
+
+    # Derive coarser levels from the finest one (sums of sums, min of mins, max of maxes)
+    merge_spec = {col: ("min" if col == "min_value" else "max" if col == "max_value" else "sum") for col in agg_spec}
+
+    levels = []
+    for level, keys in ROLLUP_LEVELS.items():
+        if level == "region_income_group":
+            level_df = finest.copy()
+        else:
+            level_df = finest.groupby(base_keys + keys).agg(merge_spec).reset_index()
+            for col in set(ROLLUP_LEVELS["region_income_group"]) - set(keys):
+                level_df[col] = ROLLUP_ALL
+        level_df["rollup_level"] = level
+        levels.append(level_df)
+
+    rollup_df = pd.concat(levels, ignore_index=True)
+
+    n = rollup_df["countries_with_value"].where(rollup_df["countries_with_value"] > 0)
+    rollup_df["mean_value"] = rollup_df["sum_value"] / n
+    # Population standard deviation from mergeable sums (clipped at 0 against rounding noise)
+    variance = (rollup_df["sum_sq_value"] / n - rollup_df["mean_value"] ** 2).clip(lower=0)
+    rollup_df["std_value"] = np.sqrt(variance)
+
+    leading_cols = ["rollup_level", "year", "indicator_code", "region", "income_group"]
+    stat_cols = ["countries", "countries_with_value", "sum_value", "sum_sq_value",
+                 "mean_value", "std_value", "min_value", "max_value"]
+
+    rollup_df = rollup_df[leading_cols + stat_cols].sort_values(leading_cols).reset_index(drop=True)
+
+    logging.info(f"rollup_economic_indicators shape: {rollup_df.shape}")
+    logging.info(f"rollup_economic_indicators rows per level:\n{rollup_df['rollup_level'].value_counts().to_string()}")
+    return rollup_df
+
+
+def save_rollup_table(processed_path: str, rollup_df: pd.DataFrame) -> str:
+    """
+    Save the rollup table next to the other processed outputs (data/processed).
+    """
+    os.makedirs(processed_path, exist_ok=True)
+    rollup_file = os.path.join(processed_path, "rollup_economic_indicators.csv")
+    rollup_df.to_csv(rollup_file, index=False)
+    logging.info(f"Saved rollup_economic_indicators to: {rollup_file}")
+    return rollup_file
+
+
 def save_processed_outputs(
     processed_path: str,
     dim_country: pd.DataFrame,
@@ -108,8 +210,142 @@ def save_processed_outputs(
 
     dim_country.to_csv(dim_country_file, index=False)
     dim_indicator.to_csv(dim_indicator_file, index=False)
-    fact_df.to_csv(fact_file, index=False)
+    # Same row order as before partitioning: country, indicator, year
+    fact_df.sort_values(["country_code", "indicator_code", "year"]).to_csv(fact_file, index=False)
 
     logging.info(f"Saved dim_country to: {dim_country_file}")
     logging.info(f"Saved dim_indicator to: {dim_indicator_file}")
     logging.info(f"Saved fact_economic_indicators to: {fact_file}")
+
+
+def _write_fact_partition(partition_df: pd.DataFrame, partition_dir: str) -> dict:
+    """
+    Sort a single (indicator_code, year) partition by country_code and write it as CSV.
+    Returns the manifest entry for the partition.
+    """
+    os.makedirs(partition_dir, exist_ok=True)
+    part_file = os.path.join(partition_dir, "part-00000.csv")
+
+    # Partition columns are encoded in the directory names (Hive-style), so they are not repeated in the file
+    partition_df = partition_df.sort_values("country_code", kind="stable")
+    partition_df[["country_code", "value"]].to_csv(part_file, index=False)
+
+    values = partition_df["value"]
+    return {
+        "path": part_file,
+        "rows": int(len(partition_df)),
+        "null_values": int(values.isnull().sum()),
+        "min_value": None if values.isnull().all() else float(values.min()),
+        "max_value": None if values.isnull().all() else float(values.max()),
+    }
+
+
+def save_partitioned_fact_table(
+    processed_path: str,
+    fact_df: pd.DataFrame,
+    table_name: str = "fact_economic_indicators",
+    max_workers: Optional[int] = None,
+) -> str:
+    """
+    Save the fact table as a Hive-style partitioned dataset:
+        data/processed/<table_name>/indicator_code=<code>/year=<year>/part-00000.csv
+
+    Each partition is sorted by country_code independently (partitions are written in parallel).
+    A small _manifest.json is written at the table root so consumers can prune partitions
+    by indicator or year range without listing the directory tree.
+
+    Returns the path of the manifest file.
+    """
+    required_cols = {"country_code", "year", "indicator_code", "value"}
+    missing = required_cols - set(fact_df.columns)
+    if missing:
+        raise ValueError(f"{table_name} is missing required columns: {sorted(missing)}")
+
+    table_dir = os.path.join(processed_path, table_name)
+    logging.info(f"Saving partitioned {table_name} into: {table_dir}")
+
+    # Remove stale partition files from previous runs (e.g. a year that is no longer in range).
+    # Only files written by this function are deleted; anything else under table_dir is kept.
+    stale_files = glob.glob(os.path.join(glob.escape(table_dir), "indicator_code=*", "year=*", "part-*.csv"))
+    stale_files.append(os.path.join(table_dir, "_manifest.json"))
+    for stale_file in stale_files:
+        if os.path.isfile(stale_file):
+            os.remove(stale_file)
+    # Partition directories left empty are removed as well (year first, then indicator)
+    for pattern in (("indicator_code=*", "year=*"), ("indicator_code=*",)):
+        for partition_dir in glob.glob(os.path.join(glob.escape(table_dir), *pattern)):
+            if os.path.isdir(partition_dir) and not os.listdir(partition_dir):
+                os.rmdir(partition_dir)
+    os.makedirs(table_dir, exist_ok=True)
+
+    tasks = []
+    for (indicator_code, year), partition_df in fact_df.groupby(["indicator_code", "year"], sort=True):
+        partition_dir = os.path.join(table_dir, f"indicator_code={indicator_code}", f"year={int(year)}")
+        tasks.append(((str(indicator_code), int(year)), partition_df, partition_dir))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_write_fact_partition, df, part_dir) for _, df, part_dir in tasks]
+        entries = [future.result() for future in futures]
+
+    partitions: List[dict] = []
+    for ((indicator_code, year), _, _), entry in zip(tasks, entries):
+        entry["path"] = os.path.relpath(entry["path"], table_dir).replace(os.sep, "/")
+        partitions.append({"indicator_code": indicator_code, "year": year, **entry})
+
+    manifest = {
+        "table": table_name,
+        "format": "csv",
+        "partition_columns": ["indicator_code", "year"],
+        "columns": ["country_code", "value"],
+        "total_rows": int(sum(p["rows"] for p in partitions)),
+        "indicators": sorted({p["indicator_code"] for p in partitions}),
+        "year_min": min((p["year"] for p in partitions), default=None),
+        "year_max": max((p["year"] for p in partitions), default=None),
+        "partitions": partitions,
+    }
+
+    manifest_file = os.path.join(table_dir, "_manifest.json")
+    with open(manifest_file, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    logging.info(f"Saved {len(partitions)} partitions ({manifest['total_rows']} rows) for {table_name}")
+    logging.info(f"Partition manifest: {manifest_file}")
+    return manifest_file
+
+
+def load_partitioned_fact_table(
+    processed_path: str,
+    table_name: str = "fact_economic_indicators",
+    indicators: Optional[List[str]] = None,
+    year_min: Optional[int] = None,
+    year_max: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Read a partitioned fact table back into the flat (country_code, year, indicator_code, value) layout,
+    reading only the partitions that match the indicator / year filters (partition pruning via the manifest).
+    """
+    table_dir = os.path.join(processed_path, table_name)
+    manifest_file = os.path.join(table_dir, "_manifest.json")
+
+    with open(manifest_file, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    selected = [
+        p for p in manifest["partitions"]
+        if (indicators is None or p["indicator_code"] in indicators)
+        and (year_min is None or p["year"] >= year_min)
+        and (year_max is None or p["year"] <= year_max)
+    ]
+    logging.info(f"{table_name} - reading {len(selected)} of {len(manifest['partitions'])} partitions")
+
+    frames = []
+    for p in selected:
+        part_df = pd.read_csv(os.path.join(table_dir, p["path"]), keep_default_na=False, na_values=[""])
+        part_df["year"] = p["year"]
+        part_df["indicator_code"] = p["indicator_code"]
+        frames.append(part_df)
+
+    columns = ["country_code", "year", "indicator_code", "value"]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(frames, ignore_index=True)[columns]
@@ -1,4 +1,5 @@
 import logging
+from typing import Dict, Iterable, Optional, Tuple
 import pandas as pd
 
 
@@ -72,7 +73,7 @@ def year_coverage_report(long_df: pd.DataFrame, dataset_name: str) -> pd.DataFra
         long_df.groupby("year")
         .agg(
             total_countries=("Country Code", "nunique"),
-            non_null_values=("value", lambda s: int(s.notnull().sum()))
+            non_null_values=("value", "count")
         )
         .reset_index()
     )
@@ -110,6 +111,90 @@ def select_common_year_range(
     return start_year, end_year
 
 
+class YearCoverageMatrix:
+    """
+    Year x indicator coverage matrix built in a single vectorized pass over a combined long table.
+
+    coverage.loc[year, indicator_code] = non-null values / distinct countries for that year and indicator
+    (the same ratio as year_coverage_report, for every indicator at once).
+    The matrix is computed once and reused for any subset of indicators and any threshold;
+    selected ranges are cached per (indicators, threshold).
+    """
+
+    def __init__(self, long_df: pd.DataFrame, dataset_name: str = "Combined facts dataset"):
+        required_cols = ["Country Code", "Indicator Code", "year", "value"]
+        missing = [c for c in required_cols if c not in long_df.columns]
+        if missing:
+            raise ValueError(f"{dataset_name} is missing required columns: {missing}")
+
+        logging.info(f"{dataset_name} - computing year x indicator coverage matrix")
+
+        counts = long_df.groupby(["year", "Indicator Code"]).agg(
+            total_countries=("Country Code", "nunique"),
+            non_null_values=("value", "count"),
+        )
+
+        self.dataset_name = dataset_name
+        self.total_countries = counts["total_countries"].unstack("Indicator Code", fill_value=0)
+        self.non_null_values = counts["non_null_values"].unstack("Indicator Code", fill_value=0)
+        # Years missing for an indicator get 0 coverage instead of NaN
+        self.coverage = (self.non_null_values / self.total_countries.where(self.total_countries > 0)).fillna(0.0)
+        self._range_cache: Dict[Tuple[Tuple[str, ...], float], Tuple[int, int]] = {}
+
+        logging.info(f"{dataset_name} - coverage matrix shape (years x indicators): {self.coverage.shape}")
+        logging.info(f"{dataset_name} - coverage sample:\n{self.coverage.head(10).to_string()}")
+
+    @property
+    def indicators(self) -> list:
+        return list(self.coverage.columns)
+
+    def report(self, indicator_code: str) -> pd.DataFrame:
+        """Return the per-year coverage report of one indicator (same layout as year_coverage_report)."""
+        if indicator_code not in self.coverage.columns:
+            raise ValueError(f"{self.dataset_name} has no coverage for indicator: {indicator_code}")
+
+        return pd.DataFrame(
+            {
+                "year": self.coverage.index,
+                "total_countries": self.total_countries[indicator_code].to_numpy(),
+                "non_null_values": self.non_null_values[indicator_code].to_numpy(),
+                "coverage_ratio": self.coverage[indicator_code].to_numpy(),
+            }
+        )
+
+    def select_common_year_range(
+        self,
+        indicators: Optional[Iterable[str]] = None,
+        min_coverage_ratio: float = 0.80
+    ) -> tuple[int, int]:
+        """
+        Select the common year range where ALL given indicators (default: all of them)
+        have at least min_coverage_ratio. Same rule as select_common_year_range.
+        Returns (start_year, end_year). Raises an error if no overlap is found.
+        """
+        selected = tuple(sorted(indicators)) if indicators is not None else tuple(sorted(self.indicators))
+        cache_key = (selected, float(min_coverage_ratio))
+        if cache_key in self._range_cache:
+            return self._range_cache[cache_key]
+
+        unknown = [c for c in selected if c not in self.coverage.columns]
+        if unknown or not selected:
+            raise ValueError(f"{self.dataset_name} - unknown or empty indicator selection: {unknown or selected}")
+
+        logging.info(f"Selecting common year range for {list(selected)} with min coverage ratio = {min_coverage_ratio}")
+
+        good_years_mask = (self.coverage[list(selected)] >= min_coverage_ratio).all(axis=1)
+        common_years = self.coverage.index[good_years_mask]
+        if len(common_years) == 0:
+            raise ValueError("No common years found with the selected coverage threshold.")
+
+        start_year, end_year = int(common_years.min()), int(common_years.max())
+        self._range_cache[cache_key] = (start_year, end_year)
+
+        logging.info(f"Common year range selected: {start_year} to {end_year}")
+        return start_year, end_year
+
+
 def filter_by_year_range(long_df: pd.DataFrame, start_year: int, end_year: int, dataset_name: str) -> pd.DataFrame:
     """
     Filter a long-format dataset to a given inclusive year range.
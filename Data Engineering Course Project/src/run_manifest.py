@@ -0,0 +1,186 @@
+import os
+import glob
+import json
+import pickle
+import hashlib
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List
+
+
+MANIFEST_FILENAME = "run_manifest.json"
+
+
+def hash_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Return the SHA-256 hex digest of a file (read in chunks)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_files(paths: Iterable[str], base_dir: str) -> Dict[str, str]:
+    """Hash several files; keys are paths relative to base_dir (stable across machines)."""
+    return {
+        os.path.relpath(path, base_dir).replace(os.sep, "/"): hash_file(path)
+        for path in sorted(paths)
+    }
+
+
+def compute_code_version(project_root: str) -> str:
+    """
+    Fingerprint of the pipeline code (main.py + src/*.py, except config.py).
+    Any code change invalidates every cached stage; config values are part of the key of
+    the stages that use them instead (see RunManifest.stage_key), so toggling a flag only
+    invalidates those stages.
+    """
+    code_files = [os.path.join(project_root, "main.py")] + sorted(
+        path for path in glob.glob(os.path.join(project_root, "src", "*.py")) if os.path.basename(path) != "config.py"
+    )
+    digest = hashlib.sha256()
+    for relative_path, file_hash in hash_files(code_files, project_root).items():
+        digest.update(f"{relative_path}:{file_hash}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class RunManifest:
+    """
+    Run manifest stored in <cache_dir>/run_manifest.json.
+
+    Every stage gets a key derived from the code version, the hashes of its raw inputs, the config
+    values it depends on and the keys of its upstream stages. If a stage key matches the previous run, its result is served from the
+    cached intermediate (pickle) instead of being recomputed; output-writing stages record the
+    hashes of the files they produced so they can be skipped when those files are still in place.
+    """
+
+    def __init__(self, cache_dir: str, code_version: str, enabled: bool = True):
+        self.cache_dir = cache_dir
+        self.code_version = code_version
+        self.enabled = enabled
+        self.manifest_file = os.path.join(cache_dir, MANIFEST_FILENAME)
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self.previous = self._load()
+        self.current: Dict[str, Any] = {"code_version": code_version, "inputs": {}, "stages": {}}
+
+        if self.previous.get("code_version") not in (None, code_version):
+            logging.info("Run manifest - code version changed since last run, cached stages are invalidated")
+
+    def _load(self) -> dict:
+        if not os.path.isfile(self.manifest_file):
+            return {}
+        try:
+            with open(self.manifest_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            # A broken manifest only means a full run, never a failed one
+            logging.warning(f"Run manifest - could not read {self.manifest_file}, ignoring it: {e}")
+            return {}
+
+    def save(self) -> None:
+        self.current["updated_at"] = datetime.now().isoformat(timespec="seconds")
+        with open(self.manifest_file, "w", encoding="utf-8") as f:
+            json.dump(self.current, f, indent=2)
+        logging.info(f"Run manifest saved: {self.manifest_file}")
+
+    def stage_key(
+        self,
+        stage: str,
+        inputs: Dict[str, str] = None,
+        upstream: Iterable[str] = (),
+        config: Dict[str, Any] = None,
+    ) -> str:
+        """
+        Compute the key of a stage from its input hashes, the config values it uses
+        (name -> value, e.g. {"ENABLE_PARTITIONED_FACTS": True}) and its upstream stage keys.
+        """
+        inputs = inputs or {}
+        config = config or {}
+        self.current["inputs"].update(inputs)
+
+        digest = hashlib.sha256()
+        digest.update(f"stage:{stage}\ncode:{self.code_version}\n".encode("utf-8"))
+        for name, file_hash in sorted(inputs.items()):
+            digest.update(f"input:{name}:{file_hash}\n".encode("utf-8"))
+        for name, value in sorted(config.items()):
+            digest.update(f"config:{name}:{json.dumps(value)}\n".encode("utf-8"))
+        for upstream_key in upstream:
+            digest.update(f"upstream:{upstream_key}\n".encode("utf-8"))
+        return digest.hexdigest()
+
+    def _previous_stage(self, stage: str, key: str) -> dict:
+        entry = self.previous.get("stages", {}).get(stage, {})
+        return entry if self.enabled and entry.get("key") == key else {}
+
+    def run_stage(self, stage: str, key: str, fn: Callable[[], Any]) -> Any:
+        """
+        Return the result of fn() for this stage, served from the cached intermediate when the
+        stage key is unchanged and the cache file is intact; otherwise run fn() and cache it.
+        """
+        cache_file = os.path.join(self.cache_dir, f"{stage}.pkl")
+        entry = self._previous_stage(stage, key)
+
+        if entry and os.path.isfile(cache_file) and hash_file(cache_file) == entry.get("cache_hash"):
+            logging.info(f"Stage '{stage}' unchanged -> served from cache ({cache_file})")
+            with open(cache_file, "rb") as f:
+                result = pickle.load(f)
+            self.current["stages"][stage] = entry
+            return result
+
+        logging.info(f"Stage '{stage}' -> running")
+        result = fn()
+
+        with open(cache_file, "wb") as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        self.current["stages"][stage] = {
+            "key": key,
+            "cache_file": os.path.basename(cache_file),
+            "cache_hash": hash_file(cache_file),
+            "finished_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        return result
+
+    def outputs_unchanged(self, stage: str, key: str) -> bool:
+        """
+        True if the stage ran with the same key in the previous run and all the output files
+        it recorded still exist with the same content (so writing them again can be skipped).
+        """
+        entry = self._previous_stage(stage, key)
+        outputs = entry.get("outputs")
+        if not outputs:
+            return False
+
+        base_dir = entry.get("base_dir", "")
+        for relative_path, file_hash in outputs.items():
+            path = os.path.join(base_dir, relative_path)
+            if not os.path.isfile(path) or hash_file(path) != file_hash:
+                logging.info(f"Stage '{stage}' output changed or missing: {path}")
+                return False
+
+        self.current["stages"][stage] = entry
+        return True
+
+    def record_outputs(self, stage: str, key: str, output_paths: List[str], base_dir: str) -> None:
+        """Record the hashes of the files written by an output stage."""
+        self.current["stages"][stage] = {
+            "key": key,
+            "base_dir": base_dir,
+            "outputs": hash_files(output_paths, base_dir),
+            "finished_at": datetime.now().isoformat(timespec="seconds"),
+        }
+
+    def record_stage(self, stage: str, key: str) -> None:
+        """Record a stage without outputs (e.g. a cloud export) as completed with this key."""
+        self.current["stages"][stage] = {
+            "key": key,
+            "finished_at": datetime.now().isoformat(timespec="seconds"),
+        }
+
+    def stage_completed(self, stage: str, key: str) -> bool:
+        """True if the stage completed with the same key in the previous run."""
+        entry = self._previous_stage(stage, key)
+        if entry:
+            self.current["stages"][stage] = entry
+        return bool(entry)
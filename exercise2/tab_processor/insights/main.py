@@ -3,9 +3,12 @@ from pathlib import Path
 import datetime
 import re
 from collections import defaultdict, Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import click
 import nltk
 from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
+from nltk.tag import PerceptronTagger
 import json
 nltk.download('punkt_tab')
 nltk.download('averaged_perceptron_tagger_eng')
@@ -29,7 +32,9 @@ nltk.download('averaged_perceptron_tagger_eng')
 # 6. Normalización (Lematización): Las palabras se reducen a su forma raíz. Por ejemplo,
 #    "amando" y "amé" se convierten en "amar" para que se cuenten como una sola palabra.
 #
-# 7. Conteo (Reduce): Se cuentan las ocurrencias de cada palabra clave final.
+# 7. Conteo (Reduce): Se cuentan las ocurrencias de cada palabra clave final. Con --workers > 1
+#    cada artista se procesa en un proceso del pool y sus contadores se fusionan en el orden de
+#    los artistas, así que el resultado es el mismo que en serie.
 #
 # 8. Resultados: Se generan los top 10 por artista y el top 20 global, guardados en JSON.
 #
@@ -47,6 +52,11 @@ TARGET_POS_TAGS = ['NN', 'NNS', 'NNP', 'NNPS',  # Nouns
                    'VB', 'VBD', 'VBG', 'VBN', 'VBP', 'VBZ',  # Verbs
                    'JJ', 'JJR', 'JJS']  # Adjectives
 
+# Recursos de NLTK de cada proceso (ver init_worker)
+_WORKER_STOPWORDS = None
+_WORKER_LEMMATIZER = None
+_WORKER_TAGGER = None
+
 # --- Logging Setup ---
 LOGS_DIRECTORY.mkdir(exist_ok=True)
 log.basicConfig(
@@ -86,9 +96,14 @@ def setup_nltk():
     
     return global_stopwords
 
-def process_lyrics(text: str, stopwords_set: set) -> list[str]:
+def process_lyrics(text: str, stopwords_set: set, lemmatizer=None, tagger=None) -> list[str]:
     """
     Tokeniza, filtra por POS Tag y lematiza el texto para generar una lista de palabras clave.
+    Args:
+        text (str): Letras del artista.
+        stopwords_set (set): Palabras que se descartan.
+        lemmatizer (WordNetLemmatizer, optional): Lematizador reutilizado entre llamadas.
+        tagger (PerceptronTagger, optional): Etiquetador reutilizado (nltk.pos_tag carga el modelo en cada llamada).
     """
     # 1. Tokenización
     words = nltk.word_tokenize(text.lower())
@@ -104,10 +119,11 @@ def process_lyrics(text: str, stopwords_set: set) -> list[str]:
     # CORRECCIÓN: NLTK no soporta 'es' directamente en pos_tag.
     # Usaremos el tagger en inglés, que es el más robusto para Nouns/Verbs/Adjectives.
     # Intentamos el tagger por defecto (inglés)
-    tagged_words = nltk.pos_tag(filtered_words) 
+    tagged_words = tagger.tag(filtered_words) if tagger is not None else nltk.pos_tag(filtered_words)
 
     # 4. Lematización y Filtrado Final por POS Tag (Sustantivos, Verbos, Adjetivos)
-    lemmatizer = WordNetLemmatizer()
+    if lemmatizer is None:
+        lemmatizer = WordNetLemmatizer()
     final_words = []
     
     for word, tag in tagged_words:
@@ -127,9 +143,57 @@ def process_lyrics(text: str, stopwords_set: set) -> list[str]:
             
     return final_words
 
+def init_worker(stopwords_set: set):
+    """Inicializa una vez por proceso los recursos de NLTK que usan todos sus artistas."""
+    global _WORKER_STOPWORDS, _WORKER_LEMMATIZER, _WORKER_TAGGER
+    _WORKER_STOPWORDS = stopwords_set
+    _WORKER_LEMMATIZER = WordNetLemmatizer()
+    _WORKER_TAGGER = PerceptronTagger()
+
+
+def count_artist_words(artist: str, lyrics: str) -> tuple[str, Counter]:
+    """Cuenta las palabras clave de un artista (en un proceso del pool cuando --workers > 1)."""
+    processed_words = process_lyrics(lyrics, _WORKER_STOPWORDS, _WORKER_LEMMATIZER, _WORKER_TAGGER)
+    return artist, Counter(processed_words)
+
+
+def count_words_by_artist(artist_lyrics: dict[str, str], stopwords_set: set, workers: int) -> dict[str, Counter]:
+    """Cuenta las palabras clave de cada artista, en serie o en un pool de `workers` procesos.
+    Returns:
+        dict: Counter de cada artista, en el mismo orden que artist_lyrics.
+    """
+    if workers <= 1:
+        init_worker(stopwords_set)
+        counters = {}
+        for artist, lyrics in artist_lyrics.items():
+            print(f"Processing insights for artist: {artist}")
+            counters[artist] = count_artist_words(artist, lyrics)[1]
+        return counters
+
+    counters = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(stopwords_set,)) as executor:
+        # Los artistas con más letra primero, para que no quede uno grande al final
+        by_size = sorted(artist_lyrics.items(), key=lambda item: len(item[1]), reverse=True)
+        futures = [executor.submit(count_artist_words, artist, lyrics) for artist, lyrics in by_size]
+        for future in as_completed(futures):
+            artist, counter = future.result()
+            counters[artist] = counter
+            print(f"Processed insights for artist: {artist} ({len(counters)}/{len(artist_lyrics)})")
+    # Mismo orden que en serie: los empates de most_common dependen del orden de inserción
+    return {artist: counters[artist] for artist in artist_lyrics}
+
+
 # --- Lógica Principal (El resto de la función main se mantiene) ---
 
-def main():
+@click.command()
+@click.option(
+    "--workers",
+    "-w",
+    default=1,
+    show_default=True,
+    help="Processes used for the NLP analysis (each artist is analysed in one of them).",
+)
+def main(workers):
     """
     Ejecuta el módulo de insights: fusiona letras, procesa POS Tagging y genera Top N.
     """
@@ -177,16 +241,9 @@ def main():
 
     # [4] Procesamiento y Conteo Final
     artist_results = {}
-    
-    for artist, lyrics in artist_lyrics.items():
-        print(f"Processing insights for artist: {artist}")
-        
-        # Procesar tokenización, POS tag y lematización
-        processed_words = process_lyrics(lyrics, stopwords_set)
-        
-        # Contar palabras para este artista
-        artist_counter = Counter(processed_words)
-        
+    artist_counters = count_words_by_artist(artist_lyrics, stopwords_set, workers)
+
+    for artist, artist_counter in artist_counters.items():
         # Top 10 por artista (Requisito)
         top_10 = artist_counter.most_common(10)
         
@@ -0,0 +1,92 @@
+""" Tests of the per-artist keyword counts of insights/main.py: a pool of worker processes gives the same
+per-artist Counters and global top 20 as the serial run. NLTK resources (tokenizer, tagger, lemmatizer)
+are replaced by deterministic stand-ins, so no model has to be downloaded.
+
+    python -m pytest insights/tests
+"""
+
+import multiprocessing
+import sys
+import unittest
+from collections import Counter
+from pathlib import Path
+from unittest import mock
+
+try:
+    import nltk
+except ImportError:
+    nltk = None
+
+# insights/main.py se importa como módulo del paquete insights, para que los procesos del pool lo encuentren
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+WORDS = "love night heart road light fire rain dream dance city river storm sky song time world".split()
+STOPWORDS = {"the", "and", "my", "your"}
+
+
+def artist_lyrics() -> dict[str, str]:
+    """Lyrics of 6 artists of different lengths, with repeated words (and ties) in every one."""
+    lyrics = {}
+    for number in range(6):
+        verses = []
+        for verse in range(5 + 3 * number):
+            words = [WORDS[(number + verse * position) % len(WORDS)] for position in range(1, 7)]
+            verses.append(f"the {' and '.join(words)} of my {WORDS[verse % len(WORDS)]}s, 42 times!")
+        lyrics[f"artist_{number}"] = "\n".join(verses)
+    return lyrics
+
+
+class FakeTagger:
+    """Tags words by their length: NN, VB or JJ (kept) and DT (discarded)."""
+
+    def tag(self, words):
+        return [(word, ("DT", "NN", "VB", "JJ")[min(len(word), 6) % 4]) for word in words]
+
+
+class FakeLemmatizer:
+    def lemmatize(self, word, pos):
+        return word[:-1] if pos == "n" and word.endswith("s") else word
+
+
+@unittest.skipIf(nltk is None, "nltk is not installed")
+@unittest.skipUnless(
+    multiprocessing.get_start_method() == "fork", "the NLTK stand-ins only reach the workers of a forked pool"
+)
+class CountWordsByArtistTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # El módulo descarga recursos de NLTK al importarse
+        with mock.patch.object(nltk, "download"):
+            from insights import main as insights
+
+        cls.insights = insights
+        patches = [
+            mock.patch.object(insights.nltk, "word_tokenize", lambda text: text.replace(",", " ,").split()),
+            mock.patch.object(insights, "PerceptronTagger", FakeTagger),
+            mock.patch.object(insights, "WordNetLemmatizer", FakeLemmatizer),
+        ]
+        for patch in patches:
+            patch.start()
+            cls.addClassCleanup(patch.stop)
+
+    def count(self, workers: int) -> tuple[dict[str, Counter], list]:
+        counters = self.insights.count_words_by_artist(artist_lyrics(), STOPWORDS, workers)
+        # Top 20 global como en main(): se suman los contadores en el orden de los artistas
+        global_counter = Counter()
+        for counter in counters.values():
+            global_counter.update(counter)
+        return counters, global_counter.most_common(20)
+
+    def test_workers_give_the_same_counts(self):
+        serial_counters, serial_top_20 = self.count(workers=1)
+        pool_counters, pool_top_20 = self.count(workers=2)
+
+        self.assertEqual(list(pool_counters), list(artist_lyrics()))
+        self.assertEqual(pool_counters, serial_counters)
+        self.assertEqual(pool_top_20, serial_top_20)
+        self.assertEqual(len(serial_top_20), 20)
+        self.assertNotIn("the", serial_counters["artist_0"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import random
+import re
+import sys
+import time
+import click
+from pathlib import Path
+
+# Módulos compartidos entre etapas (tab_processor/shared)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from shared.lyrics import remove_chords
+
+# -- Configuration ---
+CORPUS_DIRECTORY = "./files/cleaned/"
+
+CHORDS = ["C", "G", "Am", "F", "D7", "Em", "Bm7", "F#m", "Gsus4", "C/G", "Dmaj7", "A"]
+WORDS = ["la", "luna", "sale", "por", "el", "mar", "y", "tu", "voz", "me", "lleva", "corazón", "noche", "sin", "ti"]
+
+
+def legacy_remove_chords(text):
+    """Previous implementation (pattern compiled on every call, MULTILINE substitution and a second
+    pass for blank lines), kept as the baseline."""
+    chord_pattern = r"[A-G][#b]?(m|maj|min|sus|add|aug|dim)?[0-9]*(\/[A-G][#b]?)?"
+    lines_only_chords_pattern = re.compile(rf"^\s*(?:{chord_pattern}\s*)+$", re.MULTILINE)
+    lyrics_only = lines_only_chords_pattern.sub("", text)
+    return re.sub(r"\n\s*\n", "\n", lyrics_only).strip()
+
+
+def synthetic_song(rng: random.Random) -> str:
+    """Builds a tab of verses: a chord line over a lyric line, with some blank lines."""
+    lines = []
+    for _ in range(rng.randint(8, 30)):
+        lines.append("   ".join(rng.choices(CHORDS, k=rng.randint(2, 4))))
+        lines.append(" ".join(rng.choices(WORDS, k=rng.randint(3, 8))).capitalize())
+        if rng.random() < 0.2:
+            lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+def adversarial_texts(size: int) -> dict[str, str]:
+    """Inputs that make the previous pattern backtrack: blank lines before a lyric (every line start
+    retries the whitespace of all the following ones), very long whitespace or chord lines ending
+    in a lyric, and chords written together."""
+    return {
+        "blank lines": "\n" * size + "x",
+        "whitespace lines": " \n" * (size // 2) + "la",
+        "long whitespace": " " * size + "x",
+        "long chord line": "Am " * (size // 3) + "la",
+        "chords together": "AmG" * (size // 3) + "x",
+        "chord lines": "C\n" * (size // 2) + "Cx",
+    }
+
+
+def best_time(function, texts: list[str], repeat: int) -> tuple[float, list]:
+    """Returns (best total seconds over `repeat` runs, results of the last run)."""
+    best = float("inf")
+    results = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [function(text) for text in texts]
+        best = min(best, time.perf_counter() - start)
+    return best, results
+
+
+@click.command()
+@click.option("--corpus", "-c", default=CORPUS_DIRECTORY, help="Directory with cleaned .txt tabs.")
+@click.option("--songs", default=20000, help="Songs of the synthetic corpus (used if the corpus is empty).")
+@click.option("--repeat", "-r", default=3, help="Runs per implementation (the best one is reported).")
+@click.option(
+    "--sizes", default="1000,2000,4000,8000", help="Comma separated sizes (characters) of the adversarial inputs."
+)
+def main(corpus, songs, repeat, sizes):
+    """Benchmarks the previous remove_chords against the line classifier, on tabs and on adversarial
+    inputs (their time should grow linearly with the size), and checks that both give the same lyrics."""
+    texts = []
+    for path in sorted(Path(corpus).rglob("*.txt")):
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            texts.append(f.read())
+    source = corpus
+    if not texts:
+        rng = random.Random(0)
+        texts = [synthetic_song(rng) for _ in range(songs)]
+        source = "synthetic"
+
+    megabytes = sum(len(text) for text in texts) / (1024 * 1024)
+    print(f"Corpus: {source} - {len(texts)} files, {megabytes:.1f} MB")
+    print("-" * 72)
+    legacy_time, legacy_results = best_time(legacy_remove_chords, texts, repeat)
+    new_time, new_results = best_time(remove_chords, texts, repeat)
+    for name, elapsed in (("legacy", legacy_time), ("lines", new_time)):
+        files_per_second = len(texts) / elapsed if elapsed else float("inf")
+        print(f"{name:<8} {elapsed:8.3f}s | {files_per_second:10.1f} files/s | {megabytes / elapsed:8.1f} MB/s")
+    different = sum(legacy != new for legacy, new in zip(legacy_results, new_results))
+    print(f"Different outputs: {different}")
+
+    print("-" * 72)
+    print(f"{'Adversarial input':<18} {'size':>7} {'legacy':>10} {'lines':>10}  same")
+    for size in (int(size) for size in sizes.split(",")):
+        for name, text in adversarial_texts(size).items():
+            legacy_time, (legacy_result,) = best_time(legacy_remove_chords, [text], 1)
+            new_time, (new_result,) = best_time(remove_chords, [text], repeat)
+            print(
+                f"{name:<18} {size:>7} {legacy_time * 1000:8.1f}ms {new_time * 1000:8.1f}ms  "
+                f"{'yes' if legacy_result == new_result else 'NO'}"
+            )
+
+
+if __name__ == "__main__":
+    main()
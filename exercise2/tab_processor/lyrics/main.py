@@ -1,12 +1,22 @@
 import logging as log
 from pathlib import Path
 import datetime
-import re
+import sys
+import click
+
+# Módulos compartidos entre etapas (tab_processor/shared)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from shared.stage_manifest import StageManifest, rules_version
+from shared.lyrics import CHORD_VOCABULARY, is_chord_sequence, only_chords, remove_chords
+from shared.verdict_index import VERDICT_INDEX_FILE, read_verdict_index
 
 # --- Configuration ---
 INPUT_DIRECTORY_OK = Path("./files/") / "validations" / "ok"
+CLEANED_DIRECTORY = Path("./files/") / "cleaned"
 OUTPUT_DIRECTORY_LYRICS = Path("./files/") / "lyrics_only"
 LOGS_DIRECTORY = Path("./logs/")
+# Si cambia remove_chords, el manifiesto se invalida y se vuelven a extraer todas las letras
+RULES_VERSION = rules_version(remove_chords, only_chords, is_chord_sequence, sorted(CHORD_VOCABULARY))
 
 # --- Logging Setup ---
 LOGS_DIRECTORY.mkdir(exist_ok=True)
@@ -20,31 +30,6 @@ log.basicConfig(
 )
 
 
-def remove_chords(text: str) -> str:
-    """
-    Elimina los acordes de un texto, dejando solo la letra.
-    
-    Estrategia:
-    1. Eliminar líneas que solo contienen patrones de acorde y espacios.
-    2. Limpiar saltos de línea extra resultantes.
-    """
-    
-    # Patrón de Acorde Robusto: [Letra A-G][# o b]? (modificador m/maj/sus/etc)? [número]? [barra y bajo]?
-    chord_pattern = r"[A-G][#b]?(m|maj|min|sus|add|aug|dim)?[0-9]*(\/[A-G][#b]?)?"
-    
-    # Patrón de líneas que contienen solo acordes
-    lines_only_chords_pattern = re.compile(
-        rf"^\s*(?:{chord_pattern}\s*)+$", 
-        re.MULTILINE
-    )
-    lyrics_only = lines_only_chords_pattern.sub("", text)
-    
-    # Limpiar líneas extra en blanco dejadas por la eliminación, dejando solo un salto de línea
-    lyrics_only = re.sub(r"\n\s*\n", "\n", lyrics_only).strip()
-    
-    return lyrics_only
-
-
 def list_files_recursive(path: Path) -> list[Path]:
     """Lista recursivamente todos los archivos .txt de un directorio."""
     if not path.exists():
@@ -53,7 +38,74 @@ def list_files_recursive(path: Path) -> list[Path]:
     return [item for item in path.rglob("*.txt") if item.is_file()]
 
 
-def main():
+def list_ok_files() -> list[tuple[str, Path]]:
+    """Lists the valid tabs as (relative path, file). They come from the verdict index of the
+    validator (the cleaned files themselves) or, without index, from validations/ok.
+    """
+    if VERDICT_INDEX_FILE.is_file():
+        return [
+            (record["path"], CLEANED_DIRECTORY / record["path"])
+            for record in read_verdict_index()
+            if record["verdict"] == "ok"
+        ]
+    return [
+        (str(file_path.relative_to(INPUT_DIRECTORY_OK)), file_path)
+        for file_path in list_files_recursive(INPUT_DIRECTORY_OK)
+    ]
+
+
+def extract_lyrics_file(
+    file_path: Path, manifest: StageManifest, content_hash: str = None, relative_path: str = None
+) -> Path | None:
+    """Removes the chords of a validated tab, saves the lyrics and records them in the manifest.
+    Args:
+        file_path (Path): OK tab (files/validations/ok/..., or files/cleaned/... from the verdict index).
+        manifest (StageManifest): Manifest of the lyrics module.
+        content_hash (str, optional): Hash of the file, if already computed by manifest.check.
+        relative_path (str, optional): Path of the tab inside the songs tree (e.g. songs/artist/song.txt).
+            Defaults to the path of file_path inside validations/ok.
+    Returns:
+        Path | None: The lyrics file, or None if the tab couldn't be processed.
+    """
+    try:
+        # Leer el archivo (ya validado)
+        with open(file_path, "r", encoding="utf-8") as file:
+            text_with_chords = file.read()
+
+        # Eliminar los acordes
+        lyrics_only = remove_chords(text_with_chords)
+
+        # Construir la ruta de salida
+        if relative_path is None:
+            relative_path = str(file_path.relative_to(INPUT_DIRECTORY_OK))
+        
+        # Construimos la ruta de salida en 'files/lyrics_only'
+        output_path = OUTPUT_DIRECTORY_LYRICS / relative_path
+        
+        # Aseguramos la creación de subdirectorios (ej: files/lyrics_only/songs/abel_pintos)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # Escribir el nuevo archivo
+        with open(output_path, "w", encoding="utf-8") as file:
+            file.write(lyrics_only)
+
+    except Exception as e:
+        log.error(f"Error processing file {file_path}: {e}")
+        return None
+
+    manifest.record(relative_path, file_path, [output_path], content_hash)
+    return output_path
+
+
+@click.command()
+@click.option(
+    "--force",
+    "-f",
+    is_flag=True,
+    default=False,
+    help="Extract the lyrics of every OK file again, even if it didn't change since the last run.",
+)
+def main(force):
     """Procesa los archivos OK, elimina los acordes y los guarda en un nuevo directorio."""
     start_time = datetime.datetime.now()
     log.info(f"Lyrics module started at {start_time}")
@@ -64,43 +116,44 @@ def main():
     log.info(f"Output directory created: {OUTPUT_DIRECTORY_LYRICS}")
 
     processed_count = 0
-    files_to_process = list_files_recursive(INPUT_DIRECTORY_OK)
+    ok_files = list_ok_files()
+
+    # Solo se procesan los ficheros OK nuevos o modificados; se borran las letras de los que ya no están
+    manifest = StageManifest("lyrics", RULES_VERSION)
+    if force:
+        manifest.reset()
+    manifest.remove_orphans({relative_path for relative_path, _ in ok_files})
+
+    # Tras tab_cleaner --fused sin --debug_outputs el índice existe pero no los ficheros limpios
+    # (sus letras ya están escritas)
+    files_to_process = [(relative_path, file_path) for relative_path, file_path in ok_files if file_path.is_file()]
+    if len(files_to_process) < len(ok_files):
+        log.info(f"{len(ok_files) - len(files_to_process)} OK tabs of the index have no cleaned file, skipped")
 
     if not files_to_process:
-        print("No OK files found to process. Run the Validator first.")
+        manifest.save()
+        if ok_files:
+            print("No cleaned OK files to process (their lyrics were written by tab_cleaner --fused).")
+        else:
+            print("No OK files found to process. Run the Validator first.")
         return
 
-    for file_path in files_to_process:
-        try:
-            # Leer el archivo (ya validado)
-            with open(file_path, "r", encoding="utf-8") as file:
-                text_with_chords = file.read()
-
-            # Eliminar los acordes
-            lyrics_only = remove_chords(text_with_chords)
-
-            # Construir la ruta de salida
-            relative_path_to_ok = file_path.relative_to(INPUT_DIRECTORY_OK)
-            
-            # Construimos la ruta de salida en 'files/lyrics_only'
-            output_path = OUTPUT_DIRECTORY_LYRICS / relative_path_to_ok
-            
-            # Aseguramos la creación de subdirectorios (ej: files/lyrics_only/songs/abel_pintos)
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Escribir el nuevo archivo
-            with open(output_path, "w", encoding="utf-8") as file:
-                file.write(lyrics_only)
-
-            processed_count += 1
-            print(f"✅ Extracted lyrics from: {file_path.name} -> Saved to {output_path.name}")
-
-        except Exception as e:
-            log.error(f"Error processing file {file_path}: {e}")
+    for key, file_path in files_to_process:
+        unchanged, content_hash = manifest.check(key, file_path)
+        if unchanged:
             continue
 
+        output_path = extract_lyrics_file(file_path, manifest, content_hash, key)
+        if output_path is None:
+            continue
+
+        processed_count += 1
+        print(f"✅ Extracted lyrics from: {file_path.name} -> Saved to {output_path.name}")
+
+    manifest.save()
+
     print("-" * 40)
-    print(f"Total files processed (Lyrics only): {processed_count}")
+    print(f"Total files processed (Lyrics only): {processed_count} ({manifest.unchanged} unchanged)")
     print("-" * 40)
 
     end_time = datetime.datetime.now()
@@ -1,40 +1,66 @@
 import logging as log
 from pathlib import Path
 import datetime
+import importlib.util
+import json
 import subprocess
 import sys
+import threading
+import time
+import click
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from shared.pipeline_state import PipelineState
+from shared.stage_manifest import StageManifest
+from shared.streaming import StreamingPipeline, QUEUE_SIZE
 
 # --- Configuration ---
+PIPELINE_DIRECTORY = Path(__file__).resolve().parent
 LOGS_DIRECTORY = Path("./logs/")
 PIPELINE_LOG_FILE = LOGS_DIRECTORY / "pipeline.log"
+PIPELINE_TIMINGS_FILE = LOGS_DIRECTORY / "pipeline_timings.json"
 
-# Lista de módulos a ejecutar en orden.
+# Módulos del pipeline como grafo de dependencias: un módulo se ejecuta en cuanto terminan todos
+# los de "depends_on", así que RESULTS y LYRICS EXTRACTOR corren a la vez tras VALIDATOR.
+# "outputs" son los ficheros o directorios que produce (su huella se guarda en los checkpoints).
 MODULE_SEQUENCE = [
     
     # 1. Scrapping y catalogación
-    {"name": "SCRAPPER", "command": ["python", "scrapper/main.py", "-sc", "a", "-ec", "a"], "required": True},
+    {"name": "SCRAPPER", "command": ["python", "scrapper/main.py", "-sc", "a", "-ec", "a"], "required": True,
+     "depends_on": [], "outputs": ["files/catalog.json", "files/songs"]},
     # 2. Limpieza de archivos
-    {"name": "CLEANER", "command": ["python", "tab_cleaner/main.py"], "required": True},
+    {"name": "CLEANER", "command": ["python", "tab_cleaner/main.py"], "required": True,
+     "depends_on": ["SCRAPPER"], "outputs": ["files/cleaned"]},
     # 3. Validación y clasificación final (OK/KO)
-    {"name": "VALIDATOR", "command": ["python", "tab_validator/main.py"], "required": True},
+    {"name": "VALIDATOR", "command": ["python", "tab_validator/main.py"], "required": True,
+     "depends_on": ["CLEANER"], "outputs": ["files/validations"]},
     # 4. Generación de conteo de resultados
-    {"name": "RESULTS", "command": ["python", "results/main.py"], "required": True},
+    {"name": "RESULTS", "command": ["python", "results/main.py"], "required": True,
+     "depends_on": ["VALIDATOR"], "outputs": []},
     # 5. Extracción de letras limpias (preparación para Insights)
-    {"name": "LYRICS EXTRACTOR", "command": ["python", "lyrics/main.py"], "required": True},
+    {"name": "LYRICS EXTRACTOR", "command": ["python", "lyrics/main.py"], "required": True,
+     "depends_on": ["VALIDATOR"], "outputs": ["files/lyrics_only"]},
     # 6. Análisis de insights (NLP)
-    {"name": "INSIGHTS ANALYZER", "command": ["python", "insights/main.py"], "required": True},
+    {"name": "INSIGHTS ANALYZER", "command": ["python", "insights/main.py"], "required": True,
+     "depends_on": ["LYRICS EXTRACTOR"], "outputs": ["files/insights"]},
 ]
 
+# Los módulos se importan de uno en uno: cada uno tiene su propio paquete 'utils'
+_IMPORT_LOCK = threading.Lock()
+_STAGE_MODULES = {}
+
+
 # --- Logging Setup ---
 def setup_pipeline_logging():
     """Configura el logger específico para el orquestador."""
     LOGS_DIRECTORY.mkdir(exist_ok=True)
     
+    # Los módulos ejecutados en el mismo proceso escriben aquí: el hilo indica el módulo
     log.basicConfig(
         filename=PIPELINE_LOG_FILE,
         filemode="w",
         encoding="utf-8",
-        format="%(asctime)s %(levelname)-8s %(name)s %(message)s",
+        format="%(asctime)s %(levelname)-8s %(threadName)s %(name)s %(message)s",
         datefmt="%Y-%m-%d %H:%M:%S",
         level=log.INFO,
     )
@@ -42,72 +68,361 @@ def setup_pipeline_logging():
     console.setLevel(log.INFO)
     formatter = log.Formatter("%(levelname)-8s %(message)s")
     console.setFormatter(formatter)
+    # En consola solo los mensajes del orquestador (los módulos en proceso escriben en el log)
+    console.addFilter(log.Filter('PIPELINE'))
     log.getLogger('').addHandler(console)
     log.getLogger('PIPELINE').setLevel(log.INFO)
 
 
-def run_pipeline():
-    """Ejecuta todos los módulos secuencialmente y maneja los fallos."""
+def check_stage_graph(steps: list[dict]):
+    """Checks that every dependency exists and that the graph has no cycles."""
+    names = {step["name"] for step in steps}
+    for step in steps:
+        unknown = set(step["depends_on"]) - names
+        if unknown:
+            raise ValueError(f"Step {step['name']} depends on unknown steps: {sorted(unknown)}")
+
+    done = set()
+    remaining = list(steps)
+    while remaining:
+        ready = [step for step in remaining if set(step["depends_on"]) <= done]
+        if not ready:
+            raise ValueError(f"Dependency cycle between steps: {[step['name'] for step in remaining]}")
+        done.update(step["name"] for step in ready)
+        remaining = [step for step in remaining if step["name"] not in done]
+
+
+def find_step(name: str, steps: list[dict] = MODULE_SEQUENCE) -> dict:
+    """Finds a step by its name, ignoring case. A unique prefix is enough (e.g. "lyrics")."""
+    name = name.strip().upper()
+    exact = [step for step in steps if step["name"] == name]
+    matches = exact or [step for step in steps if step["name"].startswith(name)]
+    if len(matches) != 1:
+        raise ValueError(f"Unknown or ambiguous step {name!r}. Steps: {[step['name'] for step in steps]}")
+    return matches[0]
+
+
+def select_steps(first: str = None, last: str = None, steps: list[dict] = MODULE_SEQUENCE) -> list[dict]:
+    """Returns the steps from `first` to `last` (both included, in MODULE_SEQUENCE order)."""
+    start = steps.index(find_step(first, steps)) if first else 0
+    end = steps.index(find_step(last, steps)) if last else len(steps) - 1
+    if start > end:
+        raise ValueError(f"Step {steps[start]['name']} comes after {steps[end]['name']}")
+    return steps[start : end + 1]
+
+
+def plan_resume(steps: list[dict], state: PipelineState) -> set[str]:
+    """Returns the names of the steps a resumed run can skip: completed, with unchanged outputs and
+    with no dependency that runs again.
+    """
+    rerun, skipped = set(), set()
+    # MODULE_SEQUENCE está en orden topológico: las dependencias se deciden antes
+    for step in steps:
+        if not set(step["depends_on"]) & rerun and state.is_valid(step):
+            skipped.add(step["name"])
+        else:
+            rerun.add(step["name"])
+    return skipped
+
+
+def load_stage_module(script: str):
+    """Imports the main.py of a module (e.g. "tab_cleaner/main.py") once.
+    The module directory goes first in sys.path while it is imported, as when it is run as a script,
+    and the 'utils' package of the previously loaded module is evicted so the right one is imported.
+    """
+    script_path = (PIPELINE_DIRECTORY / script).resolve()
+    with _IMPORT_LOCK:
+        if script_path in _STAGE_MODULES:
+            return _STAGE_MODULES[script_path]
+
+        for name in [name for name in sys.modules if name == "utils" or name.startswith("utils.")]:
+            del sys.modules[name]
+
+        module_name = f"{script_path.parent.name}_main"
+        stage_directory = str(script_path.parent)
+        sys.path.insert(0, stage_directory)
+        try:
+            spec = importlib.util.spec_from_file_location(module_name, script_path)
+            module = importlib.util.module_from_spec(spec)
+            # Registrado para que las funciones del módulo se puedan enviar a procesos (pickle)
+            sys.modules[module_name] = module
+            spec.loader.exec_module(module)
+        except BaseException:
+            sys.modules.pop(module_name, None)
+            raise
+        finally:
+            sys.path.remove(stage_directory)
+
+        _STAGE_MODULES[script_path] = module
+        return module
+
+
+def run_step_in_process(step: dict):
+    """Calls the entry function of a module in this process, with the arguments of its command."""
+    script, arguments = step["command"][1], step["command"][2:]
+    module = load_stage_module(script)
+    entry = module.main
+    if isinstance(entry, click.Command):
+        entry.main(args=arguments, prog_name=script, standalone_mode=False)
+    else:
+        entry()
+
+
+def run_streaming_step(step: dict, queue_size: int = QUEUE_SIZE):
+    """Runs the SCRAPPER step streaming every downloaded song through cleaning, validation and lyrics
+    extraction (bounded queues, one thread per stage) while the rest keep downloading.
+    Results are recorded in the manifests of the cleaner, the validator and the lyrics module, so the
+    CLEANER, VALIDATOR and LYRICS EXTRACTOR steps that follow only process what wasn't streamed
+    (e.g. songs downloaded in previous runs).
+    """
+    # tab_cleaner se importa antes que scrapper: el paquete 'utils' que queda cargado es el del
+    # scrapper, que importa utils.async_downloader durante las descargas
+    cleaner = load_stage_module("tab_cleaner/main.py")
+    validator = load_stage_module("tab_validator/main.py")
+    lyrics = load_stage_module("lyrics/main.py")
+    script, arguments = step["command"][1], step["command"][2:]
+    scrapper = load_stage_module(script)
+
+    cleaner_manifest = StageManifest("cleaner", cleaner.RULES_VERSION)
+    validator_manifest = StageManifest("validator", validator.manifest_version("copy"))
+    lyrics_manifest = StageManifest("lyrics", lyrics.RULES_VERSION)
+
+    def clean(lyrics_path: str) -> Path | None:
+        file_path = Path(lyrics_path)
+        if file_path.suffix != ".txt":
+            return None
+        relative_path, status, detail, outputs = cleaner.clean_file(file_path)
+        if status == "error":
+            raise RuntimeError(detail)
+        cleaner_manifest.record(relative_path, cleaner.INPUT_DIRECTORY / relative_path, outputs)
+        return Path(outputs[0]) if status == "cleaned" else None
+
+    def validate(cleaned_path: Path) -> Path | None:
+        result = validator.validate_file(cleaned_path, validator_manifest)
+        if result is None:
+            raise RuntimeError("validation failed (see log)")
+        validated, output_path = result
+        return output_path if validated else None
+
+    def extract_lyrics(ok_path: Path) -> Path | None:
+        output_path = lyrics.extract_lyrics_file(ok_path, lyrics_manifest)
+        if output_path is None:
+            raise RuntimeError("lyrics extraction failed (see log)")
+        return output_path
+
+    stream = StreamingPipeline(
+        [("clean", clean), ("validate", validate), ("lyrics", extract_lyrics)], queue_size=queue_size
+    ).start()
+    try:
+        # Mismas opciones que en la línea de comandos, más el callback de cada canción descargada
+        command = scrapper.main
+        with command.make_context(script, list(arguments)) as ctx:
+            ctx.invoke(command.callback, **ctx.params, on_downloaded=stream.submit)
+    finally:
+        stream.close()
+        for manifest in (cleaner_manifest, validator_manifest, lyrics_manifest):
+            manifest.save()
+        stream.log_stats()
+        cleaner.ENGINE.log_stats()
+
+
+def run_step_subprocess(step: dict):
+    """Runs a module as a separate Python process (full isolation)."""
+    command = [sys.executable if part == "python" else part for part in step["command"]]
+    result = subprocess.run(command, capture_output=True, text=True, check=step["required"])
+    if result.stdout:
+        # Muestra una línea del output para confirmar que el módulo no se saltó
+        log.getLogger('PIPELINE').debug(f"Module output preview: {result.stdout.splitlines()[-1]}")
+
+
+def run_step(step: dict, runner) -> float:
+    """Runs one step in the current (worker) thread.
+    Returns:
+        float: Duration of the step in seconds.
+    """
+    threading.current_thread().name = step["name"]
+    start = time.perf_counter()
+    runner(step)
+    return time.perf_counter() - start
+
+
+def save_timings(timings: dict, mode: str, duration: float):
+    LOGS_DIRECTORY.mkdir(exist_ok=True)
+    with open(PIPELINE_TIMINGS_FILE, "w", encoding="utf-8") as f:
+        json.dump({"mode": mode, "total_seconds": round(duration, 3), "steps": timings}, f, indent=4)
+
+
+def run_pipeline(
+    use_subprocess: bool = False,
+    max_parallel: int = 2,
+    streaming: bool = False,
+    queue_size: int = QUEUE_SIZE,
+    steps: list[dict] = None,
+    resume: bool = False,
+):
+    """Ejecuta los módulos según sus dependencias y maneja los fallos.
+    Args:
+        use_subprocess (bool): Run each module in its own process instead of calling its entry function.
+        max_parallel (int): Maximum number of modules running at the same time.
+        streaming (bool): Clean, validate and extract the lyrics of every song while the scrapper is
+            still downloading the rest (see run_streaming_step).
+        queue_size (int): With streaming, maximum number of songs waiting between two stages.
+        steps (list[dict], optional): Steps to run (see select_steps). Dependencies outside of them
+            are considered done. Defaults to every step.
+        resume (bool): Skip the steps whose checkpoint is still valid (see plan_resume).
+    """
     logger = log.getLogger('PIPELINE')
     start_time = datetime.datetime.now()
+    pipeline_start = time.perf_counter()
+    if use_subprocess:
+        mode, runner = "subprocess", run_step_subprocess
+    elif streaming:
+        mode = "streaming"
+
+        def runner(step: dict):
+            if step["name"] == "SCRAPPER":
+                run_streaming_step(step, queue_size)
+            else:
+                run_step_in_process(step)
+    else:
+        mode, runner = "in-process", run_step_in_process
     
     logger.info("-" * 50)
     logger.info("STARTING DATA ENGINEERING PIPELINE")
-    logger.info(f"Start Time: {start_time}")
+    logger.info(f"Start Time: {start_time} | Mode: {mode} | Max parallel steps: {max_parallel}")
     logger.info("-" * 50)
 
     # Nota: Eliminamos el bloque de Cleanup para evitar borrar archivos
-    
-    for step in MODULE_SEQUENCE:
-        step_name = step["name"]
-        command = step["command"]
-        required = step["required"]
-        
-        logger.info(f"🚀 Running Step: {step_name} | Command: {' '.join(command)}")
+    check_stage_graph(MODULE_SEQUENCE)
+    steps = MODULE_SEQUENCE if steps is None else steps
+    selected = {step["name"] for step in steps}
 
-        try:
-            # Ejecutar el comando del sistema
-            result = subprocess.run(
-                command, 
-                capture_output=True, 
-                text=True, 
-                check=required 
-            )
-
-            logger.info(f"✅ Step Succeeded: {step_name}")
-            if result.stdout:
-                 # Muestra una línea del output para confirmar que el módulo no se saltó
-                 logger.debug(f"Module output preview: {result.stdout.splitlines()[-1]}")
-            
-        except subprocess.CalledProcessError as e:
-            # Captura y registra cualquier error que rompa el pipeline
-            logger.error(f"❌ Step Failed: {step_name}")
-            logger.error(f"Command: {e.cmd}")
-            logger.error(f"Return Code: {e.returncode}")
-            logger.error(f"Stderr: {e.stderr}")
-            
-            if required:
-                logger.critical("Pipeline halted due to critical failure.")
-                sys.exit(1)
-            else:
-                logger.warning("Step was not mandatory, continuing pipeline...")
-        except FileNotFoundError:
-            logger.error(f"❌ ERROR: Command not found. Ensure Python and all module paths are correct.")
-            sys.exit(1)
-        except Exception as e:
-            logger.critical(f"❌ UNEXPECTED CRITICAL ERROR during step {step_name}: {e}")
-            sys.exit(1)
+    # Checkpoints: cada paso completado queda registrado con la huella de sus salidas
+    state = PipelineState()
+    skipped = plan_resume(steps, state) if resume else set()
+    timings = {}
+    for step in steps:
+        if step["name"] in skipped:
+            timings[step["name"]] = {"status": "skipped"}
+            logger.info(f"⏭️  Skipping Step: {step['name']} (completed, outputs unchanged)")
+
+    pending = {step["name"]: step for step in steps if step["name"] not in skipped}
+    finished = set(skipped)
+    running = {}
+    halted = False
+
+    with ThreadPoolExecutor(max_workers=max_parallel, thread_name_prefix="step") as executor:
+        while pending or running:
+            # Lanzar los pasos cuyas dependencias ya terminaron
+            if not halted:
+                for name, step in list(pending.items()):
+                    if set(step["depends_on"]) & selected <= finished:
+                        logger.info(f"🚀 Running Step: {name} | Command: {' '.join(step['command'])}")
+                        state.invalidate(name)
+                        timings[name] = {"started_at": round(time.perf_counter() - pipeline_start, 3)}
+                        running[executor.submit(run_step, step, runner)] = step
+                        del pending[name]
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                step = running.pop(future)
+                step_name = step["name"]
+                try:
+                    seconds = future.result()
+                    timings[step_name].update(seconds=round(seconds, 3), status="ok")
+                    state.mark_completed(step, seconds)
+                    finished.add(step_name)
+                    logger.info(f"✅ Step Succeeded: {step_name} ({seconds:.2f}s)")
+                except (Exception, SystemExit) as e:
+                    timings[step_name].update(status="failed")
+                    state.mark_failed(step, repr(e))
+                    # Captura y registra cualquier error que rompa el pipeline
+                    logger.error(f"❌ Step Failed: {step_name}")
+                    if isinstance(e, subprocess.CalledProcessError):
+                        logger.error(f"Command: {e.cmd}")
+                        logger.error(f"Return Code: {e.returncode}")
+                        logger.error(f"Stderr: {e.stderr}")
+                    else:
+                        logger.error(f"Error: {e!r}", exc_info=not isinstance(e, SystemExit))
+
+                    if step["required"]:
+                        # No se lanzan más pasos; se espera a los que ya están en marcha
+                        halted = True
+                    else:
+                        logger.warning("Step was not mandatory, continuing pipeline...")
+                        finished.add(step_name)
+
+    duration = time.perf_counter() - pipeline_start
+    save_timings(timings, mode, duration)
+
+    logger.info("-" * 50)
+    for step_name, timing in timings.items():
+        logger.info(f"  {step_name:<20} {timing.get('status', '?'):<7} {timing.get('seconds', 0):9.2f}s")
+
+    if halted:
+        logger.critical("Pipeline halted due to critical failure. Rerun with --resume to continue from it.")
+        sys.exit(1)
 
     # Fin del Pipeline
     end_time = datetime.datetime.now()
-    duration = end_time - start_time
     
-    logger.info("-" * 50)
     logger.info("PIPELINE COMPLETED SUCCESSFULLY!")
-    logger.info(f"Total Duration: {duration}")
+    logger.info(f"Total Duration: {end_time - start_time}")
     logger.info("-" * 50)
 
 
-if __name__ == "__main__":
+@click.command()
+@click.option(
+    "--subprocess",
+    "use_subprocess",
+    is_flag=True,
+    default=False,
+    help="Run every module in its own Python process instead of calling it in-process.",
+)
+@click.option(
+    "--max_parallel",
+    "-p",
+    default=2,
+    help="Maximum number of independent modules running at the same time.",
+)
+@click.option(
+    "--streaming",
+    is_flag=True,
+    default=False,
+    help="Clean, validate and extract the lyrics of every song as soon as it is downloaded.",
+)
+@click.option(
+    "--queue_size",
+    default=QUEUE_SIZE,
+    help="With --streaming, maximum number of songs waiting between two stages (backpressure).",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    default=False,
+    help="Skip the steps that completed in a previous run and whose outputs didn't change since.",
+)
+@click.option("--from", "first_step", default=None, help="First step to run (e.g. CLEANER, or a prefix: lyrics).")
+@click.option("--to", "last_step", default=None, help="Last step to run.")
+def main(use_subprocess, max_parallel, streaming, queue_size, resume, first_step, last_step):
+    if use_subprocess and streaming:
+        raise click.UsageError("--streaming runs the modules in-process, it can't be used with --subprocess")
+    try:
+        steps = select_steps(first_step, last_step)
+    except ValueError as e:
+        raise click.UsageError(str(e))
     setup_pipeline_logging()
-    run_pipeline()
\ No newline at end of file
+    run_pipeline(
+        use_subprocess=use_subprocess,
+        max_parallel=max_parallel,
+        streaming=streaming,
+        queue_size=queue_size,
+        steps=steps,
+        resume=resume,
+    )
+
+
+if __name__ == "__main__":
+    main()
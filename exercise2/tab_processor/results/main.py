@@ -1,12 +1,27 @@
 import logging as log
 from pathlib import Path
 import datetime
+import json
+import sys
+
+# Módulos compartidos entre etapas (tab_processor/shared)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from shared.verdict_index import (
+    VERDICT_INDEX_FILE,
+    VERDICT_SUMMARY_FILE,
+    VerdictSummary,
+    read_verdict_index,
+    read_verdict_summary,
+)
 
 # --- Configuration ---
 # Utilizamos Path, siguiendo la mejora de código propuesta (Punto 6)
 INPUT_DIRECTORY = Path("./files/")
 OUTPUT_DIRECTORY_OK = INPUT_DIRECTORY / "validations" / "ok"
 OUTPUT_DIRECTORY_KO = INPUT_DIRECTORY / "validations" / "ko"
+# Resultado de cada ejecución, para comparar con las anteriores (no lo borra --init)
+RESULTS_HISTORY_FILE = INPUT_DIRECTORY / "results_history.jsonl"
+TOP_ARTISTS = 10  # Artistas con más tabs que se muestran
 LOGS_DIRECTORY = Path("./logs/")
 
 # --- Logging Setup ---
@@ -35,24 +50,110 @@ def count_files_recursively(directory: Path) -> int:
     return count
 
 
+def load_summary() -> dict | None:
+    """Resumen de los veredictos de la validación, sin recorrer el árbol de canciones.
+    Returns:
+        dict: Recuentos OK/KO totales y por artista, letra y motivo (None si no hay veredictos).
+    """
+    summary = read_verdict_summary()
+    if summary is not None:
+        log.info(f"Counts read from {VERDICT_SUMMARY_FILE}")
+        return summary
+    if VERDICT_INDEX_FILE.is_file():
+        # Índice escrito por una versión anterior del validador, sin resumen
+        verdicts = VerdictSummary()
+        for record in read_verdict_index():
+            verdicts.add(record)
+        log.info(f"Counts computed from {VERDICT_INDEX_FILE}")
+        return verdicts.to_dict()
+    return None
+
+
+def read_last_run(path: Path = RESULTS_HISTORY_FILE) -> dict | None:
+    """Último resultado guardado en el histórico (None si no hay ninguno)."""
+    if not path.is_file():
+        return None
+    last_line = None
+    with open(path, "r", encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                last_line = line
+    return json.loads(last_line) if last_line else None
+
+
+def append_run(run: dict, path: Path = RESULTS_HISTORY_FILE):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as file:
+        file.write(json.dumps(run, ensure_ascii=False) + "\n")
+
+
+def trend(current: int, previous: dict | None, key: str, group: str = None) -> str:
+    """Diferencia con la ejecución anterior, ej. " (+12)" (vacío si no hay ejecución anterior)."""
+    if previous is None:
+        return ""
+    values = previous.get(group, {}) if group else previous
+    difference = current - values.get(key, 0)
+    return f" ({difference:+d})"
+
+
+def print_breakdowns(summary: dict, previous: dict | None):
+    """Muestra el desglose por motivo, letra y artista."""
+    print("By reason:")
+    for reason, count in summary["by_reason"].items():
+        print(f"  {reason:<16} {count:>7}{trend(count, previous, reason, 'by_reason')}")
+
+    print("By letter (OK / KO):")
+    for letter, counts in summary["by_letter"].items():
+        print(f"  {letter:<4} {counts['ok']:>7} / {counts['ko']:<7}")
+
+    artists = sorted(
+        summary["by_artist"].items(), key=lambda item: (-(item[1]["ok"] + item[1]["ko"]), item[0])
+    )
+    print(f"Top {min(TOP_ARTISTS, len(artists))} artists of {len(artists)} (OK / KO):")
+    for artist, counts in artists[:TOP_ARTISTS]:
+        print(f"  {artist:<30} {counts['ok']:>5} / {counts['ko']:<5}")
+
+
 def main():
     """Ejecuta el módulo de resultados para contar archivos OK y KO."""
     start_time = datetime.datetime.now()
     log.info(f"Results module started at {start_time}")
     print("Starting Results Module...")
 
-    ok_count = count_files_recursively(OUTPUT_DIRECTORY_OK)
-    ko_count = count_files_recursively(OUTPUT_DIRECTORY_KO)
+    summary = load_summary()
+    if summary is not None:
+        ok_count, ko_count = summary["ok"], summary["ko"]
+    else:
+        # Sin veredictos guardados: se cuentan las copias de validations/ok y validations/ko
+        ok_count = count_files_recursively(OUTPUT_DIRECTORY_OK)
+        ko_count = count_files_recursively(OUTPUT_DIRECTORY_KO)
     total_count = ok_count + ko_count
+    previous = read_last_run()
 
     print("-" * 40)
     # CORRECCIÓN: Eliminamos los emojis por caracteres ASCII seguros
-    print(f"OK Total Validated Files: {ok_count}")
-    print(f"KO Total Invalid Files: {ko_count}")
-    print(f"Total Processed (OK + KO): {total_count}")
+    print(f"OK Total Validated Files: {ok_count}{trend(ok_count, previous, 'ok')}")
+    print(f"KO Total Invalid Files: {ko_count}{trend(ko_count, previous, 'ko')}")
+    print(f"Total Processed (OK + KO): {total_count}{trend(total_count, previous, 'total')}")
+    if summary is not None:
+        print("-" * 40)
+        print_breakdowns(summary, previous)
+    if previous is not None:
+        print(f"Compared with the run of {previous['date']}")
     print("-" * 40)
 
     log.info(f"Results: OK={ok_count}, KO={ko_count}, Total={total_count}")
+    if summary is not None:
+        log.info(f"Results by reason: {summary['by_reason']}")
+
+    run = {
+        "date": start_time.isoformat(timespec="seconds"),
+        "ok": ok_count,
+        "ko": ko_count,
+        "total": total_count,
+        "by_reason": summary["by_reason"] if summary is not None else {},
+    }
+    append_run(run)
 
     end_time = datetime.datetime.now()
     log.info(f"Results module ended at {end_time}")
@@ -62,8 +163,11 @@ def main():
     print(f"Results module finished in: {duration.total_seconds():.2f} seconds.")
 
     # Devolvemos los resultados por si el orquestador los necesita
-    return {"ok": ok_count, "ko": ko_count, "total": total_count}
+    results = {"ok": ok_count, "ko": ko_count, "total": total_count}
+    if summary is not None:
+        results.update(by_artist=summary["by_artist"], by_letter=summary["by_letter"], by_reason=summary["by_reason"])
+    return results
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
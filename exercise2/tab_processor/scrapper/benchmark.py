@@ -0,0 +1,91 @@
+import re
+import time
+import click
+from pathlib import Path
+from bs4 import BeautifulSoup
+
+import utils.parsing as parsing
+
+# -- Configuration ---
+# Corpus por defecto: las páginas guardadas por la caché HTTP del scrapper
+CORPUS_DIRECTORY = "./files/http_cache/"
+
+
+# --- Legacy extraction (full html.parser tree + regex), kept as the benchmark baseline ---
+def legacy_artist_links(html: str) -> list[str]:
+    ul_tag = BeautifulSoup(html, "html.parser").find("ul")
+    if not ul_tag:
+        return []
+    hrefs = []
+    for li in ul_tag.find_all("li"):
+        a_tag = li.find("a")
+        if a_tag and a_tag.get("href"):
+            hrefs.append(a_tag["href"])
+    return hrefs
+
+
+def legacy_song_links(html: str) -> list[str]:
+    soup = BeautifulSoup(html, "html.parser")
+    return [a["href"] for a in soup.select("li > a") if a.get("href") and not a["href"].startswith("http")]
+
+
+def legacy_lyrics(html: str) -> str:
+    for p in BeautifulSoup(html, "html.parser").findAll("pre"):
+        text = re.sub("<.*?>", "", str(p)).strip()
+        if text:
+            return text
+    return ""
+
+
+EXTRACTORS = [
+    ("artist index (<ul>)", legacy_artist_links, parsing.extract_artist_links),
+    ("artist page (li > a)", legacy_song_links, parsing.extract_song_links),
+    ("song page (<pre>)", legacy_lyrics, parsing.extract_lyrics),
+]
+
+
+def time_extractor(extractor, pages: list[str], repeat: int) -> tuple[float, list]:
+    """Returns (best total seconds over `repeat` runs, results of the last run)."""
+    best = float("inf")
+    results = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [extractor(html) for html in pages]
+        best = min(best, time.perf_counter() - start)
+    return best, results
+
+
+@click.command()
+@click.option("--corpus", "-c", default=CORPUS_DIRECTORY, help="Directory with saved .html pages.")
+@click.option("--repeat", "-r", default=3, help="Runs per extractor (the best one is reported).")
+def main(corpus, repeat):
+    """Benchmarks the legacy parsing (full html.parser tree + regex) against utils.parsing."""
+    pages = []
+    for path in sorted(Path(corpus).rglob("*.html")):
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            pages.append(f.read())
+
+    if not pages:
+        print(f"No .html pages found in {corpus}. Run the scrapper first to fill the HTTP cache.")
+        return
+
+    size_mb = sum(len(html) for html in pages) / (1024 * 1024)
+    print(f"Corpus: {len(pages)} pages ({size_mb:.2f} MB) - parser: {parsing.PARSER}")
+    print("-" * 72)
+
+    for name, legacy, current in EXTRACTORS:
+        legacy_time, legacy_results = time_extractor(legacy, pages, repeat)
+        current_time, current_results = time_extractor(current, pages, repeat)
+        same = sum(1 for a, b in zip(legacy_results, current_results) if a == b)
+        print(
+            f"{name:<22} legacy {legacy_time:8.3f}s | new {current_time:8.3f}s | "
+            f"x{legacy_time / current_time if current_time else float('inf'):5.1f} | "
+            f"same output {same}/{len(pages)}"
+        )
+
+    print("-" * 72)
+    print("Note: lyrics may differ where pages contain HTML entities (now decoded, e.g. '&amp;' -> '&').")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import gc
+import json
+import time
+import tracemalloc
+import click
+from dataclasses import dataclass, asdict, field
+from pathlib import Path
+
+import utils.files as files
+from utils.data import Artist
+
+# -- Configuration ---
+CATALOG_FILE = "./files/catalog.json"
+
+
+# --- Legacy catalog records (regular dataclasses + Path objects), kept as the benchmark baseline ---
+@dataclass
+class LegacySong:
+    id: int = field(init=False)
+    song_title: str
+    song_url: str
+    genre: str = ""
+    lyrics_path: Path = None
+
+    _id_counter = 1
+
+    def __post_init__(self):
+        self.id = LegacySong._id_counter
+        LegacySong._id_counter += 1
+        if self.lyrics_path is not None:
+            self.lyrics_path = files.normalize_relative_path(str(self.lyrics_path))
+        else:
+            self.lyrics_path = files.normalize_relative_path(self.lyrics_path)
+
+    @staticmethod
+    def from_dict(data):
+        data_copy = data.copy()
+        data_copy.pop("id", None)
+        if "lyrics_path" in data_copy and data_copy["lyrics_path"]:
+            data_copy["lyrics_path"] = Path(data_copy["lyrics_path"])
+        song = LegacySong(**data_copy)
+        if "id" in data and data["id"] >= LegacySong._id_counter:
+            LegacySong._id_counter = data["id"] + 1
+        return song
+
+
+@dataclass
+class LegacyArtist:
+    id: int = field(init=False)
+    name: str
+    url: str
+    genres: list[str] = field(default_factory=list)
+    albums: list[str] = field(default_factory=list)
+    songs: list[LegacySong] = field(default_factory=list)
+
+    _id_counter = 1
+
+    def __post_init__(self):
+        self.id = LegacyArtist._id_counter
+        LegacyArtist._id_counter += 1
+
+    def to_dict(self):
+        data = asdict(self)
+        data["songs"] = [asdict(song) for song in self.songs]
+        return data
+
+    @staticmethod
+    def from_dict(data):
+        data_copy = data.copy()
+        data_copy.pop("id", None)
+        songs_data = data_copy.pop("songs", [])
+        artist = LegacyArtist(**data_copy)
+        artist.songs = [LegacySong.from_dict(s_data) for s_data in songs_data]
+        if "id" in data and data["id"] >= LegacyArtist._id_counter:
+            LegacyArtist._id_counter = data["id"] + 1
+        return artist
+
+
+def synthetic_catalog(artists: int, songs_per_artist: int) -> list[dict]:
+    """Builds a catalog.json-like structure when there is no real catalog to measure."""
+    raw_catalog = []
+    song_id = 1
+    for artist_id in range(1, artists + 1):
+        name = f"artist {artist_id}"
+        songs = []
+        for number in range(songs_per_artist):
+            songs.append(
+                {
+                    "id": song_id,
+                    "song_title": f"Song {number}",
+                    "song_url": f"https://acordes.lacuerda.net/artist_{artist_id}/song_{number}.shtml",
+                    "genre": "",
+                    "lyrics_path": f"./files/songs/artist_{artist_id}/song_{number}.txt",
+                }
+            )
+            song_id += 1
+        raw_catalog.append(
+            {"id": artist_id, "name": name, "url": f"https://acordes.lacuerda.net/artist_{artist_id}",
+             "genres": [], "albums": [], "songs": songs}
+        )
+    return raw_catalog
+
+
+def measure_load(artist_class, raw_catalog: list[dict]) -> tuple[float, int, list]:
+    """Returns (seconds to build the objects, bytes retained by them, the catalog)."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    catalog = [artist_class.from_dict(artist_data) for artist_data in raw_catalog]
+    elapsed = time.perf_counter() - start
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, retained, catalog
+
+
+@click.command()
+@click.option("--catalog", "-c", default=CATALOG_FILE, help="catalog.json to load (a synthetic one is used if missing).")
+@click.option("--artists", default=5000, help="Artists of the synthetic catalog.")
+@click.option("--songs_per_artist", default=60, help="Songs per artist of the synthetic catalog.")
+def main(catalog, artists, songs_per_artist):
+    """Measures catalog load time and memory of the legacy dataclasses against the slotted records."""
+    if Path(catalog).is_file():
+        with open(catalog, "r", encoding="utf-8") as f:
+            raw_catalog = json.load(f)
+        source = catalog
+    else:
+        raw_catalog = synthetic_catalog(artists, songs_per_artist)
+        source = f"synthetic ({artists} artists x {songs_per_artist} songs)"
+
+    total_songs = sum(len(artist_data.get("songs", [])) for artist_data in raw_catalog)
+    print(f"Catalog: {source} - {len(raw_catalog)} artists, {total_songs} songs")
+    print("-" * 72)
+
+    results = {}
+    for name, artist_class in (("legacy dataclasses", LegacyArtist), ("slotted records", Artist)):
+        elapsed, retained, loaded = measure_load(artist_class, raw_catalog)
+        results[name] = (elapsed, retained)
+        print(f"{name:<20} load {elapsed:7.3f}s | memory {retained / (1024 * 1024):8.1f} MB")
+        del loaded
+
+    (legacy_time, legacy_memory), (new_time, new_memory) = results.values()
+    print("-" * 72)
+    print(
+        f"Load time x{legacy_time / new_time if new_time else float('inf'):.1f} faster, "
+        f"memory -{1 - new_memory / legacy_memory if legacy_memory else 0:.0%}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+""" Local stand-in for acordes.lacuerda.net (aiohttp), to run the scrapper and its download engine
+without requests to the real site. Pages keep the structure the parsers expect: the artist index of
+a letter (<ul> of artist links), artist pages (li > a song links) and song pages (<pre> tab).
+Faults (429 with Retry-After, 5xx...) can be queued per path, and every request is recorded.
+
+    python scrapper/fake_lacuerda.py --port 8080
+    LACUERDA_ROOT=http://127.0.0.1:8080 python scrapper/main.py -r -a
+"""
+
+import html
+import time
+import click
+from aiohttp import web
+
+# -- Configuration ---
+HOST = "127.0.0.1"
+PORT = 8080
+
+# Artista -> canciones (en el formato de las rutas de lacuerda.net)
+ARTISTS = {
+    "amaral": ["sin_ti_no_soy_nada", "como_hablar"],
+    "andres_calamaro": ["flaca", "loco"],
+    "bunbury": ["lady_blue", "sirena_varada"],
+    "mana": ["rayando_el_sol"],
+}
+LYRICS = "C          G\n{title}, la luna sale por el mar\nAm         F\ny tu voz me lleva sin ti\n"
+
+
+def page(body: str) -> str:
+    return f"<html><head><title>LaCuerda.net</title></head><body>{body}</body></html>"
+
+
+class FakeLacuerda:
+    """aiohttp application that serves lacuerda-style pages.
+
+    Args:
+        artists (dict): Artist path -> list of song paths. Defaults to ARTISTS.
+    """
+
+    def __init__(self, artists: dict[str, list[str]] = None):
+        self.artists = ARTISTS if artists is None else artists
+        self.faults: dict[str, list[tuple[int, dict]]] = {}
+        self.requests: list[tuple[float, str, int]] = []  # (time.monotonic(), path, status)
+        self._runner = None
+
+    def fail(self, path: str, status: int, times: int = 1, retry_after: str | int = None):
+        """Answers the next `times` requests to path with `status` (and a Retry-After header if given)."""
+        headers = {} if retry_after is None else {"Retry-After": str(retry_after)}
+        self.faults.setdefault(path, []).extend([(status, headers)] * times)
+
+    def requests_to(self, path: str) -> list[tuple[float, int]]:
+        """(time, status) of the requests received for path."""
+        return [(at, status) for at, request_path, status in self.requests if request_path == path]
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/{path:.*}", self.handle)
+        return app
+
+    async def handle(self, request: web.Request) -> web.Response:
+        # "/tabs//a" (URL_ARTIST_INDEX + "/" + letra) y "/tabs/a" son la misma página
+        path = "/" + "/".join(part for part in request.path.split("/") if part)
+        response = self.respond(path)
+        self.requests.append((time.monotonic(), path, response.status))
+        return response
+
+    def respond(self, path: str) -> web.Response:
+        faults = self.faults.get(path)
+        if faults:
+            status, headers = faults.pop(0)
+            return web.Response(status=status, headers=headers, text=f"HTTP {status}")
+
+        parts = path.strip("/").split("/")
+        if len(parts) == 2 and parts[0] == "tabs":
+            links = "".join(
+                f'<li><a href="/{artist}">{html.escape(artist.replace("_", " ").title())}</a></li>'
+                for artist in sorted(self.artists)
+                if artist.startswith(parts[1])
+            )
+            return web.Response(text=page(f"<ul>{links}</ul>"), content_type="text/html")
+
+        if len(parts) == 1 and parts[0] in self.artists:
+            links = "".join(f'<li><a href="{song}">{song}</a></li>' for song in self.artists[parts[0]])
+            return web.Response(text=page(f"<ul>{links}</ul>"), content_type="text/html")
+
+        if len(parts) == 2 and parts[1].endswith(".shtml"):
+            song = parts[1][: -len(".shtml")]
+            if song in self.artists.get(parts[0], ()):
+                lyrics = LYRICS.format(title=song.replace("_", " ").capitalize())
+                return web.Response(text=page(f"<pre>{html.escape(lyrics)}</pre>"), content_type="text/html")
+
+        return web.Response(status=404, text="Not found")
+
+    async def start(self, host: str = HOST, port: int = 0) -> str:
+        """Starts serving in the running event loop (port 0: any free port). Returns the base URL."""
+        self._runner = web.AppRunner(self.app())
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        host, port = self._runner.addresses[0][:2]
+        return f"http://{host}:{port}"
+
+    async def stop(self):
+        await self._runner.cleanup()
+
+
+@click.command()
+@click.option("--host", default=HOST, show_default=True, help="Address to listen on.")
+@click.option("--port", "-p", default=PORT, show_default=True, help="Port to listen on.")
+def main(host, port):
+    """Serves the stand-in site until interrupted (point the scrapper to it with LACUERDA_ROOT)."""
+    web.run_app(FakeLacuerda().app(), host=host, port=port)
+
+
+if __name__ == "__main__":
+    main()
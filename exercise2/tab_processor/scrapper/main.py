@@ -1,6 +1,10 @@
 import datetime
 import click
 import logging as log
+from pathlib import Path
+import utils.beautifulsoup as bs
+import utils.catalog_store as catalog_store
+import utils.enrichment as enrichment
 import utils.files as files
 import utils.songs as songs
 
@@ -47,14 +51,66 @@ log.basicConfig(
 @click.option(
     "--end_char", "-ec", default="z", help="Ending letter for updating the catalog."
 )
-def main(reset, update_catalog, start_char, end_char):
-    """Main function to run the scrapper. Can reset data, update catalog, or fetch songs."""
+@click.option(
+    "--async_download",
+    "-a",
+    is_flag=True,
+    default=False,
+    help="Download lyrics concurrently with the asyncio engine (rate limited per host).",
+)
+@click.option(
+    "--concurrency", default=8, show_default=True, help="Max. concurrent downloads (with --async_download)."
+)
+@click.option(
+    "--rate", default=2.0, show_default=True, help="Max. requests per second to the host (with --async_download)."
+)
+@click.option(
+    "--workers",
+    "-w",
+    default=1,
+    show_default=True,
+    help="Processes used to build the catalog (one shard per index letter) when greater than 1.",
+)
+@click.option(
+    "--enrich",
+    "-e",
+    is_flag=True,
+    default=False,
+    help="Resume the MusicBrainz enrichment (genres/albums) of the existing catalog.",
+)
+@click.option(
+    "--no_wait_enrichment",
+    is_flag=True,
+    default=False,
+    help="Don't wait for pending MusicBrainz enrichment at the end (resume it later with --enrich).",
+)
+def main(
+    reset,
+    update_catalog,
+    start_char,
+    end_char,
+    async_download,
+    concurrency,
+    rate,
+    workers,
+    enrich,
+    no_wait_enrichment,
+    on_downloaded=None,
+):
+    """Main function to run the scrapper. Can reset data, update catalog, or fetch songs.
+    on_downloaded is not a command line option: the streaming pipeline passes a callable that
+    receives the lyrics path of every downloaded song (see songs.get_songs).
+    """
     print("Starting scrapper...")
 
     # Start time tracking
     start_time = datetime.datetime.now()
     log.info(f"Scrapper started at {start_time}")
 
+    download_options = {"async_download": async_download, "on_downloaded": on_downloaded}
+    if async_download:
+        download_options.update(concurrency=concurrency, rate=rate)
+
     # Reset data if required
     if reset:
         log.info("Remove all downloaded files. Fresh start...")
@@ -63,26 +119,60 @@ def main(reset, update_catalog, start_char, end_char):
     # Si el catálogo NO EXISTE (flujo del orquestador) o se pide actualizar (flujo manual)
     catalog_was_updated = update_catalog or not files.check_file_exists(OUTPUT_DIRECTORY, "catalog.json")
 
+    # Enriquecimiento MusicBrainz en segundo plano: la catalogación y las descargas no lo esperan
+    metadata_cache = enrichment.MetadataCache(Path(OUTPUT_DIRECTORY) / enrichment.METADATA_CACHE_FILE)
+    enricher = None
+
     if catalog_was_updated:
         log.info("Updating catalog...")
-        catalog = songs.get_catalog(
-            OUTPUT_DIRECTORY,
-            start_char=start_char,
-            end_char=end_char,
-        )
-        files.save_to_json(catalog, OUTPUT_DIRECTORY, "catalog.json")
+        enricher = enrichment.EnrichmentWorker(metadata_cache).start()
+        if workers > 1:
+            catalog = songs.get_catalog_parallel(
+                OUTPUT_DIRECTORY,
+                start_char=start_char,
+                end_char=end_char,
+                workers=workers,
+                enrichment=enricher,
+            )
+        else:
+            catalog = songs.get_catalog(
+                OUTPUT_DIRECTORY,
+                start_char=start_char,
+                end_char=end_char,
+                enrichment=enricher,
+            )
+        # Artistas ya enriquecidos en ejecuciones anteriores
+        enrichment.apply_cached_metadata(catalog, metadata_cache)
+        songs.save_catalog(OUTPUT_DIRECTORY, catalog)
         log.info("Catalog updated.")
 
         # Ahora, ejecutamos la descarga de canciones inmediatamente después
         # de la catalogación, SIEMPRE que se haya actualizado el catálogo.
         log.info(f"Starting to download lyrics using the new catalog...")
-        songs.get_songs(OUTPUT_DIRECTORY, version=SONG_VERSION)
+        songs.get_songs(OUTPUT_DIRECTORY, version=SONG_VERSION, **download_options)
 
     # Si el catálogo no se actualizó (y ya existía), la función Get_songs también debe ejecutarse
     # para descargar las canciones que falten.
     elif not catalog_was_updated:
+        if enrich:
+            enricher = enrichment.EnrichmentWorker(metadata_cache).start()
+            with catalog_store.open_catalog_store(OUTPUT_DIRECTORY) as store:
+                for artist in store.iter_artists(with_songs=False):
+                    enricher.enqueue(artist.name)
+
         log.info(f"Starting to download lyrics using existing catalog...")
-        songs.get_songs(OUTPUT_DIRECTORY, version=SONG_VERSION)
+        songs.get_songs(OUTPUT_DIRECTORY, version=SONG_VERSION, **download_options)
+
+    if enricher is not None:
+        log.info(f"Waiting for MusicBrainz enrichment ({enricher.queue.qsize()} artists pending)...")
+        enricher.stop(wait=not no_wait_enrichment)
+        # Solo se actualizan las filas de los artistas; catalog.json se re-exporta en streaming
+        with catalog_store.open_catalog_store(OUTPUT_DIRECTORY) as store:
+            updated = enrichment.store_cached_metadata(store, metadata_cache)
+            store.export_json(OUTPUT_DIRECTORY)
+            log.info(f"Catalog enriched with MusicBrainz metadata: {updated}/{store.count()[0]} artists.")
+
+    bs.log_cache_stats()
 
     duration = datetime.datetime.now() - start_time
     log.info(f"Total duration: {duration}")
@@ -0,0 +1,141 @@
+""" Tests of the asyncio download engine against the local stand-in site (scrapper/fake_lacuerda.py):
+per-host rate limiting, retries with backoff and the Retry-After header of 429 responses.
+
+    python -m pytest scrapper/tests
+"""
+
+import sys
+import tempfile
+import time
+import unittest
+from email.utils import formatdate
+from pathlib import Path
+from unittest import mock
+
+# Los módulos del scrapper se importan como en scrapper/main.py (utils.*)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import utils.async_downloader as async_downloader
+from fake_lacuerda import FakeLacuerda
+
+ARTISTS = {"amaral": [f"song_{i}" for i in range(6)]}
+SONG = "/amaral/song_0.shtml"
+MARGIN = 0.02  # Holgura de los temporizadores del event loop
+
+
+class ParseRetryAfterTest(unittest.TestCase):
+    def test_seconds(self):
+        self.assertEqual(async_downloader.parse_retry_after("3"), 3.0)
+
+    def test_http_date(self):
+        seconds = async_downloader.parse_retry_after(formatdate(time.time() + 5, usegmt=True))
+        self.assertAlmostEqual(seconds, 5, delta=1.5)
+
+    def test_capped_and_invalid(self):
+        self.assertEqual(async_downloader.parse_retry_after("86400"), async_downloader.MAX_RETRY_AFTER)
+        self.assertEqual(async_downloader.parse_retry_after(formatdate(0, usegmt=True)), 0.0)
+        self.assertIsNone(async_downloader.parse_retry_after(None))
+        self.assertIsNone(async_downloader.parse_retry_after("soon"))
+
+
+class AsyncDownloaderTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.site = FakeLacuerda(ARTISTS)
+        self.root = await self.site.start()
+        self.output = tempfile.TemporaryDirectory()
+
+    async def asyncTearDown(self):
+        await self.site.stop()
+        self.output.cleanup()
+
+    def songs(self, count: int = 1) -> list[tuple[str, str, str]]:
+        return [
+            (f"song_{i}", f"{self.root}/amaral/song_{i}.shtml", f"{self.output.name}/amaral/song_{i}.txt")
+            for i in range(count)
+        ]
+
+    async def download(self, songs, **options):
+        options = {"rate": 1000, "burst": 10, "backoff": 0.01, **options}
+        async with async_downloader.AsyncDownloader(**options) as downloader:
+            return await downloader.download_songs(songs)
+
+    async def test_downloads_lyrics(self):
+        results = await self.download(self.songs(3))
+
+        self.assertEqual([r.status for r in results], ["downloaded"] * 3)
+        for _, _, lyrics_path in self.songs(3):
+            self.assertIn("la luna sale por el mar", Path(lyrics_path).read_text(encoding="utf-8"))
+
+    async def test_a_failing_song_does_not_stop_the_others(self):
+        def on_downloaded(lyrics_path):
+            if lyrics_path.endswith("song_1.txt"):
+                raise OSError("disk full")
+
+        results = await self.download(self.songs(3), on_downloaded=on_downloaded)
+
+        statuses = {Path(r.lyrics_path).name: (r.status, r.error) for r in results}
+        self.assertEqual(
+            statuses,
+            {
+                "song_0.txt": ("downloaded", ""),
+                "song_1.txt": ("failed", "disk full"),
+                "song_2.txt": ("downloaded", ""),
+            },
+        )
+
+    async def test_rate_limit_per_host(self):
+        await self.download(self.songs(6), concurrency=6, rate=10, burst=1)
+
+        times = sorted(at for at, _, _ in self.site.requests)
+        self.assertEqual(len(times), 6)
+        for previous, current in zip(times, times[1:]):
+            self.assertGreaterEqual(current - previous, 0.1 - MARGIN)
+
+    async def test_retries_transient_errors(self):
+        self.site.fail(SONG, 503, times=2)
+
+        (result,) = await self.download(self.songs(1))
+
+        self.assertEqual((result.status, result.attempts), ("downloaded", 3))
+        self.assertEqual([status for _, status in self.site.requests_to(SONG)], [503, 503, 200])
+
+    async def test_backoff_grows_exponentially(self):
+        self.site.fail(SONG, 500, times=3)
+
+        # Sin jitter: cada espera es el máximo del intervalo, backoff * 2^intento
+        with mock.patch.object(async_downloader.random, "uniform", side_effect=lambda low, high: high):
+            (result,) = await self.download(self.songs(1), backoff=0.1)
+
+        self.assertEqual(result.attempts, 4)
+        times = [at for at, _ in self.site.requests_to(SONG)]
+        for attempt, (previous, current) in enumerate(zip(times, times[1:])):
+            self.assertGreaterEqual(current - previous, 0.1 * 2**attempt - MARGIN)
+
+    async def test_gives_up_after_retries(self):
+        self.site.fail(SONG, 503, times=10)
+
+        (result,) = await self.download(self.songs(1), retries=2)
+
+        self.assertEqual((result.status, result.attempts, result.error), ("failed", 3, "HTTP 503"))
+        self.assertEqual(len(self.site.requests_to(SONG)), 3)
+        self.assertFalse(Path(result.lyrics_path).exists())
+
+    async def test_client_errors_are_not_retried(self):
+        (result,) = await self.download([("missing", f"{self.root}/amaral/missing.shtml", "unused.txt")])
+
+        self.assertEqual((result.status, result.attempts, result.error), ("failed", 1, "HTTP 404"))
+
+    async def test_honours_retry_after(self):
+        self.site.fail(SONG, 429, retry_after=1)
+
+        results = await self.download(self.songs(3), concurrency=3, rate=10, burst=1)
+
+        self.assertEqual([r.status for r in results], ["downloaded"] * 3)
+        throttled_at = self.site.requests_to(SONG)[0][0]
+        # Después del 429 ninguna petición al host llega antes de lo indicado por Retry-After
+        later = [at for at, _, status in self.site.requests if at > throttled_at]
+        self.assertEqual(len(later), 3)
+        self.assertGreaterEqual(min(later) - throttled_at, 1 - MARGIN)
+
+
+if __name__ == "__main__":
+    unittest.main()
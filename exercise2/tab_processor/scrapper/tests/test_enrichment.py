@@ -0,0 +1,108 @@
+""" Tests of the background MusicBrainz enrichment with FakeMusicBrainzClient (no network):
+JSON Lines cache, rate limit between requests and resuming an interrupted queue.
+
+    python -m pytest scrapper/tests
+"""
+
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+# Los módulos del scrapper se importan como en scrapper/main.py (utils.*)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from utils.enrichment import EnrichmentWorker, FakeMusicBrainzClient, MetadataCache
+
+ARTISTS = {
+    f"Artist {i}": {"id": f"mbid-{i}", "genres": ["rock"], "albums": [f"Album {i}"]} for i in range(5)
+}
+NAMES = list(ARTISTS)
+MARGIN = 0.02  # Holgura de time.sleep
+
+
+class EnrichmentTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache_file = Path(self.directory.name) / "musicbrainz_cache.jsonl"
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def enrich(self, names, client, min_interval=0.0) -> EnrichmentWorker:
+        worker = EnrichmentWorker(MetadataCache(self.cache_file), client, min_interval=min_interval).start()
+        for name in names:
+            worker.enqueue(name)
+        worker.stop(wait=True)
+        return worker
+
+    def test_cache_is_jsonl_and_last_entry_wins(self):
+        cache = MetadataCache(self.cache_file)
+        cache.put("Amaral", "mbid-1", ["pop"], [])
+        cache.put("amaral ", "mbid-1", ["pop", "rock"], ["Pájaros en la cabeza"])
+        with open(self.cache_file, "a", encoding="utf-8") as f:
+            f.write('{"name": "Trunca')  # Escritura interrumpida
+
+        reloaded = MetadataCache(self.cache_file)
+
+        self.assertEqual(len(self.cache_file.read_text(encoding="utf-8").splitlines()), 3)
+        self.assertEqual(list(reloaded.entries), ["amaral"])
+        self.assertEqual(reloaded.get("AMARAL")["albums"], ["Pájaros en la cabeza"])
+
+    def test_appends_after_a_truncated_line(self):
+        MetadataCache(self.cache_file).put("Amaral", "mbid-1", ["pop"], [])
+        with open(self.cache_file, "a", encoding="utf-8") as f:
+            f.write('{"name": "Trunca')  # Escritura interrumpida, sin salto de línea
+
+        MetadataCache(self.cache_file).put("Bunbury", "mbid-2", ["rock"], [])
+        MetadataCache(self.cache_file).put("Mana", "mbid-3", ["pop"], [])
+
+        reloaded = MetadataCache(self.cache_file)
+        self.assertEqual(list(reloaded.entries), ["amaral", "bunbury", "mana"])
+        self.assertTrue(self.cache_file.read_text(encoding="utf-8").endswith("\n"))
+
+    def test_enriches_and_caches_every_artist(self):
+        client = FakeMusicBrainzClient(ARTISTS)
+
+        worker = self.enrich(NAMES + ["Unknown"], client)
+
+        cache = MetadataCache(self.cache_file)
+        self.assertEqual((worker.enriched, worker.failed), (6, 0))
+        entry = cache.get("Artist 3")
+        self.assertEqual((entry["mbid"], entry["genres"], entry["albums"]), ("mbid-3", ["rock"], ["Album 3"]))
+        self.assertIsNone(cache.get("Unknown")["mbid"])
+        # Lo que ya está en caché no se vuelve a pedir
+        self.enrich(NAMES, client)
+        self.assertEqual(len(client.calls), 11)
+
+    def test_rate_limit_between_requests(self):
+        start = time.monotonic()
+        client = FakeMusicBrainzClient(ARTISTS)
+
+        self.enrich(NAMES[:3], client, min_interval=0.05)
+
+        # search_artist + get_artist por artista: 6 peticiones, al menos 5 intervalos entre ellas
+        self.assertEqual(len(client.calls), 6)
+        self.assertGreaterEqual(time.monotonic() - start, 5 * 0.05 - MARGIN)
+
+    def test_resumes_an_interrupted_queue(self):
+        first_client = FakeMusicBrainzClient(ARTISTS)
+        worker = EnrichmentWorker(MetadataCache(self.cache_file), first_client, min_interval=0.2).start()
+        for name in NAMES:
+            worker.enqueue(name)
+        time.sleep(0.1)
+        worker.stop(wait=False)  # Solo termina el artista en curso
+
+        resumed_cache = MetadataCache(self.cache_file)
+        self.assertEqual(list(resumed_cache.entries), ["artist 0"])
+
+        second_client = FakeMusicBrainzClient(ARTISTS)
+        self.enrich(NAMES, second_client)
+
+        self.assertNotIn(("search_artist", "Artist 0"), second_client.calls)
+        self.assertEqual(len(second_client.calls), 8)
+        self.assertEqual(len(MetadataCache(self.cache_file).entries), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
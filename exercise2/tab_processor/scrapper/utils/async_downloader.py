@@ -0,0 +1,269 @@
+import asyncio
+import functools
+import logging as log
+import random
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import aiohttp
+
+import utils.files as files
+from utils.parsing import extract_lyrics
+
+# --- Configuration ---
+DEFAULT_CONCURRENCY = 8  # Max. descargas simultáneas
+DEFAULT_RATE = 2.0  # Peticiones por segundo y host (sustituye al time.sleep(0.5))
+DEFAULT_BURST = 2  # Peticiones que se pueden encadenar sin esperar
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5  # Segundos base para el backoff exponencial
+DEFAULT_TIMEOUT = 10
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRY_AFTER = 60  # Espera máxima (segundos) que se acepta de una cabecera Retry-After
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parses a Retry-After header (delay in seconds or HTTP date).
+    Returns:
+        float | None: Seconds to wait (capped at MAX_RETRY_AFTER), or None if missing or invalid.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        seconds = float(value)
+    else:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError, OverflowError):
+            return None
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+class TokenBucket:
+    """Asyncio token bucket: allows `rate` requests per second with bursts up to `capacity`.
+
+    Args:
+        rate (float): Tokens added per second.
+        capacity (int): Maximum number of tokens stored (burst size).
+    """
+
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._not_before = 0.0
+        self._lock = asyncio.Lock()
+
+    def defer(self, seconds: float):
+        """Holds every request back for `seconds` (e.g. the Retry-After of a 429)."""
+        self._not_before = max(self._not_before, time.monotonic() + seconds)
+
+    async def acquire(self):
+        """Waits until a token is available and consumes it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._not_before:
+                    await asyncio.sleep(self._not_before - now)
+                    continue
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class HostRateLimiter:
+    """Keeps one TokenBucket per host, so every host is rate limited independently."""
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST):
+        self.rate = rate
+        self.burst = burst
+        self._buckets: dict[str, TokenBucket] = {}
+
+    def _bucket(self, url: str) -> TokenBucket:
+        host = urlsplit(url).netloc
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.rate, self.burst)
+        return self._buckets[host]
+
+    async def acquire(self, url: str):
+        await self._bucket(url).acquire()
+
+    def defer(self, url: str, seconds: float):
+        """Holds back the requests to the host of url for `seconds`."""
+        self._bucket(url).defer(seconds)
+
+
+@dataclass
+class DownloadResult:
+    """Outcome of a single song download."""
+
+    song_name: str
+    song_url: str
+    lyrics_path: str
+    status: str  # "downloaded" | "empty" | "failed"
+    attempts: int = 0
+    error: str = ""
+
+
+class AsyncDownloader:
+    """Asyncio download engine with a shared connection pool, per-host token bucket rate limiting,
+    bounded concurrency and retries with jittered exponential backoff. A Retry-After header on a
+    retried response (429, 503...) holds back every request to that host for the given time.
+
+    Args:
+        concurrency (int): Max. number of requests in flight.
+        rate (float): Max. requests per second per host.
+        burst (int): Token bucket capacity per host.
+        retries (int): Retries per URL after the first attempt.
+        backoff (float): Base delay (seconds) of the exponential backoff.
+        timeout (int): Total timeout per request in seconds.
+        make_dirs (bool): Create the parent directory of every lyrics file (False if already created).
+        on_downloaded (callable): Called with the lyrics path of every downloaded song. It runs in a
+            thread, so it may block (backpressure) without stopping the event loop.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        rate: float = DEFAULT_RATE,
+        burst: int = DEFAULT_BURST,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+        timeout: int = DEFAULT_TIMEOUT,
+        make_dirs: bool = True,
+        on_downloaded=None,
+    ):
+        self.concurrency = concurrency
+        self.make_dirs = make_dirs
+        self.on_downloaded = on_downloaded
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.rate_limiter = HostRateLimiter(rate, burst)
+        self._semaphore = None
+        self._session = None
+
+    async def __aenter__(self):
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.concurrency)
+        self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._session.close()
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Full jitter: random delay in [0, backoff * 2^attempt]."""
+        return random.uniform(0, self.backoff * (2**attempt))
+
+    async def fetch_text(self, url: str) -> tuple[str | None, int, str]:
+        """Fetches a URL, retrying transient errors.
+        Returns:
+            tuple: (text or None, number of attempts, last error message).
+        """
+        error = ""
+        for attempt in range(self.retries + 1):
+            await self.rate_limiter.acquire(url)
+            retry_after = None
+            try:
+                async with self._semaphore:
+                    async with self._session.get(url) as response:
+                        if response.status in RETRY_STATUSES:
+                            error = f"HTTP {response.status}"
+                            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                        else:
+                            response.raise_for_status()
+                            return await response.text(errors="replace"), attempt + 1, ""
+            except aiohttp.ClientResponseError as e:
+                # 4xx distintos de 429: no tiene sentido reintentar
+                return None, attempt + 1, f"HTTP {e.status}"
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = str(e) or e.__class__.__name__
+
+            if retry_after is not None:
+                # El servidor indica cuánto esperar: se frena todo el host, no solo este reintento
+                self.rate_limiter.defer(url, retry_after)
+            if attempt < self.retries:
+                delay = max(self._backoff_delay(attempt), retry_after or 0.0)
+                log.warning(f"Retrying {url} in {delay:.2f}s ({error})")
+                await asyncio.sleep(delay)
+
+        return None, self.retries + 1, error
+
+    async def download_song(self, song_name: str, song_url: str, lyrics_path: str) -> DownloadResult:
+        """Downloads one song page and writes its lyrics to lyrics_path."""
+        html, attempts, error = await self.fetch_text(song_url)
+        if html is None:
+            log.error(f"Error fetching song '{song_name}' from {song_url}: {error}")
+            return DownloadResult(song_name, song_url, lyrics_path, "failed", attempts, error)
+
+        text = extract_lyrics(html)
+        if not text:
+            log.info(f"No lyrics found for '{song_name}' ({song_url})")
+            return DownloadResult(song_name, song_url, lyrics_path, "empty", attempts)
+
+        # La escritura bloquea: se hace en un hilo para no parar el event loop
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            None, functools.partial(files.write_string_to_file, lyrics_path, text=text, make_dirs=self.make_dirs)
+        )
+        log.info("song --> %s - url --> %s downloaded", song_name, song_url)
+        if self.on_downloaded is not None:
+            # Si el consumidor va lento, este worker espera (y con él, sus siguientes descargas)
+            await loop.run_in_executor(None, self.on_downloaded, lyrics_path)
+        return DownloadResult(song_name, song_url, lyrics_path, "downloaded", attempts)
+
+    async def download_songs(self, songs: list[tuple[str, str, str]]) -> list[DownloadResult]:
+        """Downloads a list of (song_name, song_url, lyrics_path) concurrently."""
+        # Pool de `concurrency` workers sobre una cola: memoria acotada aunque el catálogo sea enorme
+        queue: asyncio.Queue = asyncio.Queue()
+        for song in songs:
+            queue.put_nowait(song)
+
+        results: list[DownloadResult] = []
+
+        async def worker():
+            while True:
+                try:
+                    song_name, song_url, lyrics_path = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                # Un error en una canción (escritura, parseo, on_downloaded) no para el resto de la descarga
+                try:
+                    result = await self.download_song(song_name, song_url, lyrics_path)
+                except Exception as e:
+                    error = str(e) or e.__class__.__name__
+                    log.error(f"Error downloading song '{song_name}' from {song_url}: {error}")
+                    result = DownloadResult(song_name, song_url, lyrics_path, "failed", error=error)
+                results.append(result)
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        return results
+
+
+def download_songs(songs: list[tuple[str, str, str]], **downloader_options) -> list[DownloadResult]:
+    """Synchronous entry point: runs the async engine over a list of (song_name, song_url, lyrics_path).
+    Args:
+        songs (list[tuple]): Songs to download.
+        **downloader_options: Options passed to AsyncDownloader (concurrency, rate, retries...).
+    Returns:
+        list[DownloadResult]: One result per song.
+    """
+
+    async def _run():
+        async with AsyncDownloader(**downloader_options) as downloader:
+            return await downloader.download_songs(songs)
+
+    start = time.perf_counter()
+    results = asyncio.run(_run())
+    elapsed = time.perf_counter() - start
+
+    summary = {status: sum(1 for r in results if r.status == status) for status in ("downloaded", "empty", "failed")}
+    log.info(f"Async download finished in {elapsed:.2f}s: {summary}")
+    return results
@@ -1,6 +1,111 @@
+import hashlib
+import json
 import requests
 import logging as log
+from collections import Counter
+from pathlib import Path
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from utils.parsing import PARSER
+
+# --- Configuration ---
+CACHE_DIRECTORY = Path("./files/http_cache/")
+POOL_SIZE = 10
+TIMEOUT = 10
+
+# Sesión HTTP compartida: reutiliza conexiones TCP/TLS (keep-alive) entre peticiones
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE))
+_session.mount("http://", HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE))
+
+# Métricas de la caché para esta ejecución: hit (304), miss (200), uncached (sin validadores), error
+cache_stats = Counter()
+
+
+def _cache_key(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def _read_cache(key: str) -> tuple[dict, str | None]:
+    """Returns (metadata, body) of a cached response, or ({}, None) if not cached."""
+    meta_path = CACHE_DIRECTORY / f"{key}.json"
+    body_path = CACHE_DIRECTORY / f"{key}.html"
+    if not meta_path.is_file() or not body_path.is_file():
+        return {}, None
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        with open(body_path, "r", encoding="utf-8") as f:
+            return meta, f.read()
+    except (OSError, json.JSONDecodeError) as e:
+        log.warning(f"Ignoring broken HTTP cache entry {key}: {e}")
+        return {}, None
+
+
+def _write_cache(key: str, url: str, response: requests.Response) -> dict:
+    """Stores the body and validators (ETag / Last-Modified) of a response.
+    Returns the stored metadata ({} if the response can't be revalidated and wasn't stored).
+    """
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if not etag and not last_modified:
+        # Sin validadores no se puede revalidar: no merece la pena guardar la página
+        return {}
+
+    meta = {"url": url, "etag": etag, "last_modified": last_modified}
+    CACHE_DIRECTORY.mkdir(parents=True, exist_ok=True)
+    with open(CACHE_DIRECTORY / f"{key}.html", "w", encoding="utf-8") as f:
+        f.write(response.text)
+    _write_meta(key, meta)
+    return meta
+
+
+def _write_meta(key: str, meta: dict):
+    with open(CACHE_DIRECTORY / f"{key}.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+
+def _fetch(url, cache: bool = True) -> tuple[str | None, bool, dict]:
+    """Conditional GET through the pooled session (plain GET if cache is False).
+    Returns:
+        tuple: (html or None on error, True if not modified (304), cache metadata of the page).
+    """
+    key = _cache_key(url)
+    meta, cached_body = _read_cache(key) if cache else ({}, None)
+
+    headers = {}
+    if cached_body is not None:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    try:
+        response = _session.get(url, headers=headers, timeout=TIMEOUT)
+        if response.status_code == 304 and cached_body is not None:
+            cache_stats["hit"] += 1
+            return cached_body, True, meta
+
+        response.raise_for_status()  # Raise an HTTPError for bad responses (4xx or 5xx)
+        meta = _write_cache(key, url, response) if cache else {}
+        cache_stats["miss" if meta else "uncached"] += 1
+        return response.text, False, meta
+    except requests.exceptions.RequestException as e:
+        cache_stats["error"] += 1
+        log.error(f"Error fetching {url}: {e}")
+        return None, False, {}
+
+
+def fetch_html(url, cache: bool = True) -> tuple[str | None, bool]:
+    """Fetches a URL through the pooled session, revalidating cached pages with a conditional GET.
+    Args:
+        url (str): The URL to fetch.
+        cache (bool, optional): Store / revalidate the page in the disk cache. Defaults to True.
+    Returns:
+        tuple: (html or None on error, True if the page was served from the cache (304)).
+    """
+    html, not_modified, _ = _fetch(url, cache)
+    return html, not_modified
 
 
 def get_soup(url) -> BeautifulSoup | None:
@@ -10,10 +115,43 @@ def get_soup(url) -> BeautifulSoup | None:
     Returns:
         BeautifulSoup | None: A BeautifulSoup object if the request is successful, None otherwise.
     """
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()  # Raise an HTTPError for bad responses (4xx or 5xx)
-        return BeautifulSoup(response.text, "html.parser")
-    except requests.exceptions.RequestException as e:
-        log.error(f"Error fetching {url}: {e}")
+    html, _ = fetch_html(url)
+    if html is None:
         return None
+    return BeautifulSoup(html, PARSER)
+
+
+def get_extracted(url, extractor) -> list | dict | None:
+    """Fetches a URL and returns extractor(html), reusing the stored result when the page is unchanged.
+    The result is saved next to the cached page, so a 304 costs neither the download nor the re-parse.
+    Args:
+        url (str): The URL to fetch.
+        extractor (callable): Function html -> JSON-serializable result (see utils.parsing).
+    Returns:
+        The extracted result, or None if the request failed.
+    """
+    html, not_modified, meta = _fetch(url)
+    if html is None:
+        return None
+
+    extracted = meta.get("extracted", {})
+    if not_modified and extractor.__name__ in extracted:
+        return extracted[extractor.__name__]
+
+    result = extractor(html)
+    if meta:
+        extracted[extractor.__name__] = result
+        meta["extracted"] = extracted
+        _write_meta(_cache_key(url), meta)
+    return result
+
+
+def log_cache_stats():
+    """Logs the HTTP cache hit/miss metrics of the current run."""
+    requests_done = sum(cache_stats.values())
+    hit_ratio = cache_stats["hit"] / requests_done if requests_done else 0.0
+    log.info(
+        f"HTTP cache: requests={requests_done}, hits(304)={cache_stats['hit']}, "
+        f"misses={cache_stats['miss']}, uncached={cache_stats['uncached']}, "
+        f"errors={cache_stats['error']}, hit ratio={hit_ratio:.1%}"
+    )
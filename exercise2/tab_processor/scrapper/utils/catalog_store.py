@@ -0,0 +1,295 @@
+""" Indexed catalog store (SQLite) for the scrapper.
+Artists and songs are kept in a single file with one row per artist / song, so the catalog can be
+read as a stream, an artist can be read or updated on its own and catalog.json is only an export. """
+
+import hashlib
+import json
+import sqlite3
+import logging as log
+from pathlib import Path
+from typing import Iterator
+
+import utils.files as files
+from utils.data import Song, Artist
+
+# --- Configuration ---
+CATALOG_DB_FILE = "catalog.db"
+CATALOG_JSON_FILE = "catalog.json"
+# Versión 2: los artistas se identifican por su id (dos artistas pueden tener el mismo nombre)
+SCHEMA_VERSION = 2
+
+ARTISTS_TABLE = """
+CREATE TABLE IF NOT EXISTS {name} (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    url TEXT NOT NULL,
+    letter TEXT NOT NULL,
+    genres TEXT NOT NULL DEFAULT '[]',
+    albums TEXT NOT NULL DEFAULT '[]'
+);
+"""
+
+SCHEMA = ARTISTS_TABLE.format(name="artists") + """
+CREATE TABLE IF NOT EXISTS songs (
+    id INTEGER PRIMARY KEY,
+    artist_id INTEGER NOT NULL REFERENCES artists(id) ON DELETE CASCADE,
+    song_title TEXT NOT NULL,
+    song_url TEXT NOT NULL,
+    genre TEXT NOT NULL DEFAULT '',
+    lyrics_path TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_artists_letter ON artists(letter);
+CREATE INDEX IF NOT EXISTS idx_artists_name ON artists(name);
+CREATE INDEX IF NOT EXISTS idx_songs_artist ON songs(artist_id);
+"""
+
+
+def artist_letter(name: str) -> str:
+    """Index letter of an artist (first character of its name, lower case)."""
+    return name[:1].lower()
+
+
+def file_stat(path: Path) -> str:
+    """Size and modification time of a file (cheap check before hashing it)."""
+    stat = path.stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class CatalogStore:
+    """SQLite catalog: streaming reads, per-artist access and single-artist updates.
+
+    Args:
+        path (Path): The database file (created if it doesn't exist).
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(self.path)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self._migrate()
+        self.connection.executescript(SCHEMA)
+
+    def _migrate(self):
+        """Upgrades a store of an older schema in place (version 1 had artists unique by name)."""
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if version == SCHEMA_VERSION:
+            return
+        has_artists = self.connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'artists'"
+        ).fetchone()
+        if has_artists:
+            # Se recrea la tabla sin la restricción (procedimiento de SQLite para cambiar una tabla)
+            self.connection.execute("PRAGMA foreign_keys = OFF")
+            self.connection.executescript(
+                "BEGIN;"
+                + ARTISTS_TABLE.format(name="artists_new")
+                + "INSERT INTO artists_new SELECT id, name, url, letter, genres, albums FROM artists;"
+                "DROP TABLE artists;"
+                "ALTER TABLE artists_new RENAME TO artists;"
+                f"PRAGMA user_version = {SCHEMA_VERSION};"
+                "COMMIT;"
+            )
+            self.connection.execute("PRAGMA foreign_keys = ON")
+            log.info(f"Catalog store {self.path} upgraded from schema {version or 1} to {SCHEMA_VERSION}")
+        else:
+            self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def get_meta(self, key: str) -> str | None:
+        row = self.connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        with self.connection:
+            self.connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- Writes ---
+    def _put(self, artist: Artist):
+        """Inserts or replaces an artist (by id) and its songs (no commit)."""
+        self.connection.execute(
+            "INSERT OR REPLACE INTO artists (id, name, url, letter, genres, albums) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                artist.id,
+                artist.name,
+                artist.url,
+                artist_letter(artist.name),
+                json.dumps(artist.genres, ensure_ascii=False),
+                json.dumps(artist.albums, ensure_ascii=False),
+            ),
+        )
+        # INSERT OR REPLACE no dispara el borrado en cascada: las canciones se reemplazan explícitamente
+        self.connection.execute("DELETE FROM songs WHERE artist_id = ?", (artist.id,))
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO songs (id, artist_id, song_title, song_url, genre, lyrics_path) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    song.id,
+                    artist.id,
+                    song.song_title,
+                    song.song_url,
+                    song.genre,
+                    str(song.lyrics_path) if song.lyrics_path is not None else None,
+                )
+                for song in artist.songs
+            ],
+        )
+
+    def put_artist(self, artist: Artist):
+        """Appends or updates a single artist (and its songs) without touching the rest of the catalog."""
+        with self.connection:
+            self._put(artist)
+
+    def replace_catalog(self, artists: list[Artist]):
+        """Replaces the whole catalog in a single transaction."""
+        with self.connection:
+            self.connection.execute("DELETE FROM songs")
+            self.connection.execute("DELETE FROM artists")
+            for artist in artists:
+                self._put(artist)
+        log.info(f"Catalog store {self.path} saved: {len(artists)} artists")
+
+    def update_metadata(self, metadata: list[tuple[str, list[str], list[str]]]) -> int:
+        """Updates the genres/albums of artists in place, in a single transaction.
+        Args:
+            metadata (list[tuple]): (artist name, genres, albums) per artist. Metadata is looked up by
+                name, so every artist with that name gets it.
+        Returns:
+            int: Number of artists updated.
+        """
+        with self.connection:
+            cursor = self.connection.executemany(
+                "UPDATE artists SET genres = ?, albums = ? WHERE name = ?",
+                [
+                    (json.dumps(genres, ensure_ascii=False), json.dumps(albums, ensure_ascii=False), name)
+                    for name, genres, albums in metadata
+                ],
+            )
+        return cursor.rowcount
+
+    # --- Reads ---
+    def count(self) -> tuple[int, int]:
+        """Returns (number of artists, number of songs)."""
+        artists = self.connection.execute("SELECT COUNT(*) FROM artists").fetchone()[0]
+        songs = self.connection.execute("SELECT COUNT(*) FROM songs").fetchone()[0]
+        return artists, songs
+
+    def _artist_from_row(self, row, with_songs: bool = True) -> Artist:
+        artist_id, name, url, genres, albums = row
+        songs = list(self.iter_songs(artist_id)) if with_songs else None
+        return Artist.from_record(artist_id, name, url, json.loads(genres), json.loads(albums), songs)
+
+    def get_artist(self, name: str) -> Artist | None:
+        """Reads a single artist (with its songs) by name (the first one if several share it)."""
+        row = self.connection.execute(
+            "SELECT id, name, url, genres, albums FROM artists WHERE name = ? ORDER BY id", (name,)
+        ).fetchone()
+        return self._artist_from_row(row) if row else None
+
+    def iter_artists(self, letter: str = None, with_songs: bool = True) -> Iterator[Artist]:
+        """Streams the artists in catalog order (optionally only those of one index letter)."""
+        query = "SELECT id, name, url, genres, albums FROM artists"
+        params = ()
+        if letter is not None:
+            query += " WHERE letter = ?"
+            params = (letter.lower(),)
+        # Cursor propio: las canciones de cada artista se leen con otro mientras se itera este
+        for row in self.connection.cursor().execute(query + " ORDER BY id", params):
+            yield self._artist_from_row(row, with_songs)
+
+    def iter_songs(self, artist_id: int = None) -> Iterator[Song]:
+        """Streams the songs of the catalog (or of one artist) in catalog order."""
+        query = "SELECT id, song_title, song_url, genre, lyrics_path FROM songs"
+        params = ()
+        if artist_id is not None:
+            query += " WHERE artist_id = ?"
+            params = (artist_id,)
+        for row in self.connection.cursor().execute(query + " ORDER BY id", params):
+            yield Song.from_record(*row)
+
+    # --- catalog.json compatibility ---
+    def export_json(self, output_directory: str, file_name: str = CATALOG_JSON_FILE) -> Path:
+        """Writes catalog.json (same format as files.save_to_json) one artist at a time."""
+        file_path = Path(output_directory) / file_name
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        exported = 0
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write("[")
+            for artist in self.iter_artists():
+                f.write(",\n  " if exported else "\n  ")
+                f.write(json.dumps(artist.to_dict(), indent=2, ensure_ascii=False).replace("\n", "\n  "))
+                exported += 1
+            f.write("\n]" if exported else "]")
+        log.info(f"Exported {exported} artists to {file_path}")
+        # El fichero exportado ya está en la base de datos: no hay que volver a importarlo
+        self.record_json(file_path)
+        return file_path
+
+    def record_json(self, catalog_path: Path):
+        """Remembers the catalog.json the store is in sync with (see sync_json)."""
+        catalog_path = Path(catalog_path)
+        self.set_meta("json_stat", file_stat(catalog_path))
+        self.set_meta("json_hash", file_hash(catalog_path))
+
+    def import_json(self, catalog_path: Path) -> bool:
+        """Loads a catalog.json into the store, replacing its contents."""
+        raw_catalog = files.load_from_json(Path(catalog_path))
+        if raw_catalog is None:
+            return False
+        # from_dict conserva los IDs del fichero
+        self.replace_catalog([Artist.from_dict(artist_data) for artist_data in raw_catalog])
+        self.record_json(catalog_path)
+        return True
+
+    def sync_json(self, catalog_path: Path) -> bool:
+        """Imports catalog.json if it changed since it was last imported or exported (e.g. a catalog
+        saved before the store existed, or edited or replaced by hand).
+        Returns:
+            bool: True if it was imported.
+        """
+        catalog_path = Path(catalog_path)
+        if not catalog_path.is_file():
+            return False
+        stat = file_stat(catalog_path)
+        if stat == self.get_meta("json_stat"):
+            return False
+        if file_hash(catalog_path) == self.get_meta("json_hash"):
+            # Mismo contenido (ej. fichero copiado o tocado): solo cambia su fecha
+            self.set_meta("json_stat", stat)
+            return False
+        log.info(f"Importing {catalog_path} into {self.path}")
+        return self.import_json(catalog_path)
+
+
+def open_catalog_store(output_directory: str, sync_json: bool = True) -> CatalogStore:
+    """Opens the catalog store of an output directory, importing catalog.json when it is newer than
+    the store (see CatalogStore.sync_json).
+    Args:
+        output_directory (str): The base directory of the scrapper output.
+        sync_json (bool, optional): Set to False when the whole catalog is about to be replaced.
+    """
+    store = CatalogStore(Path(output_directory) / CATALOG_DB_FILE)
+    if sync_json:
+        store.sync_json(Path(output_directory) / CATALOG_JSON_FILE)
+    return store
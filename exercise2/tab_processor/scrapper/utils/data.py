@@ -1,7 +1,6 @@
 import musicbrainzngs
 import utils.files as files
-from dataclasses import dataclass, asdict, field
-from pathlib import Path
+from dataclasses import dataclass, field
 
 # --- Config ---
 
@@ -10,7 +9,9 @@ musicbrainzngs.set_useragent("MyMusicApp", "1.0", "myemail@example.com")
 
 
 # --- Data Structures ---
-@dataclass
+# slots=True: sin __dict__ por instancia. Con cientos de miles de canciones el catálogo ocupa
+# bastante menos memoria y se carga más rápido (ver scrapper/catalog_benchmark.py)
+@dataclass(slots=True)
 class Song:
     """Represents a song with its metadata.
 
@@ -19,14 +20,14 @@ class Song:
         song_title (str): The title of the song.
         song_url (str): The URL to the song's page on lacuerda.net.
         genre (str): The genre of the song (if available).
-        lyrics_path (Path): The local file path where the song's lyrics are stored.
+        lyrics_path (str): The local file path where the song's lyrics are stored (normalized).
     """
 
     id: int = field(init=False)  # Auto-generated ID
     song_title: str
     song_url: str
     genre: str = ""  # Placeholder, as lacuerda.net doesn't provide genre directly
-    lyrics_path: Path = None  # Path where the lyric file would be stored
+    lyrics_path: str = None  # Path where the lyric file would be stored
 
     # Class variable to track next available ID
     _id_counter = 1
@@ -43,26 +44,46 @@ class Song:
              self.lyrics_path = files.normalize_relative_path(self.lyrics_path)
 
     def to_dict(self):
-        return asdict(self)
+        return {
+            "id": self.id,
+            "song_title": self.song_title,
+            "song_url": self.song_url,
+            "genre": self.genre,
+            "lyrics_path": self.lyrics_path,
+        }
+
+    @classmethod
+    def from_record(cls, song_id: int, song_title: str, song_url: str, genre: str, lyrics_path: str):
+        """Rebuilds a stored song as is: keeps its ID and its already normalized lyrics_path
+        (no __post_init__, no Path objects). Used when loading a saved catalog.
+        """
+        song = cls.__new__(cls)
+        song.id = song_id
+        song.song_title = song_title
+        song.song_url = song_url
+        song.genre = genre
+        song.lyrics_path = lyrics_path
+        if song_id >= cls._id_counter:
+            cls._id_counter = song_id + 1
+        return song
 
     @staticmethod
     def from_dict(data):
-        # Remove id from data if present (it will be auto-generated)
-        data_copy = data.copy()
-        data_copy.pop("id", None)
-
-        # Ensure lyrics_path is a Path object if it exists
-        if "lyrics_path" in data_copy and data_copy["lyrics_path"]:
-            data_copy["lyrics_path"] = Path(data_copy["lyrics_path"])
-
-        song = Song(**data_copy)
-
-        # If the original data had an ID and it's higher than our counter,
-        # update the counter to avoid conflicts
-        if "id" in data and data["id"] >= Song._id_counter:
-            Song._id_counter = data["id"] + 1
-
-        return song
+        if "id" in data:
+            # Canción guardada: su ruta ya se normalizó al crear el catálogo
+            return Song.from_record(
+                data["id"],
+                data["song_title"],
+                data["song_url"],
+                data.get("genre", ""),
+                data.get("lyrics_path"),
+            )
+        return Song(
+            song_title=data["song_title"],
+            song_url=data["song_url"],
+            genre=data.get("genre", ""),
+            lyrics_path=data.get("lyrics_path"),
+        )
 
     @classmethod
     def reset_id_counter(cls, start_value=1):
@@ -70,7 +91,7 @@ class Song:
         cls._id_counter = start_value
 
 
-@dataclass
+@dataclass(slots=True)
 class Artist:
     """Represents an artist with their name, URL, and a list of their songs.
 
@@ -107,15 +128,20 @@ class Artist:
 
     def to_dict(self):
         """Converts the Artist object to a dictionary, including its nested songs."""
-        data = asdict(self)
+        data = self.to_dict_no_songs()
         data["songs"] = [song.to_dict() for song in self.songs]
         return data
 
     def to_dict_no_songs(self):
         """Converts the Artist object to a dictionary, excluding its nested songs."""
-        data = asdict(self)
-        data.pop("songs", None)
-        return data
+        # Sin asdict: evita copiar recursivamente las canciones para luego descartarlas
+        return {
+            "id": self.id,
+            "name": self.name,
+            "url": self.url,
+            "genres": list(self.genres),
+            "albums": list(self.albums),
+        }
 
     def fetch_metadata(self):
         """Fetch artist metadata like tags (genres), albums, and description."""
@@ -141,24 +167,55 @@ class Artist:
         except Exception as e:
             print(f"Error fetching data for {self.name}: {e}")
 
+    @classmethod
+    def from_record(cls, artist_id: int, name: str, url: str, genres: list[str], albums: list[str], songs: list[Song] = None):
+        """Rebuilds a stored artist as is, keeping its ID (no __post_init__). Used when loading a saved catalog."""
+        artist = cls.__new__(cls)
+        artist.id = artist_id
+        artist.name = name
+        artist.url = url
+        artist.genres = genres
+        artist.albums = albums
+        artist.songs = songs if songs is not None else []
+        if artist_id >= cls._id_counter:
+            cls._id_counter = artist_id + 1
+        return artist
+
     @staticmethod
     def from_dict(data):
         """Creates an Artist object from a dictionary, reconstructing nested songs."""
-        data_copy = data.copy()
-        data_copy.pop("id", None)  # Remove id (will be auto-generated)
-
-        songs_data = data_copy.pop("songs", [])
-        artist = Artist(**data_copy)
-        artist.songs = [Song.from_dict(s_data) for s_data in songs_data]
-
-        # If the original data had an ID and it's higher than our counter,
-        # update the counter to avoid conflicts
-        if "id" in data and data["id"] >= Artist._id_counter:
-            Artist._id_counter = data["id"] + 1
-
-        return artist
+        songs = [Song.from_dict(s_data) for s_data in data.get("songs", [])]
+        if "id" in data:
+            return Artist.from_record(
+                data["id"], data["name"], data["url"], data.get("genres", []), data.get("albums", []), songs
+            )
+        return Artist(
+            name=data["name"],
+            url=data["url"],
+            genres=data.get("genres", []),
+            albums=data.get("albums", []),
+            songs=songs,
+        )
 
     @classmethod
     def reset_id_counter(cls, start_value=1):
         """Reset the ID counter (useful for testing or reinitialization)."""
         cls._id_counter = start_value
+
+
+def assign_ids(artists: list[Artist]):
+    """Assigns deterministic, sequential IDs in catalog order (artists and songs).
+    Used after building or merging a catalog, so IDs don't depend on the class counters
+    (which are per-process state and can't be shared by parallel workers).
+    Args:
+        artists (list[Artist]): The catalog, in its final order.
+    """
+    song_id = 1
+    for artist_id, artist in enumerate(artists, start=1):
+        artist.id = artist_id
+        for song in artist.songs:
+            song.id = song_id
+            song_id += 1
+
+    Artist.reset_id_counter(len(artists) + 1)
+    Song.reset_id_counter(song_id)
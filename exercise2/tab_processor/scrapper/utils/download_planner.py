@@ -0,0 +1,84 @@
+""" Download planner: finds the songs of the catalog that are still missing with a single scan of
+files/songs/, instead of one stat (and one makedirs) per song. """
+
+import os
+import time
+import logging as log
+from dataclasses import dataclass, field
+from typing import Iterable
+
+from utils.data import Song
+
+
+@dataclass
+class DownloadPlan:
+    """Songs still to download and the directories they need.
+
+    Attributes:
+        pending (list[Song]): Songs whose lyrics file doesn't exist yet.
+        existing (int): Songs already downloaded (skipped).
+        directories (set[str]): Artist directories that must be created before downloading.
+    """
+
+    pending: list[Song] = field(default_factory=list)
+    existing: int = 0
+    directories: set[str] = field(default_factory=set)
+
+    def create_directories(self):
+        """Creates every missing artist directory once."""
+        for directory in sorted(self.directories):
+            os.makedirs(directory, exist_ok=True)
+        self.directories.clear()
+
+
+def scan_directory(directory: str) -> tuple[set[str], set[str]]:
+    """Lists a directory tree once.
+    Returns:
+        tuple: (normalized paths of the files, normalized paths of the directories).
+    """
+    found_files, found_directories = set(), set()
+    for root, _, file_names in os.walk(directory):
+        root = os.path.normpath(root)
+        found_directories.add(root)
+        for file_name in file_names:
+            found_files.add(os.path.join(root, file_name))
+    return found_files, found_directories
+
+
+def plan_downloads(songs: Iterable[Song], songs_directory: str) -> DownloadPlan:
+    """Diffs the catalog against the files already in songs_directory.
+    Args:
+        songs (Iterable[Song]): Songs of the catalog (e.g. streamed from the catalog store).
+        songs_directory (str): Directory where the lyrics are saved (files/songs/).
+    Returns:
+        DownloadPlan: The songs to download and the directories to create.
+    """
+    start = time.perf_counter()
+    root = os.path.normpath(songs_directory)
+    found_files, found_directories = scan_directory(root)
+
+    plan = DownloadPlan()
+    for song in songs:
+        if song.lyrics_path is None:
+            continue
+        path = os.path.normpath(song.lyrics_path)
+        if path.startswith(root + os.sep):
+            exists = path in found_files
+        else:
+            # Ruta fuera del directorio escaneado: comprobación individual
+            exists = os.path.isfile(path)
+
+        if exists:
+            plan.existing += 1
+            continue
+
+        plan.pending.append(song)
+        directory = os.path.dirname(path)
+        if directory and directory not in found_directories:
+            plan.directories.add(directory)
+
+    log.info(
+        f"Download plan in {time.perf_counter() - start:.2f}s: {len(plan.pending)} pending, "
+        f"{plan.existing} already downloaded, {len(plan.directories)} new artist directories"
+    )
+    return plan
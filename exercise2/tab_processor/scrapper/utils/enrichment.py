@@ -0,0 +1,210 @@
+import json
+import queue
+import threading
+import time
+import logging as log
+import musicbrainzngs
+from datetime import datetime
+from pathlib import Path
+
+# --- Configuration ---
+METADATA_CACHE_FILE = "musicbrainz_cache.jsonl"
+MIN_REQUEST_INTERVAL = 1.0  # MusicBrainz permite 1 petición por segundo
+
+
+# --- Clients ---
+class MusicBrainzClient:
+    """Thin wrapper over musicbrainzngs with the two calls used for enrichment."""
+
+    def __init__(self):
+        musicbrainzngs.set_useragent("MyMusicApp", "1.0", "myemail@example.com")
+
+    def search_artist(self, name: str) -> str | None:
+        """Returns the MBID of the best match for an artist name, or None."""
+        results = musicbrainzngs.search_artists(artist=name, limit=1)
+        if results["artist-list"]:
+            return results["artist-list"][0]["id"]
+        return None
+
+    def get_artist(self, mbid: str) -> dict:
+        """Returns {"genres": [...], "albums": [...]} for an MBID."""
+        details = musicbrainzngs.get_artist_by_id(mbid, includes=["tags", "releases"])
+        genres = [tag["name"] for tag in details["artist"].get("tag-list", [])]
+        albums = list({r["title"] for r in details.get("release-list", [])})
+        return {"genres": genres, "albums": albums}
+
+
+class FakeMusicBrainzClient:
+    """Offline stand-in for MusicBrainzClient (tests, local runs without network).
+
+    Args:
+        artists (dict): Artist name -> {"id": mbid, "genres": [...], "albums": [...]}.
+    """
+
+    def __init__(self, artists: dict | None = None):
+        self.artists = {name.lower(): data for name, data in (artists or {}).items()}
+        self.calls = []
+
+    def search_artist(self, name: str) -> str | None:
+        self.calls.append(("search_artist", name))
+        data = self.artists.get(name.lower())
+        return data["id"] if data else None
+
+    def get_artist(self, mbid: str) -> dict:
+        self.calls.append(("get_artist", mbid))
+        for data in self.artists.values():
+            if data["id"] == mbid:
+                return {"genres": list(data.get("genres", [])), "albums": list(data.get("albums", []))}
+        raise musicbrainzngs.ResponseError(cause=f"Unknown MBID {mbid}")
+
+
+# --- Persistent cache ---
+class MetadataCache:
+    """Persistent artist metadata cache (JSON Lines, append-only, last entry per artist wins).
+    Each result is appended as soon as it is fetched, so an interrupted enrichment resumes
+    where it stopped.
+
+    Args:
+        path (Path): The JSON Lines file.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.entries: dict[str, dict] = {}
+        # Si la última línea quedó a medias, la siguiente entrada se escribe en una línea nueva
+        self._partial_line = False
+        if self.path.is_file():
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    self._partial_line = not line.endswith("\n")
+                    try:
+                        entry = json.loads(line)
+                        self.entries[self.key(entry["name"])] = entry
+                    except (json.JSONDecodeError, KeyError):
+                        continue  # Línea truncada por una interrupción: se ignora
+
+    @staticmethod
+    def key(name: str) -> str:
+        return name.strip().lower()
+
+    def get(self, name: str) -> dict | None:
+        return self.entries.get(self.key(name))
+
+    def put(self, name: str, mbid: str | None, genres: list[str], albums: list[str]):
+        entry = {
+            "name": name,
+            "mbid": mbid,
+            "genres": genres,
+            "albums": albums,
+            "fetched_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        with self._lock:
+            self.entries[self.key(name)] = entry
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                if self._partial_line:
+                    f.write("\n")
+                    self._partial_line = False
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+# --- Background worker ---
+class EnrichmentWorker:
+    """Background thread that enriches artists from a queue, respecting the MusicBrainz rate limit
+    and persisting every result in a MetadataCache. Artists already cached are not requested again.
+
+    Args:
+        cache (MetadataCache): Persistent cache for the results.
+        client: MusicBrainzClient or any object with search_artist / get_artist (e.g. FakeMusicBrainzClient).
+        min_interval (float): Minimum seconds between two requests.
+    """
+
+    _STOP = object()
+
+    def __init__(self, cache: MetadataCache, client=None, min_interval: float = MIN_REQUEST_INTERVAL):
+        self.cache = cache
+        self.client = client or MusicBrainzClient()
+        self.min_interval = min_interval
+        self.queue: queue.Queue = queue.Queue()
+        self.enriched = 0
+        self.failed = 0
+        self._last_request = 0.0
+        self._thread = threading.Thread(target=self._run, name="musicbrainz-enrichment", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def enqueue(self, artist_name: str):
+        """Queues an artist name for enrichment (skipped if it is already cached)."""
+        if self.cache.get(artist_name) is None:
+            self.queue.put(artist_name)
+
+    def stop(self, wait: bool = True, timeout: float | None = None):
+        """Stops the worker. With wait=True, pending artists are processed first."""
+        if not wait:
+            # Vaciar la cola: lo pendiente se retomará en la siguiente ejecución
+            while not self.queue.empty():
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    break
+        self.queue.put(self._STOP)
+        self._thread.join(timeout)
+        log.info(f"MusicBrainz enrichment stopped: enriched={self.enriched}, failed={self.failed}")
+
+    def _throttle(self):
+        wait = self._last_request + self.min_interval - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        self._last_request = time.monotonic()
+
+    def _run(self):
+        while True:
+            artist_name = self.queue.get()
+            if artist_name is self._STOP:
+                return
+            if self.cache.get(artist_name) is not None:
+                continue
+            try:
+                self._throttle()
+                mbid = self.client.search_artist(artist_name)
+                metadata = {"genres": [], "albums": []}
+                if mbid:
+                    self._throttle()
+                    metadata = self.client.get_artist(mbid)
+                self.cache.put(artist_name, mbid, metadata["genres"], metadata["albums"])
+                self.enriched += 1
+            except Exception as e:
+                # No se guarda en caché: se reintentará en la próxima ejecución
+                self.failed += 1
+                log.error(f"Error fetching MusicBrainz data for {artist_name}: {e}")
+
+
+def apply_cached_metadata(catalog: list, cache: MetadataCache) -> int:
+    """Fills genres/albums of the catalog artists from the cache.
+    Returns:
+        int: Number of artists updated.
+    """
+    updated = 0
+    for artist in catalog:
+        entry = cache.get(artist.name)
+        if entry is not None:
+            artist.genres = list(entry["genres"])
+            artist.albums = list(entry["albums"])
+            updated += 1
+    return updated
+
+
+def store_cached_metadata(store, cache: MetadataCache) -> int:
+    """Writes the cached genres/albums into a CatalogStore, without rewriting the rest of the catalog.
+    Returns:
+        int: Number of artists updated.
+    """
+    metadata = []
+    for artist in store.iter_artists(with_songs=False):
+        entry = cache.get(artist.name)
+        if entry is not None:
+            metadata.append((artist.name, entry["genres"], entry["albums"]))
+    return store.update_metadata(metadata)
@@ -42,7 +42,7 @@ def safe_open(file_path, mode="w", encoding="utf-8"):
         print(f"Failed to open {file_path}: {e}")
 
 
-def write_string_to_file(path: str, file_name: str = None, text: str = ""):
+def write_string_to_file(path: str, file_name: str = None, text: str = "", make_dirs: bool = True):
     """
     Writes a string to a file in the specified directory.
     If file_name is None, writes to the path directly.
@@ -50,9 +50,16 @@ def write_string_to_file(path: str, file_name: str = None, text: str = ""):
         directory (str): The directory where the file will be saved.
         file_name (str, optional): The name of the file. If None, 'output.txt' is used. Defaults to None.
         text (str, optional): The string content to write to the file. Defaults to an empty string.
+        make_dirs (bool, optional): Create the parent directory if needed. Set it to False when the
+            directories were already created (e.g. by the download planner). Defaults to True.
     Returns:
         None
     """
+    if file_name is None and not make_dirs:
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(text)
+        return
+
     if file_name is None:
         file_path = path
     else:
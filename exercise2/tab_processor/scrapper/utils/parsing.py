@@ -0,0 +1,61 @@
+""" HTML parsing utilities for lacuerda.net pages.
+Only the elements each caller needs are parsed (SoupStrainer), with lxml when it is installed. """
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401
+
+    PARSER = "lxml"
+except ImportError:  # lxml es opcional: sin él se usa el parser de la librería estándar
+    PARSER = "html.parser"
+
+# --- Strainers: elementos que realmente usa cada tipo de página ---
+INDEX_STRAINER = SoupStrainer("ul")  # Índice de artistas: enlaces del primer <ul>
+ARTIST_STRAINER = SoupStrainer("li")  # Página de artista: enlaces "li > a"
+SONG_STRAINER = SoupStrainer("pre")  # Página de canción: bloques <pre> con la tablatura
+
+
+def parse(html: str, strainer: SoupStrainer = None) -> BeautifulSoup:
+    """Parses html with the fastest available parser, keeping only the elements matched by strainer."""
+    return BeautifulSoup(html, PARSER, parse_only=strainer)
+
+
+def extract_artist_links(html: str) -> list[str]:
+    """Extracts the artist hrefs of an index page (links inside its first <ul>)."""
+    ul_tag = parse(html, INDEX_STRAINER).find("ul")
+    if not ul_tag:
+        return []
+
+    hrefs = []
+    for li in ul_tag.find_all("li"):
+        a_tag = li.find("a")
+        if a_tag and a_tag.get("href"):
+            hrefs.append(a_tag["href"])
+    return hrefs
+
+
+def extract_song_links(html: str) -> list[str]:
+    """Extracts the song hrefs of an artist page."""
+    # Filter for valid song links. lacuerda.net song links are relative
+    # to the artist page and do not typically contain '.shtml' in the <a> href itself
+    # for the first part of the relative path, but they *do* eventually form
+    # artist/song.shtml. The original code looked for 'id="r"' which is too specific.
+    # We'll assume any relative href on an artist page is a potential song link.
+    return [
+        a_tag["href"]
+        for a_tag in parse(html, ARTIST_STRAINER).select("li > a")
+        if a_tag.get("href") and not a_tag["href"].startswith("http")
+    ]
+
+
+def extract_lyrics(html: str) -> str:
+    """Returns the text of the first non-empty <pre> block of a song page ("" if none).
+    The text is read from the parse tree (get_text), without re-serializing the tag and
+    stripping markup with a regex; HTML entities come out decoded.
+    """
+    for pre in parse(html, SONG_STRAINER).find_all("pre"):
+        text = pre.get_text().strip()
+        if text:
+            return text
+    return ""
@@ -1,20 +1,26 @@
 import logging as log
 import json
-import sys
+import os
 import utils.beautifulsoup as bs
 import utils.files as files
-import re
+import utils.parsing as parsing
+import utils.catalog_store as catalog_store
+import utils.download_planner as download_planner
 import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 
-from utils.data import Song, Artist
+from utils.data import Song, Artist, assign_ids
 from pathlib import Path
+from typing import Iterable
 
 # --- Configuration ---
-ROOT = "https://acordes.lacuerda.net"
-URL_ARTIST_INDEX = "https://acordes.lacuerda.net/tabs/"
+# LACUERDA_ROOT apunta el scrapper a otro servidor (ej. el de pruebas, scrapper/fake_lacuerda.py)
+ROOT = os.environ.get("LACUERDA_ROOT", "https://acordes.lacuerda.net").rstrip("/")
+URL_ARTIST_INDEX = f"{ROOT}/tabs/"
 SONG_VERSION = None
 INDEX = "abcdefghijklmnopqrstuvwxyz"
+CATALOG_SHARDS_DIRECTORY = "catalogs/"
 
 
 # --- Utility Functions ---
@@ -37,11 +43,14 @@ def get_version(song, version: int = 0):
     return song, song_name
 
 
-def get_artists(start_char: str, end_char: str) -> list[Artist]:
+def get_artists(start_char: str, end_char: str, fetch_metadata: bool = True, enrichment=None) -> list[Artist]:
     """Scrapes artist URLs for a given range of starting letters.
     Args:
         start_char (str): The starting letter for artists to catalog (e.g., 'a').
         end_char (str): The ending letter for artists to catalog (e.g., 'z').
+        fetch_metadata (bool, optional): Fetch MusicBrainz metadata for every artist. Defaults to True.
+        enrichment (EnrichmentWorker, optional): If given, artists are queued for background
+            enrichment instead of fetching their metadata inline. Defaults to None.
     Returns:
         list[Artist]: A list of Artist objects.
     """
@@ -53,24 +62,25 @@ def get_artists(start_char: str, end_char: str) -> list[Artist]:
         artist_index_url = f"{URL_ARTIST_INDEX}/{char}"
         log.info(f"Scraping artist index: {artist_index_url}")
 
-        soup = bs.get_soup(artist_index_url)
-        if not soup:
+        # Página cacheada en disco: si no ha cambiado (304) se reutilizan los enlaces ya extraídos
+        artist_hrefs = bs.get_extracted(artist_index_url, parsing.extract_artist_links)
+        if artist_hrefs is None:
             continue
 
-        ul_tag = soup.find("ul")
-        if not ul_tag:
-            log.info(f"No <ul> found on {artist_index_url}", file=sys.stderr)
+        if not artist_hrefs:
+            log.info(f"No <ul> with artist links found on {artist_index_url}")
             continue
 
-        for li in ul_tag.find_all("li"):
-            a_tag = li.find("a")
-            if a_tag and a_tag.get("href"):
-                href = ROOT + a_tag["href"]
-                artist_display_name = Path(href).name.replace("_", " ").title()
-                # Creamos el artista y descargamos los metadatos explícitamente aquí, que es cuando hacemos scraping
-                new_artist = Artist(name=artist_display_name, url=href)
+        for artist_href in artist_hrefs:
+            href = ROOT + artist_href
+            artist_display_name = Path(href).name.replace("_", " ").title()
+            # Creamos el artista y descargamos los metadatos explícitamente aquí, que es cuando hacemos scraping
+            new_artist = Artist(name=artist_display_name, url=href)
+            if enrichment is not None:
+                enrichment.enqueue(new_artist.name)
+            elif fetch_metadata:
                 new_artist.fetch_metadata()
-                artists.append(new_artist)
+            artists.append(new_artist)
 
     return artists
 
@@ -79,6 +89,8 @@ def get_catalog(
     output_directory: Path,
     start_char: str = "a",
     end_char: str = "z",
+    fetch_metadata: bool = True,
+    enrichment=None,
 ) -> dict:
     """
     Generates a catalog of artists and their songs from lacuerda.net.
@@ -88,6 +100,8 @@ def get_catalog(
                                  Used to construct potential output_path for each song.
         start_char (str): The starting letter for artists to catalog (e.g., 'a').
         end_char (str): The ending letter for artists to catalog (e.g., 'z').
+        fetch_metadata (bool, optional): Fetch MusicBrainz metadata for every artist. Defaults to True.
+        enrichment (EnrichmentWorker, optional): Background enrichment queue (see get_artists).
     Returns:
         dict: A dictionary with artist names as keys and lists of their Song objects as values.
     """
@@ -95,59 +109,153 @@ def get_catalog(
     end_char = end_char.lower()
 
     # Get all artists
-    catalog = get_artists(start_char, end_char)
+    catalog = get_artists(start_char, end_char, fetch_metadata=fetch_metadata, enrichment=enrichment)
 
     for artist in catalog:
         log.info(f"Scraping songs for artist: {artist.name} ({artist.url})")
-        soup = bs.get_soup(artist.url)
-        if not soup:
+        song_hrefs = bs.get_extracted(artist.url, parsing.extract_song_links)
+        if song_hrefs is None:
             continue
 
-        for a_tag in soup.select("li > a"):
-            # Filter for valid song links. lacuerda.net song links are relative
-            # to the artist page and do not typically contain '.shtml' in the <a> href itself
-            # for the first part of the relative path, but they *do* eventually form
-            # artist/song.shtml. The original code looked for 'id="r"' which is too specific.
-            # We'll assume any relative href on an artist page is a potential song link.
-            if a_tag and a_tag.get("href") and not a_tag["href"].startswith("http"):
-
-                song_relative_path = a_tag["href"]
-
-                # Construct the full base URL for the song (before adding .shtml or version)
-                # Example: https://acordes.lacuerda.net/artist/song_title
-                # We need to ensure artist_url ends with a '/' if song_relative_path doesn't start with one,
-                # or remove it if song_relative_path starts with one.
-                if not artist.url.endswith("/") and not song_relative_path.startswith(
-                    "/"
-                ):
-                    song_base_url_prefix = f"{artist.url}/"
-                else:
-                    song_base_url_prefix = artist.url
-
-                url = f"{song_base_url_prefix}{song_relative_path}.shtml"
-                full_song_url, song_filename = get_version(url, SONG_VERSION)
-                song_title = (
-                    Path(song_relative_path).stem.replace("_", " ").title()
-                )  # The song title can be derived from the 'stem' of the relative path
-                song_output_dir = f"{output_directory}songs/{artist.name.replace(' ', '_').lower()}/{song_filename}"
-
-                artist.songs.append(
-                    Song(
-                        song_title=song_title,
-                        song_url=full_song_url,
-                        genre="",  # Cannot be scraped directly from lacuerda.net
-                        lyrics_path=song_output_dir,
-                    )
+        for song_relative_path in song_hrefs:
+            # Construct the full base URL for the song (before adding .shtml or version)
+            # Example: https://acordes.lacuerda.net/artist/song_title
+            # We need to ensure artist_url ends with a '/' if song_relative_path doesn't start with one,
+            # or remove it if song_relative_path starts with one.
+            if not artist.url.endswith("/") and not song_relative_path.startswith(
+                "/"
+            ):
+                song_base_url_prefix = f"{artist.url}/"
+            else:
+                song_base_url_prefix = artist.url
+
+            url = f"{song_base_url_prefix}{song_relative_path}.shtml"
+            full_song_url, song_filename = get_version(url, SONG_VERSION)
+            song_title = (
+                Path(song_relative_path).stem.replace("_", " ").title()
+            )  # The song title can be derived from the 'stem' of the relative path
+            song_output_dir = f"{output_directory}songs/{artist.name.replace(' ', '_').lower()}/{song_filename}"
+
+            artist.songs.append(
+                Song(
+                    song_title=song_title,
+                    song_url=full_song_url,
+                    genre="",  # Cannot be scraped directly from lacuerda.net
+                    lyrics_path=song_output_dir,
                 )
+            )
+
+    # IDs secuenciales en el orden del catálogo: mismo resultado sea cual sea el estado de los contadores
+    assign_ids(catalog)
+
+    log.info("Cataloging complete.")
+    return catalog
+
+
+def shard_file(output_directory: str, char: str) -> Path:
+    """Path of the catalog shard of an index letter."""
+    return Path(f"{output_directory}{CATALOG_SHARDS_DIRECTORY}catalog_{char}.json")
+
+
+def build_catalog_shard(output_directory: str, char: str) -> str:
+    """Builds the catalog of a single index letter and saves it as a shard.
+    MusicBrainz metadata is not fetched here (workers would multiply its 1 req/s limit).
+    Args:
+        output_directory (str): The base directory of the scrapper output.
+        char (str): The index letter of the shard.
+    Returns:
+        str: The file name of the saved shard.
+    """
+    shard = get_catalog(output_directory, start_char=char, end_char=char, fetch_metadata=False)
+    shard_name = shard_file(output_directory, char).name
+    files.save_to_json(shard, f"{output_directory}{CATALOG_SHARDS_DIRECTORY}", shard_name)
+    return shard_name
+
+
+def merge_catalog_shards(output_directory: str, chars: list[str]) -> list[Artist]:
+    """Merges the shards of the given letters (in that order) and assigns the final IDs.
+    Since IDs are assigned here, shards can be built independently (any process).
+    Args:
+        output_directory (str): The base directory of the scrapper output.
+        chars (list[str]): Index letters to merge, in catalog order.
+    Returns:
+        list[Artist]: The merged catalog.
+    Raises:
+        RuntimeError: If the shard of a letter is missing or invalid.
+    """
+    catalog = []
+    for char in chars:
+        shard_path = shard_file(output_directory, char)
+        raw_shard = files.load_from_json(shard_path)
+        if raw_shard is None:
+            raise RuntimeError(f"Catalog shard for '{char}' not found or invalid: {shard_path}")
+        catalog.extend(Artist.from_dict(artist_data) for artist_data in raw_shard)
+
+    assign_ids(catalog)
+    log.info("Merged %d shards: %d artists", len(chars), len(catalog))
+    return catalog
+
+
+def get_catalog_parallel(
+    output_directory: str,
+    start_char: str = "a",
+    end_char: str = "z",
+    workers: int = 4,
+    enrichment=None,
+) -> list[Artist]:
+    """Generates the catalog sharded per index letter across a pool of processes.
+    Each letter is saved as a shard in files/catalogs/, then shards are merged in letter order,
+    so the result (IDs included) is the same as the serial get_catalog.
+    Args:
+        output_directory (str): The base directory of the scrapper output.
+        start_char (str): The starting letter for artists to catalog (e.g., 'a').
+        end_char (str): The ending letter for artists to catalog (e.g., 'z').
+        workers (int, optional): Number of worker processes. Defaults to 4.
+        enrichment (EnrichmentWorker, optional): Background enrichment queue for the merged artists.
+            If None, metadata is fetched serially after the merge. Defaults to None.
+    Returns:
+        list[Artist]: The merged catalog.
+    Raises:
+        RuntimeError: If the shard of any letter could not be built in this run.
+    """
+    chars = [chr(code) for code in range(ord(start_char.lower()), ord(end_char.lower()) + 1)]
+    log.info("Building catalog shards %s with %d workers", chars, workers)
+
+    # Los shards de ejecuciones anteriores se borran: solo se fusionan los construidos ahora
+    for char in chars:
+        shard_file(output_directory, char).unlink(missing_ok=True)
+
+    failed = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(build_catalog_shard, output_directory, char): char for char in chars}
+        for future in as_completed(futures):
+            try:
+                log.info("Catalog shard ready: %s", future.result())
+            except Exception as e:
+                log.error("Error building catalog shard '%s': %s", futures[future], e)
+                failed.append(futures[future])
+    if failed:
+        raise RuntimeError(f"Catalog shards failed for letters {sorted(failed)}; the catalog was not updated")
+
+    catalog = merge_catalog_shards(output_directory, chars)
+
+    # Metadatos de MusicBrainz en el proceso principal, respetando su límite de peticiones
+    for artist in catalog:
+        if enrichment is not None:
+            enrichment.enqueue(artist.name)
+        else:
+            artist.fetch_metadata()
 
     log.info("Cataloging complete.")
-    return catalog  
+    return catalog
 
 
-def get_song_lyrics(song_name: str, song_url: str, song_file_path: str) -> str:
+def get_song_lyrics(song_name: str, song_url: str, song_file_path: str, planned: bool = False) -> str:
     """Fetches the lyrics of a song from its URL.
     Args:
         song_url (str): The URL of the song page.
+        planned (bool, optional): The song comes from a download plan: it's known to be missing and
+            its directory exists, so neither is checked again. Defaults to False.
     Returns:
         str: The lyrics text, or an empty string if not found.
     """
@@ -155,37 +263,95 @@ def get_song_lyrics(song_name: str, song_url: str, song_file_path: str) -> str:
 
         song_file_path = files.normalize_relative_path(song_file_path)
 
-        if files.check_file_exists(song_file_path):
+        if not planned and files.check_file_exists(song_file_path):
             log.info(f"File {song_file_path} already exists. Skipping download.")
             return False
 
         log.info("song --> %s - url --> %s", song_name, song_url)
 
-        try:
-            lyric = bs.get_soup(song_url).findAll("pre")
-        except Exception as e:
-            log.error(f"Error fetching song from {song_url}: {e}")
+        # Las páginas de canción no se cachean: el fichero de letra ya es el resultado persistente
+        html, _ = bs.fetch_html(song_url, cache=False)
+        if html is None:
+            log.error(f"Error fetching song from {song_url}")
             return False
 
-        for p in lyric:
-
-            text = re.sub("<.*?>", "", str(p)).strip()
-            if text:
-
-                files.write_string_to_file(song_file_path, text=text)
-                print(song_name, "downloaded!")
-                return True
+        # Solo se parsean los bloques <pre>; el texto sale directamente del árbol
+        text = parsing.extract_lyrics(html)
+        if text:
+            files.write_string_to_file(song_file_path, text=text, make_dirs=not planned)
+            print(song_name, "downloaded!")
+            return True
 
     except Exception as e:
         log.error(f"Error fetching lyrics from {song_url}: {e}")
         raise e
 
 
-def get_songs(output_directory: str, version: int = 0):
+def save_catalog(output_directory: str, catalog: list[Artist]):
+    """Saves the catalog in the catalog store (files/catalog.db) and exports catalog.json.
+    Args:
+        output_directory (str): The base directory of the scrapper output.
+        catalog (list[Artist]): The catalog to save.
+    """
+    with catalog_store.open_catalog_store(output_directory, sync_json=False) as store:
+        store.replace_catalog(catalog)
+        store.export_json(output_directory)
+
+
+def load_catalog(output_directory: str) -> list[Artist] | None:
+    """Loads the whole catalog as a list of Artist objects.
+    Prefer streaming it with catalog_store.open_catalog_store(...).iter_artists() when a list isn't needed.
+    Args:
+        output_directory (str): The base directory where the catalog is stored.
+    Returns:
+        list[Artist] | None: The catalog, or None if it is missing or invalid.
+    """
+    try:
+        with catalog_store.open_catalog_store(output_directory) as store:
+            catalog = list(store.iter_artists())
+    except Exception as e:
+        log.error("Critical error loading catalog: %s", e)
+        return None
+
+    if not catalog:
+        log.error("Catalog not found or empty in %s.", output_directory)
+        return None
+    return catalog
+
+
+def get_songs_async(songs: Iterable[Song], on_downloaded=None, **downloader_options):
+    """Downloads the given songs with the asyncio engine (utils.async_downloader).
+    Args:
+        songs (Iterable[Song]): Missing songs, from a download plan (their directories exist).
+        on_downloaded (callable, optional): Called with the lyrics path of every downloaded song.
+        **downloader_options: Options for AsyncDownloader (concurrency, rate, retries...).
+    """
+    import utils.async_downloader as async_downloader
+
+    pending = [
+        (song.song_title, song.song_url, files.normalize_relative_path(song.lyrics_path)) for song in songs
+    ]
+
+    log.info("Async download of %d songs (%s)", len(pending), downloader_options)
+    results = async_downloader.download_songs(
+        pending, make_dirs=False, on_downloaded=on_downloaded, **downloader_options
+    )
+    print(f"{sum(1 for r in results if r.status == 'downloaded')} songs downloaded!")
+    return results
+
+
+def get_songs(
+    output_directory: str, version: int = 0, async_download: bool = False, on_downloaded=None, **downloader_options
+):
     """Downloads song lyrics from lacuerda.net based on the provided version.
     Args:
         output_directory (str): The base directory where lyrics will be saved.
         version (int, optional): The version number of the song to download. Defaults to 0.
+        async_download (bool, optional): Use the asyncio engine (concurrent, rate limited per host)
+            instead of downloading one song at a time. Defaults to False.
+        on_downloaded (callable, optional): Called with the lyrics path of every song as soon as it
+            is saved (e.g. to stream it to the cleaner). It may block to slow the downloads down.
+        **downloader_options: Options for the asyncio engine (concurrency, rate, retries...).
     """
     # TODO: Refactor this code to use get_catalog and Song/Artist dataclasses.
     # This function currently duplicates a lot of the logic in get_catalog.
@@ -247,51 +413,52 @@ def get_songs(output_directory: str, version: int = 0):
 
 
     # -------------------- NEW CODE --------------------#
-    # 1. Obtener la lista de artistas desde el catálogo
-    catalog_path = Path(output_directory) / "catalog.json"
-    log.info("Attempting to load catalog from: %s", catalog_path)
-
-    raw_catalog = files.load_from_json(catalog_path)
-    if raw_catalog is None:
-        log.error("Catalog not found or invalid at %s. Aborting get_songs.", catalog_path)
+    # 1. Obtener las canciones del catálogo, leídas en streaming desde el catalog store
+    store = catalog_store.open_catalog_store(output_directory)
+    if store.count()[0] == 0:
+        log.error("Catalog not found or empty in %s. Aborting get_songs.", output_directory)
+        store.close()
         return
 
-    # Convertir los diccionarios del JSON en objetos Artist
-    try:
-        catalog: list[Artist] = [Artist.from_dict(artist_data) for artist_data in raw_catalog]
-    except Exception as e:
-        log.error("Critical error deserializing catalog: %s", e)
-        return
+    # 2. Un único recorrido de files/songs/ para saber qué falta (sin un stat por canción)
+    with store:
+        plan = download_planner.plan_downloads(store.iter_songs(), f"{output_directory}songs/")
+    plan.create_directories()
 
+    # 3. Descargar solo las canciones que faltan
+    if async_download:
+        get_songs_async(plan.pending, on_downloaded=on_downloaded, **downloader_options)
+    else:
+        download_catalog_songs(plan.pending, on_downloaded=on_downloaded)
+    # -------------------- NEW CODE --------------------#
 
-    # 2. Para cada artista, obtener sus canciones
-    for artist in catalog:
-        log.info("Processing artist: %s", artist.name)
-        # Para cada canción, verificar si existe y, si no, descargar las letras
-        for song in artist.songs:
-            song_url = song.song_url
-            song_name = song.song_title
-            song_file_path = song.lyrics_path 
 
-            try:
-                downloaded = get_song_lyrics(
-                    song_name=song_name,
-                    song_url=song_url,
-                    song_file_path=song_file_path,
-                )
+def download_catalog_songs(songs: Iterable[Song], on_downloaded=None):
+    """Downloads, one at a time, the given songs.
+    Args:
+        songs (Iterable[Song]): Missing songs, from a download plan (their directories exist).
+        on_downloaded (callable, optional): Called with the lyrics path of every downloaded song.
+    """
+    for song in songs:
+        try:
+            downloaded = get_song_lyrics(
+                song_name=song.song_title,
+                song_url=song.song_url,
+                song_file_path=song.lyrics_path,
+                planned=True,
+            )
+
+            if downloaded:
+                if on_downloaded is not None:
+                    on_downloaded(files.normalize_relative_path(song.lyrics_path))
+                # Evitar saturar el servidor
+                time.sleep(0.5)
 
-                if downloaded:
-                    # Evitar saturar el servidor
-                    time.sleep(0.5)
-                else:
-                    log.debug("Skipping download for existing file: %s", song_file_path)
-                    
-            except Exception as e:
-                log.error(
-                    "Error fetching song '%s' from %s: %s",
-                    song_name,
-                    song_url,
-                    e,
-                )
-                continue
-    # -------------------- NEW CODE --------------------#
+        except Exception as e:
+            log.error(
+                "Error fetching song '%s' from %s: %s",
+                song.song_title,
+                song.song_url,
+                e,
+            )
+            continue
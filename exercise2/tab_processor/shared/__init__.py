@@ -0,0 +1 @@
+""" Modules shared by the pipeline stages (tab_cleaner, tab_validator, lyrics...). """
@@ -0,0 +1,66 @@
+""" Lyrics extraction from validated tabs (used by lyrics and the fused mode of tab_cleaner).
+Lines are classified one by one: a line is dropped when every whitespace separated token is a chord
+(or several chords written together, e.g. "AmG"). Tokens are looked up in a chord vocabulary built
+once, so the time is linear in the size of the tab whatever its content. """
+
+import re
+
+# Acorde: nota, alteración, modificador, extensión y bajo opcional (ej. C, F#m7, Gsus4, D/F#)
+NOTES = "ABCDEFG"
+ACCIDENTALS = ("", "#", "b")
+MODIFIERS = ("", "m", "maj", "min", "sus", "add", "aug", "dim")
+# Extensiones de un dígito; las de varios se normalizan a "0" antes de buscarlas (ej. A13 -> A0)
+EXTENSIONS = ("",) + tuple("0123456789")
+BASSES = ("",) + tuple(f"/{note}{accidental}" for note in NOTES for accidental in ACCIDENTALS)
+
+CHORD_VOCABULARY = frozenset(
+    f"{note}{accidental}{modifier}{extension}{bass}"
+    for note in NOTES
+    for accidental in ACCIDENTALS
+    for modifier in MODIFIERS
+    for extension in EXTENSIONS
+    for bass in BASSES
+)
+LONGEST_CHORD = max(len(chord) for chord in CHORD_VOCABULARY)
+DIGITS_REGEX = re.compile(r"[0-9]+")
+
+
+def is_chord_sequence(token: str) -> bool:
+    """Tells whether a token (without whitespace) is one chord or several written together.
+    Each position is tried against the vocabulary with at most LONGEST_CHORD lengths, so it is linear.
+    """
+    if token in CHORD_VOCABULARY:
+        return True
+    if token[0] not in NOTES:
+        return False
+    token = DIGITS_REGEX.sub("0", token)
+    # reachable[i]: los primeros i caracteres son una secuencia de acordes
+    reachable = [True] + [False] * len(token)
+    for start in range(len(token)):
+        if not reachable[start]:
+            continue
+        for end in range(start + 1, min(start + LONGEST_CHORD, len(token)) + 1):
+            if token[start:end] in CHORD_VOCABULARY:
+                reachable[end] = True
+    return reachable[-1]
+
+
+def only_chords(tokens: list[str]) -> bool:
+    """Tells whether every token of a line is a chord sequence (True for a blank line)."""
+    # La mayoría de las líneas se resuelven con una sola comprobación del conjunto o de la primera letra
+    if CHORD_VOCABULARY.issuperset(tokens):
+        return True
+    return tokens[0][0] in NOTES and all(map(is_chord_sequence, tokens))
+
+
+def remove_chords(text: str) -> str:
+    """
+    Elimina los acordes de un texto, dejando solo la letra.
+
+    Estrategia:
+    1. Eliminar líneas que solo contienen acordes y espacios.
+    2. Eliminar las líneas en blanco, dejando solo un salto de línea entre las de letra.
+    """
+    # Solo "\n" separa líneas (como ^ y $ en MULTILINE); splitlines() partiría también en "\r"
+    lyric_lines = [line for line in text.split("\n") if not only_chords(line.split())]
+    return "\n".join(lyric_lines).strip()
@@ -0,0 +1,94 @@
+""" Checkpoints of pipeline runs.
+After every step the orchestrator records that it completed and a fingerprint of its outputs in
+files/pipeline_state.json. A resumed run skips the steps that completed, whose outputs haven't
+changed since and whose dependencies don't run again. """
+
+import datetime
+import hashlib
+import json
+import os
+import logging as log
+from pathlib import Path
+
+# --- Configuration ---
+PIPELINE_STATE_FILE = Path("./files/pipeline_state.json")
+
+
+def fingerprint_outputs(paths: list[str]) -> str:
+    """Fingerprint of the files under the given paths (path, size and modification time of each one,
+    without reading them). A missing path gives a different fingerprint than an empty one.
+    """
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        if os.path.isfile(path):
+            found = [path]
+        elif os.path.isdir(path):
+            found = sorted(
+                os.path.join(root, file_name) for root, _, file_names in os.walk(path) for file_name in file_names
+            )
+        else:
+            digest.update(f"missing:{path}\n".encode("utf-8"))
+            continue
+        for file_path in found:
+            stat = os.stat(file_path)
+            digest.update(f"{file_path}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class PipelineState:
+    """Checkpoints of the pipeline steps, stored as JSON.
+
+    Args:
+        path (Path): State file.
+    """
+
+    def __init__(self, path: Path = PIPELINE_STATE_FILE):
+        self.path = Path(path)
+        self.steps: dict[str, dict] = {}
+        if self.path.is_file():
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.steps = json.load(f).get("steps", {})
+            except (OSError, json.JSONDecodeError) as e:
+                log.warning(f"Ignoring unreadable pipeline state {self.path}: {e}")
+
+    def is_valid(self, step: dict) -> bool:
+        """Tells whether a step completed and its outputs are still the ones it produced."""
+        checkpoint = self.steps.get(step["name"])
+        if checkpoint is None or checkpoint.get("status") != "completed":
+            return False
+        if checkpoint.get("command") != step["command"]:
+            return False
+        return checkpoint.get("fingerprint") == fingerprint_outputs(step.get("outputs", []))
+
+    def mark_completed(self, step: dict, seconds: float):
+        self.steps[step["name"]] = {
+            "status": "completed",
+            "command": step["command"],
+            "fingerprint": fingerprint_outputs(step.get("outputs", [])),
+            "finished_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "seconds": round(seconds, 3),
+        }
+        self.save()
+
+    def mark_failed(self, step: dict, error: str):
+        self.steps[step["name"]] = {
+            "status": "failed",
+            "command": step["command"],
+            "finished_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "error": error,
+        }
+        self.save()
+
+    def invalidate(self, step_name: str):
+        """Forgets the checkpoint of a step that is about to run again."""
+        if self.steps.pop(step_name, None) is not None:
+            self.save()
+
+    def save(self):
+        # Se escribe tras cada paso: un fallo posterior no pierde los pasos ya completados
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"steps": self.steps}, f, indent=4)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,168 @@
+""" Per-stage manifest for incremental processing.
+For every input file a stage records its content hash (plus size and mtime, to avoid re-reading
+unchanged files), the version of the rules that processed it and the outputs it produced (with
+their size and mtime). On the next run only new or changed inputs, or inputs whose outputs were
+deleted or modified, are processed, and outputs whose inputs vanished are removed. """
+
+import hashlib
+import inspect
+import json
+import os
+import logging as log
+from pathlib import Path
+
+# --- Configuration ---
+MANIFEST_DIRECTORY = Path("./files/manifests/")
+
+
+def hash_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_state(path) -> dict | None:
+    """Size and mtime of a file ({"size", "mtime_ns"}), or None if it doesn't exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def rules_version(*parts) -> str:
+    """Hash identifying the rules of a stage. Functions are hashed by their source code,
+    anything else by its repr (e.g. MAPPING, MIN_LINES).
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        text = inspect.getsource(part) if callable(part) else repr(part)
+        digest.update(text.encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class StageManifest:
+    """Manifest of a pipeline stage, stored as files/manifests/<stage>.json.
+
+    Args:
+        stage (str): Stage name (e.g. "cleaner").
+        version (str): Rules version (see rules_version). If it changes, every input is processed again.
+        directory (Path): Directory of the manifests.
+    """
+
+    def __init__(self, stage: str, version: str, directory: Path = MANIFEST_DIRECTORY):
+        self.stage = stage
+        self.version = version
+        self.path = Path(directory) / f"{stage}.json"
+        self.entries: dict[str, dict] = {}
+        self.processed = 0
+        self.unchanged = 0
+
+        if self.path.is_file():
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == version:
+                    self.entries = data.get("entries", {})
+                else:
+                    log.info(f"{stage}: rules changed ({data.get('version')} -> {version}), processing everything")
+            except (OSError, json.JSONDecodeError) as e:
+                log.warning(f"Ignoring unreadable manifest {self.path}: {e}")
+
+    def reset(self):
+        """Forgets every entry (the next check processes every input)."""
+        self.entries = {}
+
+    @staticmethod
+    def outputs_unchanged(entry: dict) -> bool:
+        """True if every output of an entry still exists with the size and mtime it was recorded with."""
+        outputs = entry["outputs"]
+        # Manifiestos antiguos guardaban solo la lista de rutas: no se pueden comprobar
+        if not isinstance(outputs, dict):
+            return False
+        return all(state is not None and file_state(output) == state for output, state in outputs.items())
+
+    def check(self, key: str, input_path: Path) -> tuple[bool, str | None]:
+        """Tells whether an input must be processed: it is new, its content changed, or one of
+        its outputs was deleted or modified (size or mtime differ from the recorded ones).
+        Returns:
+            tuple: (True if unchanged since it was recorded, content hash if it had to be computed).
+        """
+        entry = self.entries.get(key)
+        try:
+            stat = os.stat(input_path)
+        except OSError:
+            return False, None
+
+        if entry is not None and not self.outputs_unchanged(entry):
+            # Salidas borradas o modificadas: se vuelven a generar
+            entry = None
+        if entry is not None and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            self.unchanged += 1
+            return True, entry["hash"]
+
+        # Tamaño o fecha distintos: se compara el contenido
+        with open(input_path, "rb") as f:
+            content_hash = hash_bytes(f.read())
+        if entry is not None and entry["hash"] == content_hash:
+            entry["size"], entry["mtime_ns"] = stat.st_size, stat.st_mtime_ns
+            self.unchanged += 1
+            return True, content_hash
+        return False, content_hash
+
+    def record(self, key: str, input_path: Path, outputs: list[Path], content_hash: str = None, info: dict = None):
+        """Records the outputs of a processed input (once they are written: their size and mtime are
+        stored). Previous outputs that are no longer produced (e.g. a song that moved from ok/ to ko/)
+        are removed.
+        Args:
+            info (dict, optional): Extra data of the result kept with the entry (e.g. the verdict).
+        """
+        stat = os.stat(input_path)
+        if content_hash is None:
+            with open(input_path, "rb") as f:
+                content_hash = hash_bytes(f.read())
+
+        outputs = [str(output) for output in outputs]
+        previous = self.entries.get(key)
+        if previous is not None:
+            for old_output in set(previous["outputs"]) - set(outputs):
+                _remove(old_output)
+
+        self.entries[key] = {
+            "hash": content_hash,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "outputs": {output: file_state(output) for output in outputs},
+        }
+        if info:
+            self.entries[key]["info"] = info
+        self.processed += 1
+
+    def remove_orphans(self, current_keys: set[str]) -> int:
+        """Removes the outputs of recorded inputs that no longer exist.
+        Returns:
+            int: Number of orphan inputs removed from the manifest.
+        """
+        orphans = [key for key in self.entries if key not in current_keys]
+        for key in orphans:
+            for output in self.entries.pop(key)["outputs"]:
+                _remove(output)
+        if orphans:
+            log.info(f"{self.stage}: removed outputs of {len(orphans)} vanished inputs")
+        return len(orphans)
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"stage": self.stage, "version": self.version, "entries": self.entries}, f)
+        os.replace(tmp_path, self.path)
+        log.info(
+            f"{self.stage} manifest saved: {len(self.entries)} inputs, "
+            f"{self.processed} processed, {self.unchanged} unchanged"
+        )
+
+
+def _remove(output: str):
+    try:
+        os.remove(output)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,114 @@
+""" Streaming stages connected by bounded queues.
+Every stage is a thread that takes items from its inbox, processes them and puts the result in the
+inbox of the next stage. The queues are bounded: when a stage falls behind, the previous one blocks
+on put (backpressure), so memory stays constant however fast the producer is. """
+
+import queue
+import threading
+import time
+import logging as log
+
+# --- Configuration ---
+QUEUE_SIZE = 100  # Elementos como máximo entre dos etapas
+
+END_OF_STREAM = object()
+
+
+class StreamStage(threading.Thread):
+    """A pipeline stage running in its own thread.
+
+    Args:
+        name (str): Stage name (used for the thread and the logs).
+        process (callable): Function applied to every item. Its result is passed to the next stage,
+            unless it is None (the item stops here, e.g. a KO song).
+        inbox (queue.Queue): Queue the items are read from.
+        outbox (queue.Queue, optional): Inbox of the next stage.
+    """
+
+    def __init__(self, name: str, process, inbox: queue.Queue, outbox: queue.Queue = None):
+        super().__init__(name=name, daemon=True)
+        self.process = process
+        self.inbox = inbox
+        self.outbox = outbox
+        self.processed = 0
+        self.forwarded = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.first_output_at = None  # time.perf_counter() del primer resultado
+
+    def run(self):
+        while True:
+            item = self.inbox.get()
+            if item is END_OF_STREAM:
+                break
+
+            start = time.perf_counter()
+            try:
+                result = self.process(item)
+            except Exception as e:
+                self.errors += 1
+                log.error(f"{self.name}: error processing {item}: {e}")
+                continue
+            finally:
+                self.busy_seconds += time.perf_counter() - start
+                self.processed += 1
+
+            if result is None:
+                continue
+            if self.first_output_at is None:
+                self.first_output_at = time.perf_counter()
+            self.forwarded += 1
+            if self.outbox is not None:
+                # Bloquea si la siguiente etapa va por detrás
+                self.outbox.put(result)
+
+        # El fin del flujo se propaga cuando esta etapa ya ha vaciado su cola
+        if self.outbox is not None:
+            self.outbox.put(END_OF_STREAM)
+
+
+class StreamingPipeline:
+    """Chain of StreamStage connected by bounded queues.
+
+    Args:
+        stages (list[tuple[str, callable]]): (name, process function) of every stage, in order.
+        queue_size (int): Maximum number of items waiting between two stages.
+    """
+
+    def __init__(self, stages: list[tuple], queue_size: int = QUEUE_SIZE):
+        self.queues = [queue.Queue(maxsize=queue_size) for _ in stages]
+        self.stages = [
+            StreamStage(name, process, inbox, self.queues[i + 1] if i + 1 < len(stages) else None)
+            for i, ((name, process), inbox) in enumerate(zip(stages, self.queues))
+        ]
+        self.submitted = 0
+        self.start_time = None
+
+    def start(self):
+        self.start_time = time.perf_counter()
+        for stage in self.stages:
+            stage.start()
+        return self
+
+    def submit(self, item):
+        """Puts an item in the first stage. Blocks while its queue is full."""
+        self.submitted += 1
+        self.queues[0].put(item)
+
+    def close(self):
+        """Signals the end of the input and waits until every stage has drained its queue."""
+        self.queues[0].put(END_OF_STREAM)
+        for stage in self.stages:
+            stage.join()
+
+    def log_stats(self):
+        """Logs the items, errors and busy time of every stage."""
+        log.info(f"Streaming pipeline: {self.submitted} items submitted")
+        for stage in self.stages:
+            first_output = (
+                f"{stage.first_output_at - self.start_time:.2f}s" if stage.first_output_at is not None else "-"
+            )
+            log.info(
+                f"  {stage.name:<12} processed={stage.processed}, forwarded={stage.forwarded}, "
+                f"errors={stage.errors}, busy={stage.busy_seconds:.2f}s, first output after {first_output}"
+            )
@@ -0,0 +1,153 @@
+""" Content validation of cleaned tabs (used by tab_validator and the fused mode of tab_cleaner).
+Every line of a tab is a chord line, a tab staff line, a lyric line, another kind of line or blank
+(LINE_REGEX). The counts and ratios are the scores of the song, and the verdict compares them with
+configurable thresholds. """
+
+import re
+import json
+import logging as log
+from dataclasses import dataclass, asdict, fields
+from pathlib import Path
+
+from shared.lyrics import CHORD_VOCABULARY, NOTES
+
+# Acorde: nota, alteración, modificador, extensión y bajo opcional (ej. C, F#m7, Gsus4, D/F#)
+CHORD = r"[A-G][#b]?(?:maj|min|m|sus|add|aug|dim)?[0-9]*(?:/[A-G][#b]?)?"
+# Caracteres de una línea de tablatura (ej. "e|---0---2h3---|")
+STAFF_CHARACTERS = r"[-0-9|hpbrsxv/\\~()*. \t]"
+
+# Línea de tablatura y línea de solo acordes (no se solapan: solo la primera tiene "|")
+TAB_LINE = rf"[ \t]*(?:[A-Ga-g][ \t]*)?\|(?=[^\n]*-){STAFF_CHARACTERS}*"
+CHORD_LINE = rf"[ \t]*{CHORD}(?:[ \t]+{CHORD})*[ \t]*"
+
+# Cada línea encaja en un único grupo. Todas las alternativas son lineales: no hay dos
+# cuantificadores seguidos que puedan consumir los mismos caracteres.
+LINE_REGEX = re.compile(
+    r"^(?:"
+    rf"(?P<tab>{TAB_LINE})"
+    rf"|(?P<chords>{CHORD_LINE})"
+    r"|(?P<blank>[ \t]*)"
+    r"|(?P<lyrics>[^\n]*[a-z][^\n]*)"
+    r"|(?P<other>[^\n]+)"
+    r")$",
+    re.MULTILINE,
+)
+
+# score_song clasifica cada línea una sola vez, con las mismas clases que LINE_REGEX (la definición
+# de referencia). Comprobaciones baratas de caracteres evitan casi todas las llamadas a las regex:
+# - una línea de acordes empieza (tras los espacios) por una nota seguida de alteración, modificador,
+#   número, bajo, espacio o nada; si además todas sus palabras están en el vocabulario de acordes y
+#   no tiene más blancos que espacios, es de acordes sin comprobar CHORD_LINE
+# - solo una línea con "|" puede ser de tablatura
+# - en una línea ASCII, tener [a-z] equivale a que upper() la cambie
+CHORD_LINE_STARTS = frozenset(note + following for note in NOTES for following in ("", *"#bmsad0123456789/ \t"))
+is_chord_vocabulary = CHORD_VOCABULARY.issuperset
+is_tab_line = re.compile(TAB_LINE).fullmatch
+is_chord_line = re.compile(CHORD_LINE).fullmatch
+has_lowercase = re.compile(r"[a-z]").search
+
+
+@dataclass(frozen=True)
+class ScoreThresholds:
+    """Minimum (and maximum) scores of a valid song. Ratios are over the non blank lines.
+
+    Attributes:
+        min_lines (int): Non blank lines.
+        min_chord_lines (int): Lines with only chords.
+        min_lyric_lines (int): Lines with lyrics (lowercase words).
+        min_chord_ratio (float): Chord lines / lines.
+        min_lyric_ratio (float): Lyric lines / lines.
+        max_tab_density (float): Tab staff lines / lines (tablatures without lyrics are rejected).
+    """
+
+    min_lines: int = 2
+    min_chord_lines: int = 1
+    min_lyric_lines: int = 1
+    min_chord_ratio: float = 0.05
+    min_lyric_ratio: float = 0.2
+    max_tab_density: float = 0.5
+
+    @classmethod
+    def from_file(cls, path: Path) -> "ScoreThresholds":
+        """Reads the thresholds from a JSON object; missing keys keep their default value."""
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        known = {field.name for field in fields(cls)}
+        unknown = set(data) - known
+        if unknown:
+            raise ValueError(f"Unknown thresholds in {path}: {sorted(unknown)}")
+        return cls(**data)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+DEFAULT_THRESHOLDS = ScoreThresholds()
+
+
+def score_song(song: str) -> dict:
+    """Scores a tab by the kind of its lines (see LINE_REGEX), classifying each line once.
+    Returns:
+        dict: Line counts (lines, chord_lines, lyric_lines, tab_lines) and ratios
+            (chord_line_ratio, lyric_line_ratio, tab_staff_density).
+    """
+    tab_lines = chord_lines = lyric_lines = other_lines = 0
+    # Sin "|" no puede haber líneas de tablatura
+    check_tabs = "|" in song
+    for line in song.split("\n"):
+        start = line[:2]
+        if not start:
+            continue
+        if start[0] == " " or start[0] == "\t":
+            start = line.lstrip(" \t")[:2]
+            if not start:
+                continue  # Línea en blanco
+        if start in CHORD_LINE_STARTS and (
+            (is_chord_vocabulary(line.split()) and line.isprintable()) or is_chord_line(line)
+        ):
+            chord_lines += 1
+        elif check_tabs and "|" in line and is_tab_line(line):
+            tab_lines += 1
+        elif (line != line.upper()) if line.isascii() else has_lowercase(line) is not None:
+            lyric_lines += 1
+        else:
+            other_lines += 1
+    lines = tab_lines + chord_lines + lyric_lines + other_lines
+    return {
+        "lines": lines,
+        "chord_lines": chord_lines,
+        "lyric_lines": lyric_lines,
+        "tab_lines": tab_lines,
+        "chord_line_ratio": round(chord_lines / lines, 3) if lines else 0.0,
+        "lyric_line_ratio": round(lyric_lines / lines, 3) if lines else 0.0,
+        "tab_staff_density": round(tab_lines / lines, 3) if lines else 0.0,
+    }
+
+
+def classify_song(song: str, thresholds: ScoreThresholds = DEFAULT_THRESHOLDS) -> tuple[bool, str, dict]:
+    """Classifies a cleaned tab by its scores.
+    Returns:
+        tuple: (True if valid, reason: "ok" or the first failed check -"too_short", "no_chords",
+            "no_lyrics", "low_chord_ratio", "low_lyric_ratio", "tab_staff"-, scores of the song).
+    """
+    scores = score_song(song)
+    checks = (
+        ("too_short", scores["lines"] >= thresholds.min_lines),
+        ("no_chords", scores["chord_lines"] >= thresholds.min_chord_lines),
+        ("no_lyrics", scores["lyric_lines"] >= thresholds.min_lyric_lines),
+        ("low_chord_ratio", scores["chord_line_ratio"] >= thresholds.min_chord_ratio),
+        ("low_lyric_ratio", scores["lyric_line_ratio"] >= thresholds.min_lyric_ratio),
+        ("tab_staff", scores["tab_staff_density"] <= thresholds.max_tab_density),
+    )
+    for reason, passed in checks:
+        if not passed:
+            return False, reason, scores
+    return True, "ok", scores
+
+
+def validate_song_format(song, thresholds: ScoreThresholds = DEFAULT_THRESHOLDS):
+    """Valida si la canción contiene la mezcla esperada de acordes y letras (Calidad de Contenido)"""
+    validated, reason, _ = classify_song(song, thresholds)
+    if not validated:
+        log.debug(f"Validation KO: {reason}.")
+    return validated
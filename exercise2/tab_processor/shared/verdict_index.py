@@ -0,0 +1,131 @@
+""" Verdict index of the validation stage.
+One JSON line per cleaned tab with its path (relative to files/cleaned, e.g. songs/artist/song.txt),
+verdict ("ok" or "ko"), reason and scores. results and lyrics read it instead of walking the
+validations/ok and validations/ko trees, which the validator doesn't need to write in index mode.
+A summary with the totals and their breakdown per artist, letter and reason is written with it, so
+results doesn't need to read the index either. """
+
+import json
+import os
+import logging as log
+from pathlib import Path
+from collections import Counter, defaultdict
+from typing import Iterable, Iterator
+
+# --- Configuration ---
+VERDICT_INDEX_FILE = Path("./files/validations/index.jsonl")
+VERDICT_SUMMARY_FILE = Path("./files/validations/summary.json")
+
+
+def artist_of(path: str) -> str:
+    """Artist of a tab from its path (songs/<artist>/<song>.txt)."""
+    parts = Path(path).parts
+    return parts[-2] if len(parts) >= 2 else ""
+
+
+def letter_of(artist: str) -> str:
+    """Index letter of an artist, as in the catalog (first character of its name, lower case)."""
+    return artist[:1].lower()
+
+
+class VerdictSummary:
+    """OK/KO counts of a set of verdicts, in total and per artist, letter and reason."""
+
+    def __init__(self):
+        self.verdicts = Counter()
+        self.by_artist = defaultdict(Counter)
+        self.by_letter = defaultdict(Counter)
+        self.by_reason = Counter()
+
+    def add(self, record: dict):
+        verdict = record["verdict"]
+        artist = artist_of(record["path"])
+        self.verdicts[verdict] += 1
+        self.by_artist[artist][verdict] += 1
+        self.by_letter[letter_of(artist)][verdict] += 1
+        self.by_reason[record.get("reason") or verdict] += 1
+
+    def to_dict(self) -> dict:
+        def counts(counter: Counter) -> dict:
+            return {"ok": counter["ok"], "ko": counter["ko"]}
+
+        return {
+            "ok": self.verdicts["ok"],
+            "ko": self.verdicts["ko"],
+            "total": self.verdicts["ok"] + self.verdicts["ko"],
+            "by_artist": {artist: counts(self.by_artist[artist]) for artist in sorted(self.by_artist)},
+            "by_letter": {letter: counts(self.by_letter[letter]) for letter in sorted(self.by_letter)},
+            "by_reason": dict(self.by_reason.most_common()),
+        }
+
+
+def verdict_records(entries: dict) -> Iterator[dict]:
+    """Builds the index records from the entries of a validation manifest (sorted by path).
+    Entries without a verdict (e.g. tabs too small to be validated) are left out.
+    """
+    for path in sorted(entries):
+        info = entries[path].get("info") or {}
+        if info.get("verdict") in ("ok", "ko"):
+            yield {
+                "path": path,
+                "verdict": info["verdict"],
+                "reason": info.get("reason", ""),
+                "scores": info.get("scores", {}),
+            }
+
+
+def write_verdict_index(records: Iterable[dict], path: Path = VERDICT_INDEX_FILE) -> int:
+    """Rewrites the index atomically.
+    Returns:
+        int: Number of records written.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    count = 0
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+            count += 1
+    os.replace(tmp_path, path)
+    log.info(f"Verdict index saved: {count} records in {path}")
+    return count
+
+
+def read_verdict_index(path: Path = VERDICT_INDEX_FILE) -> Iterator[dict]:
+    """Streams the records of the index (nothing if it doesn't exist)."""
+    if not path.is_file():
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def save_verdicts(entries: dict, index_path: Path = VERDICT_INDEX_FILE, summary_path: Path = VERDICT_SUMMARY_FILE) -> dict:
+    """Writes the verdict index and its summary from the entries of a validation manifest, in one pass.
+    Returns:
+        dict: The summary (see VerdictSummary.to_dict).
+    """
+    summary = VerdictSummary()
+
+    def records():
+        for record in verdict_records(entries):
+            summary.add(record)
+            yield record
+
+    write_verdict_index(records(), index_path)
+    data = summary.to_dict()
+    tmp_path = summary_path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, summary_path)
+    return data
+
+
+def read_verdict_summary(path: Path = VERDICT_SUMMARY_FILE) -> dict | None:
+    """Reads the summary written by save_verdicts (None if missing or written by an older version)."""
+    if not path.is_file():
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        summary = json.load(f)
+    return summary if "by_reason" in summary else None
@@ -0,0 +1,91 @@
+import re
+import time
+import click
+from pathlib import Path
+
+from utils.cleaning import CleaningEngine
+from utils.string_mapping import MAPPING
+
+# -- Configuration ---
+CORPUS_DIRECTORY = "./files/songs/"
+
+# Corpus mínimo para cuando no hay canciones descargadas: cada regla de MAPPING cambia al menos un
+# texto, salvo r"^.*\n[\-\_]*\n[\-\_]*\n", que nunca puede aplicarse: la regla anterior ya borra
+# el principio del texto hasta su última línea de guiones (o vacía)
+UNREACHABLE_RULES = {r"^.*\n[\-\_]*\n[\-\_]*\n"}
+FIXTURE_CORPUS = [
+    "Intro: Am G F\nLa letra de la canción\nsigue aquí\ncon más versos\ny otro más\nfin\n",
+    "[Intro] C G\nEstrofa 1\nDo Re Mi\nFa Sol\nLa Si\nDo\nSaludos a todos!",
+    "Introducción:\nAm   C\nNota: tocar suave\nuna línea\notra línea\n 1) primera\n 2) segunda\n",
+    "www.lacuerda.net\nhola\n-----\n___\nCEJILLA 2\nEm C G D\nversos\nmás versos\n",
+    "Tab enviada por autor@example.com. Gracias!\nLínea 1\nLínea 2\nLínea 3\nLínea 4\nLínea 5\n",
+    "** Coro **\nAm F C G\ncanta conmigo\nbajo la luna\nsin parar\nhasta el final\n",
+    "G D Em C\nsin reglas que aplicar\nsolo acordes\ny letra\nen varias\nlíneas\n",
+    " hola\nAm   G\nla luna sale por el mar\n",
+    "Am   G\n 1) primera vez\n 2) segunda vez\n",
+    "Em   C\nCejilla en el 2\ny tu voz me lleva\n",
+    "Am G\nIntroducción:\nC G\ny tu voz me lleva\n",
+    "Nota: tocar suave\nAm G\nla luna sale\n",
+    "Am G\n-----\nla luna sale\npor el mar\n",
+]
+
+
+def legacy_apply_format_rules(text: str) -> str:
+    """Previous implementation (pattern strings, every rule on every file), kept as the baseline."""
+    email_pattern = r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b"
+    sentence_pattern = r"[\n^.!?]*" + email_pattern + r"[^.!?]*[.!?\n]"
+    formatted_text = re.sub(sentence_pattern, "", text)
+    for key, value in MAPPING.items():
+        formatted_text = re.sub(key, value, formatted_text, flags=re.DOTALL | re.IGNORECASE)
+    return formatted_text
+
+
+def time_cleaner(cleaner, texts: list[str], repeat: int) -> tuple[float, list[str]]:
+    """Returns (best total seconds over `repeat` runs, results of the last run)."""
+    best = float("inf")
+    results = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [cleaner(text) for text in texts]
+        best = min(best, time.perf_counter() - start)
+    return best, results
+
+
+@click.command()
+@click.option("--corpus", "-c", default=CORPUS_DIRECTORY, help="Directory with downloaded .txt tabs.")
+@click.option("--repeat", "-r", default=3, help="Runs per implementation (the best one is reported).")
+def main(corpus, repeat):
+    """Benchmarks the previous apply_format_rules against the CleaningEngine (files/s, identical output)."""
+    texts = []
+    for path in sorted(Path(corpus).rglob("*.txt")):
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            texts.append(f.read())
+    source = corpus
+    if not texts:
+        texts = FIXTURE_CORPUS
+        source = "built-in fixture"
+
+    print(f"Corpus: {source} - {len(texts)} files")
+    print("-" * 72)
+
+    engine = CleaningEngine()
+    legacy_time, legacy_results = time_cleaner(legacy_apply_format_rules, texts, repeat)
+    engine_time, engine_results = time_cleaner(engine.clean, texts, repeat)
+    different = [i for i, (a, b) in enumerate(zip(legacy_results, engine_results)) if a != b]
+
+    for name, elapsed in (("legacy", legacy_time), ("engine", engine_time)):
+        print(f"{name:<8} {elapsed:8.3f}s | {len(texts) / elapsed if elapsed else float('inf'):10.1f} files/s")
+    print("-" * 72)
+    print(f"Identical output: {len(texts) - len(different)}/{len(texts)}")
+
+    print("Per rule (all runs): applied / skipped / hits / time")
+    for name, stats in engine.stats.items():
+        print(f"  {name:<32} {stats.applied:7d} {stats.skipped:7d} {stats.hits:7d} {stats.seconds:8.3f}s")
+    print(f"  {'(literal scans)':<32} {'':23} {engine.guard_seconds:8.3f}s")
+
+    if different:
+        raise SystemExit(f"Output differs for {len(different)} files (first: #{different[0]})")
+
+
+if __name__ == "__main__":
+    main()
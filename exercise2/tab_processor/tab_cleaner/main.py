@@ -1,12 +1,26 @@
 # Importamos las bibliotecas necesarias
 import os
 import re
+import sys
+import time
+import click
 import logging as log
 import datetime
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
 # Importamos Path de pathlib para manejar rutas de forma robusta
 from pathlib import Path 
-# Asumimos que MAPPING está disponible, si no, causará un ImportError
-from utils.string_mapping import MAPPING 
+# Motor de limpieza: reglas de MAPPING compiladas una sola vez
+from utils.cleaning import CleaningEngine, EMAIL_SENTENCE_PATTERN
+from utils.string_mapping import MAPPING
+
+# Módulos compartidos entre etapas (tab_processor/shared)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from shared.stage_manifest import StageManifest, rules_version
+from shared.validation import classify_song, score_song, TAB_LINE, CHORD_LINE
+from shared.verdict_index import save_verdicts
+from shared.lyrics import CHORD_VOCABULARY, is_chord_sequence, only_chords, remove_chords
 
 # -- Configuration ---
 # Usamos Path para definir directorios base
@@ -14,12 +28,23 @@ INPUT_DIRECTORY = Path("./files/")
 CATALOG_DIRECTORY = INPUT_DIRECTORY / "catalogs" 
 LOGS_DIRECTORY = Path("./logs/")
 OUTPUT_DIRECTORY = INPUT_DIRECTORY / "cleaned" # Nueva forma, usando pathlib
+VALIDATIONS_DIRECTORY = INPUT_DIRECTORY / "validations"
+LYRICS_DIRECTORY = INPUT_DIRECTORY / "lyrics_only"
+# Salidas de las etapas del pipeline dentro de INPUT_DIRECTORY: no son tablaturas de entrada
+DERIVED_DIRECTORIES = [
+    OUTPUT_DIRECTORY,
+    VALIDATIONS_DIRECTORY,
+    LYRICS_DIRECTORY,
+    INPUT_DIRECTORY / "insights",
+]
 
 ROOT = "https://acordes.lacuerda.net"
 URL_ARTIST_INDEX = "https://acordes.lacuerda.net/tabs/"
 MIN_LINES = 5
 SONG_VERSION = 0
 INDEX = "abcdefghijklmnopqrstuvwxyz#"
+BATCH_SIZE = 200  # Ficheros por lote enviado a cada proceso
+PROGRESS_INTERVAL = 5  # Segundos entre líneas de progreso
 
 # No usamos una lista global, ya que list_files_recursive se usará solo una vez en main()
 # dir_list = list() 
@@ -58,28 +83,211 @@ def list_files_recursive(path: Path = INPUT_DIRECTORY) -> list[Path]:
     return found_files
 
 
-def remove_email_sentences(text: str):
+ENGINE = CleaningEngine()
+# Si cambian las reglas, el manifiesto se invalida y se vuelve a limpiar todo
+RULES_VERSION = rules_version(EMAIL_SENTENCE_PATTERN, MAPPING, MIN_LINES)
+EMAIL_SENTENCE_REGEX = re.compile(EMAIL_SENTENCE_PATTERN)
 
-    email_pattern = r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b"
-    sentence_pattern = r"[\n^.!?]*" + email_pattern + r"[^.!?]*[.!?\n]"
 
-    return re.sub(sentence_pattern, "", text)
+def remove_email_sentences(text: str):
+    return EMAIL_SENTENCE_REGEX.sub("", text)
 
 
 def apply_format_rules(text: str):
-    formatted_text = text
+    # Elimina las frases con emails y aplica, en orden, las reglas definidas en MAPPING
+    return ENGINE.clean(text)
 
-    formatted_text = remove_email_sentences(formatted_text)
 
-    for key, value in MAPPING.items():
-        # Reemplaza todas las ocurrencias de las reglas definidas en MAPPING
-        formatted_text = re.sub(
-            key, value, formatted_text, flags=re.DOTALL | re.IGNORECASE
-        )
-    return formatted_text
+def read_tab(file_path: Path) -> tuple[str, str, str | None]:
+    """Reads a raw tab.
+    Returns:
+        tuple: (relative path inside INPUT_DIRECTORY, text, error message or None).
+    """
+    # Obtenemos la ruta relativa del archivo dentro de INPUT_DIRECTORY.
+    # Ejemplo: 'files/songs/abel_pintos/3.txt' -> 'songs/abel_pintos/3.txt'
+    relative_path = file_path.relative_to(INPUT_DIRECTORY)
+    try:
+        with open(file_path, "r") as file:
+            return str(relative_path), file.read(), None
+    except Exception as e:
+        return str(relative_path), "", f"Error reading file: {e}"
+
+
+def write_output(output_path: Path, text: str, encoding: str = None):
+    """Writes an output file, creating its parent directories."""
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "w", encoding=encoding) as file:
+        file.write(text)
+
+
+def clean_file(file_path: Path) -> tuple[str, str, str, list[str]]:
+    """Cleans a single tab and writes it to OUTPUT_DIRECTORY, keeping its relative path.
+    Returns:
+        tuple: Compact status record (relative path, status, detail, outputs) with status
+            "cleaned", "too_small" or "error".
+    """
+    relative_path, text, error = read_tab(file_path)
+    if error:
+        return relative_path, "error", error, []
+
+    if text.count("\n") < MIN_LINES:
+        return relative_path, "too_small", "", []
+
+    formatted_text = apply_format_rules(text)
+
+    # Construimos la ruta de salida completa.
+    # Ejemplo: 'files/cleaned' / 'songs/abel_pintos/3.txt'
+    output_path = OUTPUT_DIRECTORY / relative_path
+    try:
+        write_output(output_path, formatted_text)
+    except Exception as e:
+        return relative_path, "error", f"Error writing {output_path}: {e}", []
+
+    return relative_path, "cleaned", "", [str(output_path)]
+
+
+def process_file_fused(file_path: Path, debug_outputs: bool = False) -> tuple[str, str, str, list[str]]:
+    """Cleans, validates and extracts the lyrics of a tab in memory (fused mode).
+    Only the final artifact (files/lyrics_only/...) is written, for valid tabs. With debug_outputs,
+    the intermediate results are also written where the separate stages leave them
+    (files/cleaned, files/validations/ok|ko).
+    Returns:
+        tuple: Compact status record (relative path, status, detail, outputs) with status
+            "ok", "ko", "too_small" or "error". For "ok" and "ko", detail is the verdict data
+            ({"reason": ..., "scores": ...}) kept in the manifest and the verdict index.
+    """
+    relative_path, text, error = read_tab(file_path)
+    if error:
+        return relative_path, "error", error, []
+
+    if text.count("\n") < MIN_LINES:
+        return relative_path, "too_small", "", []
+
+    outputs = []
+    try:
+        formatted_text = apply_format_rules(text)
+        validated, reason, scores = classify_song(formatted_text)
+
+        if debug_outputs:
+            write_output(OUTPUT_DIRECTORY / relative_path, formatted_text)
+            verdict_directory = VALIDATIONS_DIRECTORY / ("ok" if validated else "ko")
+            write_output(verdict_directory / relative_path, formatted_text)
+            outputs += [str(OUTPUT_DIRECTORY / relative_path), str(verdict_directory / relative_path)]
+
+        if validated:
+            lyrics_path = LYRICS_DIRECTORY / relative_path
+            write_output(lyrics_path, remove_chords(formatted_text), encoding="utf-8")
+            outputs.append(str(lyrics_path))
+    except Exception as e:
+        return relative_path, "error", f"Error processing file: {e}", outputs
+
+    return relative_path, "ok" if validated else "ko", {"reason": reason, "scores": scores}, outputs
+
+
+def clean_batch(
+    file_paths: list[Path], fused: bool = False, debug_outputs: bool = False
+) -> tuple[list[tuple[str, str, str, list[str]]], tuple]:
+    """Cleans a batch of tabs (runs in a worker process when --workers > 1).
+    Returns:
+        tuple: (status records, cleaning engine counters of this batch).
+    """
+    ENGINE.reset_stats()
+    if fused:
+        records = [process_file_fused(file_path, debug_outputs) for file_path in file_paths]
+    else:
+        records = [clean_file(file_path) for file_path in file_paths]
+    return records, ENGINE.snapshot()
+
 
+def iter_batches(items, size: int = BATCH_SIZE):
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
 
-def main():
+
+class ProgressReporter:
+    """Prints the progress of the cleaner every `interval` seconds instead of one line per file.
+
+    Args:
+        total (int): Files to process.
+        interval (float): Seconds between progress lines.
+    """
+
+    def __init__(self, total: int, interval: float = PROGRESS_INTERVAL):
+        self.total = total
+        self.interval = interval
+        self.done = 0
+        self.start = time.perf_counter()
+        self._last_report = self.start
+
+    def update(self, processed: int):
+        self.done += processed
+        now = time.perf_counter()
+        if now - self._last_report >= self.interval or self.done == self.total:
+            self._last_report = now
+            elapsed = now - self.start
+            rate = self.done / elapsed if elapsed else 0.0
+            percent = self.done / self.total if self.total else 1.0
+            print(f"Cleaning: {self.done}/{self.total} files ({percent:.0%}) - {rate:.1f} files/s")
+
+
+def run_batches(file_paths: list[Path], workers: int, **batch_options):
+    """Cleans the files in batches, serially or in a pool of `workers` processes, yielding the
+    result of every batch as it finishes. At most 2 batches per worker are in flight.
+    """
+    batches = iter_batches(file_paths)
+    if workers <= 1:
+        for batch in batches:
+            yield clean_batch(batch, **batch_options)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for batch in batches:
+            pending.add(executor.submit(clean_batch, batch, **batch_options))
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        for future in pending:
+            yield future.result()
+
+
+def save_validation_summary(manifest: StageManifest) -> dict:
+    """Writes the verdict index of every file in the fused manifest and its summary (OK/KO counts,
+    read by results/main.py when the validation directories are not written).
+    """
+    return save_verdicts(manifest.entries)
+
+
+@click.command()
+@click.option(
+    "--workers",
+    "-w",
+    default=1,
+    show_default=True,
+    help="Processes used to clean the tabs (batches of files are spread across them).",
+)
+@click.option(
+    "--force",
+    "-f",
+    is_flag=True,
+    default=False,
+    help="Clean every tab again, even if it didn't change since the last run.",
+)
+@click.option(
+    "--fused",
+    is_flag=True,
+    default=False,
+    help="Clean, validate and extract the lyrics of every tab in memory, writing only files/lyrics_only.",
+)
+@click.option(
+    "--debug_outputs",
+    is_flag=True,
+    default=False,
+    help="With --fused, also write the intermediate files/cleaned and files/validations/ok|ko.",
+)
+def main(workers, force, fused, debug_outputs):
 
     # Start time tracking
     start_time = datetime.datetime.now()
@@ -87,56 +295,86 @@ def main():
     print("Starting cleaner...")
 
     # Aseguramos que el directorio raíz de salida exista
-    OUTPUT_DIRECTORY.mkdir(parents=True, exist_ok=True)
-    print(f"INFO {OUTPUT_DIRECTORY} CREATED!!")
-
-    cleaned = 0
+    output_directory = LYRICS_DIRECTORY if fused else OUTPUT_DIRECTORY
+    output_directory.mkdir(parents=True, exist_ok=True)
+    print(f"INFO {output_directory} CREATED!!")
 
-    # list_files_recursive ahora devuelve objetos Path. Usamos un bucle para iterar.
+    # Tarea 3: Ignoramos los archivos que no sean .txt (archivos de catálogo)
+    file_paths = []
+    skipped = 0
     for file_path in list_files_recursive(INPUT_DIRECTORY):
-        
-        # Tarea 3: Ignoramos los archivos que no sean .txt (archivos de catálogo)
-        # Usamos name para obtener el nombre completo del archivo
         if file_path.name == INPUT_DIRECTORY.name or not str(file_path).endswith(".txt"):
-            log.info(f"Skipping non-lyric file (catalog/auxiliary): {file_path}")
+            skipped += 1
             continue
-
-        log.info(f"Processing files... -> {file_path}")
-        text = str()
-        
-        try:
-            with open(file_path, "r") as file:
-                text = file.read()
-        except Exception as e:
-            log.error(f"Error reading file {file_path}: {e}")
+        # Sin esto, cada ejecución volvía a limpiar sus propias salidas (files/cleaned/cleaned/...)
+        if any(directory in file_path.parents for directory in DERIVED_DIRECTORIES):
             continue
+        file_paths.append(file_path)
+    log.info(f"Skipping {skipped} non-lyric files (catalog/auxiliary)")
 
-        if text.count("\n") < MIN_LINES:
-            log.info("Empty or too small tab. Skipping.............................")
-            continue
+    # Solo se limpian los ficheros nuevos o modificados desde la última ejecución
+    if fused:
+        # El modo fusionado tiene su propio manifiesto: sus salidas dependen de las tres etapas
+        version = rules_version(
+            RULES_VERSION,
+            classify_song,
+            score_song,
+            TAB_LINE,
+            CHORD_LINE,
+            remove_chords,
+            only_chords,
+            is_chord_sequence,
+            sorted(CHORD_VOCABULARY),
+            debug_outputs,
+        )
+        manifest = StageManifest("fused", version)
+    else:
+        manifest = StageManifest("cleaner", RULES_VERSION)
+    if force:
+        manifest.reset()
+    content_hashes = {}
+    pending_paths = []
+    for file_path in file_paths:
+        key = str(file_path.relative_to(INPUT_DIRECTORY))
+        unchanged, content_hashes[key] = manifest.check(key, file_path)
+        if not unchanged:
+            pending_paths.append(file_path)
+    manifest.remove_orphans(set(content_hashes))
+    log.info(
+        f"Cleaning {len(pending_paths)} new or changed files ({len(file_paths) - len(pending_paths)} unchanged) "
+        f"with {workers} worker(s)"
+    )
 
-        formatted_text = apply_format_rules(text)
+    statuses = Counter()
+    progress = ProgressReporter(len(pending_paths))
+    engine_stats = CleaningEngine()
+    for records, snapshot in run_batches(pending_paths, workers, fused=fused, debug_outputs=debug_outputs):
+        engine_stats.merge(snapshot)
+        for relative_path, status, detail, outputs in records:
+            statuses[status] += 1
+            if status == "error":
+                log.error(f"{relative_path}: {detail}")
+                continue
+            info = {"verdict": status, **detail} if status in ("ok", "ko") else None
+            manifest.record(
+                relative_path, INPUT_DIRECTORY / relative_path, outputs, content_hashes[relative_path], info
+            )
+        progress.update(len(records))
+    manifest.save()
 
-        # Tarea 4: SOLUCIÓN ROBUSTA DE RUTAS CON PATHLIB
-        
-        # 1. Obtenemos la ruta relativa del archivo dentro de INPUT_DIRECTORY.
-        #    Ejemplo: 'files/songs/abel_pintos/3.txt' -> 'songs/abel_pintos/3.txt'
-        relative_path = file_path.relative_to(INPUT_DIRECTORY)
-        
-        # 2. Construimos la ruta de salida completa.
-        #    Ejemplo: 'files/cleaned' / 'songs/abel_pintos/3.txt'
-        output_path = OUTPUT_DIRECTORY / relative_path
-
-        # 3. Creamos los directorios padres (recursivamente) de la ruta de salida.
-        #    output_path.parent es el directorio donde debe estar el archivo.
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        # Esto asegura que se creen todos los subdirectorios intermedios si no existen.
-        
-        cleaned += 1
-        # 4. Escribimos al path correcto.
-        with open(output_path, "w") as file: 
-            file.write(formatted_text)
-            print(f"{cleaned} -- {output_path.name} CREATED!!")
+    if fused:
+        summary = save_validation_summary(manifest)
+        log.info(
+            f"Fused run: {statuses['ok']} OK and {statuses['ko']} KO processed, "
+            f"{statuses['too_small']} empty or too small tabs skipped, {statuses['error']} errors "
+            f"(all files: OK={summary['ok']}, KO={summary['ko']})"
+        )
+    else:
+        log.info(
+            f"Cleaned {statuses['cleaned']} files, {statuses['too_small']} empty or too small tabs skipped, "
+            f"{statuses['error']} errors"
+        )
+    engine_stats.log_stats()
 
     end_time = datetime.datetime.now()
     log.info(f"Cleaner ended at {end_time}")
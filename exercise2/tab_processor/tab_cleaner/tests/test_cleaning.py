@@ -0,0 +1,41 @@
+""" Tests of the CleaningEngine against the previous apply_format_rules (tab_cleaner/benchmark.py):
+identical output on the built-in fixture corpus, which reaches every rule of MAPPING that can apply.
+
+    python -m pytest tab_cleaner/tests
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+# Los módulos del cleaner se importan como en tab_cleaner/main.py (utils.*). scrapper/tests también
+# importa un paquete utils: se olvida para que, en la misma ejecución de pytest, se cargue este
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+for module in [name for name in sys.modules if name == "utils" or name.startswith("utils.")]:
+    del sys.modules[module]
+from benchmark import FIXTURE_CORPUS, UNREACHABLE_RULES, legacy_apply_format_rules
+from utils.cleaning import EMAIL_RULE, CleaningEngine
+from utils.string_mapping import MAPPING
+
+
+class CleaningEngineTest(unittest.TestCase):
+    def test_same_output_as_legacy_rules(self):
+        engine = CleaningEngine()
+
+        for text in FIXTURE_CORPUS:
+            with self.subTest(text=text):
+                self.assertEqual(engine.clean(text), legacy_apply_format_rules(text))
+
+    def test_fixture_corpus_reaches_every_rule(self):
+        engine = CleaningEngine()
+
+        for text in FIXTURE_CORPUS:
+            engine.clean(text)
+
+        never_changed = {name for name, stats in engine.stats.items() if not stats.hits}
+        self.assertEqual(never_changed, UNREACHABLE_RULES)
+        self.assertEqual(set(engine.stats), {EMAIL_RULE, *MAPPING})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+""" Cleaning engine for song tabs.
+The rule set (email sentences + MAPPING) is compiled once. The rules are order dependent (each one
+sees the output of the previous one), so they are still applied in sequence, but a single fused
+scan finds which rule literals (MAPPING_GUARDS) are present and only those rules are run. The scan
+is repeated only after a rule changes the text, so the output is identical to applying every rule. """
+
+import re
+import time
+import logging as log
+from dataclasses import dataclass
+
+from utils.string_mapping import MAPPING, MAPPING_GUARDS
+
+# --- Constants ---
+EMAIL_PATTERN = r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b"
+EMAIL_SENTENCE_PATTERN = r"[\n^.!?]*" + EMAIL_PATTERN + r"[^.!?]*[.!?\n]"
+EMAIL_RULE = "email sentences"
+MAPPING_FLAGS = re.DOTALL | re.IGNORECASE
+
+
+@dataclass
+class RuleStats:
+    """Counters of a cleaning rule.
+
+    Attributes:
+        applied (int): Texts where the rule was run.
+        skipped (int): Texts where its literal wasn't present, so it wasn't run.
+        hits (int): Texts changed by the rule.
+        replacements (int): Total replacements made.
+        seconds (float): Time spent running the rule.
+    """
+
+    applied: int = 0
+    skipped: int = 0
+    hits: int = 0
+    replacements: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class CleaningRule:
+    name: str
+    regex: re.Pattern
+    replacement: str
+    guard: str | None  # Literal en minúsculas, o None si la regla se aplica siempre
+
+
+class CleaningEngine:
+    """Applies the cleaning rules of tab_cleaner with precompiled patterns and guarded passes.
+
+    Args:
+        mapping (dict): Regex pattern -> replacement, applied in order with DOTALL | IGNORECASE.
+        guards (dict): Regex pattern -> literal every match of the pattern contains.
+    """
+
+    def __init__(self, mapping: dict = MAPPING, guards: dict = MAPPING_GUARDS):
+        self.rules = [CleaningRule(EMAIL_RULE, re.compile(EMAIL_SENTENCE_PATTERN), "", "@")]
+        for pattern, replacement in mapping.items():
+            guard = guards.get(pattern)
+            self.rules.append(
+                CleaningRule(pattern, re.compile(pattern, MAPPING_FLAGS), replacement, guard.lower() if guard else None)
+            )
+
+        # Un único patrón con todos los literales: una sola pasada indica qué reglas pueden aplicarse.
+        # Los literales más largos van primero para que uno contenido en otro no lo oculte.
+        self._literals = sorted({rule.guard for rule in self.rules if rule.guard}, key=len, reverse=True)
+        self._guard_regex = re.compile(
+            "|".join(f"(?P<g{i}>{re.escape(literal)})" for i, literal in enumerate(self._literals)), re.IGNORECASE
+        )
+        # Literales contenidos en otros: si aparece el largo, aparece también el corto
+        self._implied = {
+            literal: {other for other in self._literals if other != literal and other in literal}
+            for literal in self._literals
+        }
+        # Si el final de un literal puede ser el principio de otro, una coincidencia podría ocultar
+        # a la siguiente: en ese caso se busca cada literal por separado
+        self._literal_regexes = None
+        if self._overlapping(self._literals):
+            self._literal_regexes = {
+                literal: re.compile(re.escape(literal), re.IGNORECASE) for literal in self._literals
+            }
+
+        self.stats = {rule.name: RuleStats() for rule in self.rules}
+        self.guard_seconds = 0.0
+        self.texts = 0
+
+    @staticmethod
+    def _overlapping(literals: list[str]) -> bool:
+        for first in literals:
+            for second in literals:
+                if first == second or second in first:
+                    continue
+                if any(first.endswith(second[:size]) for size in range(1, min(len(first), len(second)))):
+                    return True
+        return False
+
+    def _present_literals(self, text: str) -> set[str]:
+        start = time.perf_counter()
+        present = set()
+        if self._literal_regexes is not None:
+            present = {literal for literal, regex in self._literal_regexes.items() if regex.search(text)}
+        else:
+            for match in self._guard_regex.finditer(text):
+                literal = self._literals[int(match.lastgroup[1:])]
+                if literal not in present:
+                    present.add(literal)
+                    present.update(self._implied[literal])
+                    if len(present) == len(self._literals):
+                        break
+        self.guard_seconds += time.perf_counter() - start
+        return present
+
+    def clean(self, text: str) -> str:
+        """Applies every rule, in order, and returns the cleaned text."""
+        self.texts += 1
+        present = self._present_literals(text)
+        for rule in self.rules:
+            stats = self.stats[rule.name]
+            if rule.guard is not None and rule.guard not in present:
+                stats.skipped += 1
+                continue
+
+            start = time.perf_counter()
+            text, replacements = rule.regex.subn(rule.replacement, text)
+            stats.seconds += time.perf_counter() - start
+            stats.applied += 1
+            if replacements:
+                stats.hits += 1
+                stats.replacements += replacements
+                # El texto ha cambiado: se recalcula qué literales siguen (o pasan a estar) presentes
+                present = self._present_literals(text)
+        return text
+
+    def snapshot(self) -> tuple[dict, float, int]:
+        """Returns the counters as (stats per rule, literal scan seconds, texts), e.g. to send them
+        from a worker process to the parent.
+        """
+        return self.stats, self.guard_seconds, self.texts
+
+    def merge(self, snapshot: tuple[dict, float, int]):
+        """Adds the counters of another engine (see snapshot)."""
+        stats, guard_seconds, texts = snapshot
+        for name, other in stats.items():
+            own = self.stats.setdefault(name, RuleStats())
+            own.applied += other.applied
+            own.skipped += other.skipped
+            own.hits += other.hits
+            own.replacements += other.replacements
+            own.seconds += other.seconds
+        self.guard_seconds += guard_seconds
+        self.texts += texts
+
+    def reset_stats(self):
+        self.stats = {rule.name: RuleStats() for rule in self.rules}
+        self.guard_seconds = 0.0
+        self.texts = 0
+
+    def log_stats(self):
+        """Logs the per-rule counters and timings."""
+        log.info(f"Cleaning rules over {self.texts} texts (literal scans: {self.guard_seconds:.3f}s):")
+        for name, stats in self.stats.items():
+            log.info(
+                f"  {name!r}: applied={stats.applied}, skipped={stats.skipped}, hits={stats.hits}, "
+                f"replacements={stats.replacements}, time={stats.seconds:.3f}s"
+            )
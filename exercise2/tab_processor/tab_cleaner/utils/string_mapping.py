@@ -26,3 +26,23 @@ MAPPING = {
     r"\n.*CEJILLA[^\n]": "",
     r"estrofa": "",
 }
+
+# Literal que contiene cualquier coincidencia de cada regla (sin distinguir mayúsculas).
+# Si no aparece en el texto, la regla no puede aplicarse y el motor de limpieza se la salta.
+# Las reglas sin literal (p. ej. las de líneas de guiones) se aplican siempre.
+MAPPING_GUARDS = {
+    r"^intro[^ ]*": "intro",
+    r"^\[intro\][^ ]*": "[intro]",
+    r"^.*intro[\:\n]": "intro",
+    r"^.*introducci[oó]n[\:\n]": "intro",
+    r"^nota:.*\n": "nota",
+    r"^www\..*\n": "www.",
+    r"^[ \n]hola*\n": "hol",
+    r"saludos.*$": "saludos",
+    r"nota.*$": "nota",
+    r"letra.*": "letra",
+    r"[\*]*.*[\*]": "*",
+    r"\n[ ]*[0-9]\)": ")",
+    r"\n.*CEJILLA[^\n]": "cejilla",
+    r"estrofa": "estrofa",
+}
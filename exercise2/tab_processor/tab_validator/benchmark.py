@@ -0,0 +1,168 @@
+import random
+import re
+import sys
+import tempfile
+import time
+import click
+from collections import Counter
+from pathlib import Path
+
+# Módulos compartidos entre etapas (tab_processor/shared)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from shared.validation import LINE_REGEX, classify_song, score_song
+from shared.verdict_index import write_verdict_index
+
+# -- Configuration ---
+CORPUS_DIRECTORY = "./files/cleaned/"
+
+CHORDS = ["C", "G", "Am", "F", "D7", "Em", "Bm7", "F#m", "Gsus4", "C/G", "Dmaj7", "A"]
+WORDS = ["la", "luna", "sale", "por", "el", "mar", "y", "tu", "voz", "me", "lleva", "corazón", "noche", "sin", "ti"]
+
+
+def legacy_validate_song_format(song):
+    """Previous implementation (two unanchored searches), kept as the baseline."""
+    chord_pattern = r"[A-G][#b]?(m|maj|min|sus|add|aug|dim)?[0-9]?"
+    has_chords = re.search(chord_pattern, song)
+    has_lyrics = re.search(r"[a-z]+", song)
+    return bool(has_chords and has_lyrics)
+
+
+def split_lines(song):
+    """Only splits the tab into lines: the least any per-line scorer has to do (reported as a floor)."""
+    return song.split("\n")
+
+
+def reference_line_counts(song):
+    """Line counts straight from LINE_REGEX, one match per line (the previous score_song), to check
+    that score_song classifies every line the same way."""
+    counts = Counter(match.lastgroup for match in LINE_REGEX.finditer(song))
+    return {
+        "lines": counts["tab"] + counts["chords"] + counts["lyrics"] + counts["other"],
+        "chord_lines": counts["chords"],
+        "lyric_lines": counts["lyrics"],
+        "tab_lines": counts["tab"],
+    }
+
+
+def synthetic_song(rng: random.Random) -> str:
+    """Builds a tab: verses of chord + lyric lines, sometimes a tab staff or only lyrics."""
+    kind = rng.random()
+    lines = []
+    for _ in range(rng.randint(8, 30)):
+        if kind < 0.1:
+            lines.append(" ".join(rng.choices(WORDS, k=rng.randint(3, 8))).capitalize())
+        elif kind < 0.2:
+            lines.append("e|" + "".join(rng.choice("--0235h") for _ in range(30)) + "|")
+        else:
+            lines.append("   ".join(rng.choices(CHORDS, k=rng.randint(2, 4))))
+            lines.append(" ".join(rng.choices(WORDS, k=rng.randint(3, 8))).capitalize())
+        if rng.random() < 0.2:
+            lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+def time_validator(validator, texts: list[str], repeat: int) -> tuple[float, list]:
+    """Returns (best total seconds over `repeat` runs, results of the last run)."""
+    best = float("inf")
+    results = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [validator(text) for text in texts]
+        best = min(best, time.perf_counter() - start)
+    return best, results
+
+
+def time_on_disk(texts: list[str], mode: str) -> tuple[float, float]:
+    """Times a whole validation run over files on disk (read, check, write) with the previous check
+    and with the scorer, both writing the same outputs: copies to ok/ko ("copy") or only the verdict
+    index ("index").
+    Returns:
+        tuple: (legacy seconds, scorer seconds).
+    """
+
+    def classify_legacy(text):
+        return legacy_validate_song_format(text), "", {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        root = Path(directory)
+        paths = []
+        for number, text in enumerate(texts):
+            path = root / "cleaned" / f"{number % 100}" / f"{number}.txt"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(text)
+            paths.append(path)
+
+        times = []
+        for name, classify in (("legacy", classify_legacy), ("scorer", classify_song)):
+            output_root = root / name
+            start = time.perf_counter()
+            records = []
+            for path in paths:
+                text = path.read_text()
+                validated, reason, scores = classify(text)
+                verdict = "ok" if validated else "ko"
+                if mode == "copy":
+                    output_path = output_root / verdict / path.relative_to(root)
+                    output_path.parent.mkdir(parents=True, exist_ok=True)
+                    output_path.write_text(text)
+                records.append({"path": str(path), "verdict": verdict, "reason": reason, "scores": scores})
+            output_root.mkdir(exist_ok=True)
+            write_verdict_index(records, output_root / "index.jsonl")
+            times.append(time.perf_counter() - start)
+    return times[0], times[1]
+
+
+@click.command()
+@click.option("--corpus", "-c", default=CORPUS_DIRECTORY, help="Directory with cleaned .txt tabs.")
+@click.option("--songs", default=20000, help="Songs of the synthetic corpus (used if the corpus is empty).")
+@click.option("--repeat", "-r", default=3, help="Runs per implementation (the best one is reported).")
+@click.option(
+    "--disk", is_flag=True, default=False, help="Also time whole runs over files (both in copy and in index mode)."
+)
+def main(corpus, songs, repeat, disk):
+    """Benchmarks the previous validate_song_format against the single-pass scorer (files/s, MB/s)
+    and compares their verdicts."""
+    texts = []
+    for path in sorted(Path(corpus).rglob("*.txt")):
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            texts.append(f.read())
+    source = corpus
+    if not texts:
+        rng = random.Random(0)
+        texts = [synthetic_song(rng) for _ in range(songs)]
+        source = "synthetic"
+
+    megabytes = sum(len(text) for text in texts) / (1024 * 1024)
+    print(f"Corpus: {source} - {len(texts)} files, {megabytes:.1f} MB")
+    print("-" * 72)
+
+    legacy_time, legacy_results = time_validator(legacy_validate_song_format, texts, repeat)
+    scorer_time, scorer_results = time_validator(classify_song, texts, repeat)
+    split_time, _ = time_validator(split_lines, texts, repeat)
+    for name, elapsed in (("legacy", legacy_time), ("scorer", scorer_time), ("split", split_time)):
+        files_per_second = len(texts) / elapsed if elapsed else float("inf")
+        print(f"{name:<8} {elapsed:8.3f}s | {files_per_second:10.1f} files/s | {megabytes / elapsed:8.1f} MB/s")
+    print("-" * 72)
+
+    verdicts = Counter(
+        (legacy, validated) for legacy, (validated, _, _) in zip(legacy_results, scorer_results)
+    )
+    print(f"Legacy OK: {sum(legacy_results)} | Scorer OK: {sum(v for v, _, _ in scorer_results)}")
+    print(f"OK -> KO: {verdicts[(True, False)]} | KO -> OK: {verdicts[(False, True)]}")
+    print("Scorer reasons:", dict(Counter(reason for _, reason, _ in scorer_results).most_common()))
+    line_counts = ("lines", "chord_lines", "lyric_lines", "tab_lines")
+    different = sum(
+        reference_line_counts(text) != {key: score_song(text)[key] for key in line_counts} for text in texts
+    )
+    print(f"Line counts different from LINE_REGEX: {different}")
+
+    if disk:
+        print("-" * 72)
+        for mode in ("copy", "index"):
+            legacy_time, scorer_time = time_on_disk(texts, mode)
+            for name, elapsed in (("legacy", legacy_time), ("scorer", scorer_time)):
+                print(f"On disk ({mode:<5}) {name:<8} {elapsed:8.3f}s | {len(texts) / elapsed:10.1f} files/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,18 @@
 # Importamos las bibliotecas necesarias
 import os
+import sys
 import click
-import re
 import logging as log
 import datetime
 import shutil
 from pathlib import Path # Importamos Path para manejo de rutas
 
+# Módulos compartidos entre etapas (tab_processor/shared)
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from shared.stage_manifest import StageManifest, rules_version
+from shared.validation import classify_song, score_song, TAB_LINE, CHORD_LINE, ScoreThresholds, DEFAULT_THRESHOLDS
+from shared.verdict_index import save_verdicts
+
 # Definimos los directorios como objetos Path
 INPUT_DIRECTORY = Path("./files/")
 CLEANED_DIRECTORY = INPUT_DIRECTORY / "cleaned"
@@ -16,6 +22,11 @@ ROOT = "https://acordes.lacuerda.net"
 URL_ARTIST_INDEX = "https://acordes.lacuerda.net/tabs/"
 SONG_VERSION = 0
 INDEX = "abcdefghijklmnopqrstuvwxyz#"
+# Si cambia la validación, el manifiesto se invalida y se vuelve a validar todo
+RULES_VERSION = rules_version(classify_song, score_song, TAB_LINE, CHORD_LINE)
+# copy: copia cada fichero a ok/ko; link: hardlink (copia si el sistema de ficheros no lo permite);
+# index: solo el índice de veredictos (files/validations/index.jsonl)
+OUTPUT_MODES = ("copy", "link", "index")
 
 
 # dir_list = list()
@@ -24,26 +35,6 @@ INDEX = "abcdefghijklmnopqrstuvwxyz#"
 # file_name = str()
 
 
-def validate_song_format(song):
-    """Valida si la canción contiene la mezcla esperada de acordes y letras (Calidad de Contenido)"""
-
-    # Busca un acorde simple.
-    chord_pattern = r"[A-G][#b]?(m|maj|min|sus|add|aug|dim)?[0-9]?"
-    
-    # Comprobar si hay al menos un acorde en el archivo.
-    has_chords = re.search(chord_pattern, song)
-
-    # Comprobar si hay letras (al menos una palabra de minúsculas).
-    has_lyrics = re.search(r"[a-z]+", song) 
-
-    # La validación pasa si hay acordes Y letras.
-    if has_chords and has_lyrics:
-        return True
-    else:
-        log.debug("Validation KO: Missing chords or lyrics content.")
-        return False
-
-
 def list_files_recursive(path: str = "."):
     """Lists all files in a directory recursively, returning Path objects."""
     found_files = []
@@ -62,6 +53,85 @@ def list_files_recursive(path: str = "."):
     return found_files
 
 
+def manifest_version(mode: str = "copy", thresholds: ScoreThresholds = DEFAULT_THRESHOLDS) -> str:
+    """Version of the validator manifest: the rules, the thresholds and the output mode (changing
+    any of them validates every tab again)."""
+    return rules_version(RULES_VERSION, mode, thresholds)
+
+
+def write_validated_file(file_path: Path, output_path: Path, text: str, mode: str):
+    """Writes the copy of a validated tab in validations/ok or validations/ko."""
+    # Creamos los directorios padres de forma recursiva (output_path.parent)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    if mode == "link":
+        if output_path.exists():
+            output_path.unlink()
+        try:
+            os.link(file_path, output_path)
+            return
+        except OSError as e:
+            log.debug(f"Hardlink not possible for {output_path} ({e}), copying it")
+
+    # Escribimos el contenido al nuevo path
+    with open(output_path, "w") as file:
+        file.write(text)
+
+
+def validate_file(
+    file_path: Path,
+    manifest: StageManifest,
+    content_hash: str = None,
+    mode: str = "copy",
+    thresholds: ScoreThresholds = DEFAULT_THRESHOLDS,
+) -> tuple[bool, Path] | None:
+    """Validates a cleaned tab and records its verdict (reason and scores) in the manifest.
+    Except in index mode, the tab is also copied (or linked) to validations/ok or validations/ko.
+    Args:
+        file_path (Path): Cleaned tab (files/cleaned/...).
+        manifest (StageManifest): Manifest of the validator.
+        content_hash (str, optional): Hash of the file, if already computed by manifest.check.
+        mode (str, optional): One of OUTPUT_MODES. Defaults to "copy".
+        thresholds (ScoreThresholds, optional): Scores a valid tab must reach.
+    Returns:
+        tuple | None: (True if valid, path of the validated tab: its copy, or the cleaned file itself
+            in index mode), or None if the file couldn't be read or written.
+    """
+    text = str()
+    try:
+        with open(file_path, "r") as file:
+            text = file.read()
+    except Exception as e:
+        log.error(f"Error reading file {file_path}: {e}")
+        return None
+
+    # Formatting of the text goes in that function call
+    validated, reason, scores = classify_song(text, thresholds)
+
+    # Obtenemos la ruta relativa: 'cleaned/songs/artist/song.txt' -> 'songs/artist/song.txt'
+    relative_path = file_path.relative_to(CLEANED_DIRECTORY)
+    info = {"verdict": "ok" if validated else "ko", "reason": reason, "scores": scores}
+
+    if mode == "index":
+        manifest.record(str(relative_path), file_path, [], content_hash, info)
+        return validated, file_path
+
+    # Elegimos el directorio de salida base
+    output_base_dir = OUTPUT_DIRECTORY_OK if validated else OUTPUT_DIRECTORY_KO
+    
+    # Construimos la ruta final: 'validations/ok' / 'songs/artist/song.txt'
+    output_path = output_base_dir / relative_path
+
+    try:
+        write_validated_file(file_path, output_path, text, mode)
+    except Exception as e:
+        log.error(f"Error writing validated file to {output_path}: {e}")
+        return None
+
+    # Si el veredicto cambió, el manifiesto elimina la copia anterior (ok <-> ko)
+    manifest.record(str(relative_path), file_path, [output_path], content_hash, info)
+    return validated, output_path
+
+
 @click.command()
 @click.option(
     "--init",
@@ -69,10 +139,30 @@ def list_files_recursive(path: str = "."):
     is_flag=True,
     default=False,
     help=(
-        "If flag is present, drops all files and validates from the clean directory. "
+        "If flag is present, drops all files and validates everything from the clean directory "
+        "(otherwise only new or changed files are validated). "
     ),
 )
-def main(init):
+@click.option(
+    "--mode",
+    "-m",
+    type=click.Choice(OUTPUT_MODES),
+    default="copy",
+    show_default=True,
+    help=(
+        "copy: copy every tab to validations/ok|ko. link: hardlink it instead (copied if not possible). "
+        "index: only write the verdict index validations/index.jsonl."
+    ),
+)
+@click.option(
+    "--thresholds",
+    "-t",
+    "thresholds_file",
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help="JSON file with the score thresholds (e.g. {\"min_chord_ratio\": 0.1}); missing keys keep their default.",
+)
+def main(init, mode, thresholds_file):
     # Start time tracking
     start_time = datetime.datetime.now()
     log.info(f"Validator started at {start_time}")
@@ -85,53 +175,44 @@ def main(init):
             shutil.rmtree(OUTPUT_DIRECTORY_KO)
         log.info("Validation directories removed")
 
+    # Solo se validan los ficheros limpios nuevos o modificados desde la última ejecución
+    thresholds = ScoreThresholds.from_file(thresholds_file) if thresholds_file else DEFAULT_THRESHOLDS
+    log.info(f"Score thresholds: {thresholds.to_dict()}")
+    manifest = StageManifest("validator", manifest_version(mode, thresholds))
+    if init:
+        manifest.reset()
+
     OK = 0
     KO = 0
 
     # Obtenemos la lista de archivos limpios
-    files_to_validate = list_files_recursive(CLEANED_DIRECTORY)
+    files_to_validate = list_files_recursive(CLEANED_DIRECTORY) if CLEANED_DIRECTORY.exists() else []
+    manifest.remove_orphans({str(file_path.relative_to(CLEANED_DIRECTORY)) for file_path in files_to_validate})
 
     for file_path in files_to_validate:
 
-        text = str()
-        try:
-            with open(file_path, "r") as file:
-                text = file.read()
-        except Exception as e:
-            log.error(f"Error reading file {file_path}: {e}")
+        key = str(file_path.relative_to(CLEANED_DIRECTORY))
+        unchanged, content_hash = manifest.check(key, file_path)
+        if unchanged:
             continue
 
-        # Formatting of the text goes in that function call
-        validated = validate_song_format(text)
-
-        # Obtenemos la ruta relativa: 'cleaned/songs/artist/song.txt' -> 'songs/artist/song.txt'
-        relative_path = file_path.relative_to(CLEANED_DIRECTORY)
-
-        # Elegimos el directorio de salida base
-        output_base_dir = OUTPUT_DIRECTORY_OK if validated else OUTPUT_DIRECTORY_KO
-        
-        # Construimos la ruta final: 'validations/ok' / 'songs/artist/song.txt'
-        output_path = output_base_dir / relative_path
-
-        # Creamos los directorios padres de forma recursiva (output_path.parent)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+        result = validate_file(file_path, manifest, content_hash, mode, thresholds)
+        if result is None:
+            continue
 
+        validated, output_path = result
         if validated:
             OK += 1
         else:
             KO += 1
-
-        try:
-            # Escribimos el contenido al nuevo path
-            with open(output_path, "w") as file:
-                file.write(text)    
-                print(f"File {output_path.name} -> {'OK' if validated else 'KO'}. OKs: {OK}, KOs: {KO}")
-
-        except Exception as e:
-            log.error(f"Error writing validated file to {output_path}: {e}")
-            continue
-
-    log.info(f"OKs = {OK}, -- KOs = {KO}, --")
+        if mode != "index":
+            print(f"File {output_path.name} -> {'OK' if validated else 'KO'}. OKs: {OK}, KOs: {KO}")
+
+    manifest.save()
+    # El índice y su resumen se reescriben enteros desde el manifiesto (veredictos de todos los ficheros)
+    save_verdicts(manifest.entries)
+    log.info(f"OKs = {OK}, -- KOs = {KO}, -- ({manifest.unchanged} unchanged)")
+    print(f"Validated {OK + KO} new or changed files: OKs: {OK}, KOs: {KO} ({manifest.unchanged} unchanged)")
     end_time = datetime.datetime.now()
     log.info(f"Validator ended at {end_time}")
     duration = end_time - start_time
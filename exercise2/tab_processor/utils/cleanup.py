@@ -17,11 +17,14 @@ DIRECTORIES_TO_CLEAN = [
     Path("./files/validations"),
     Path("./files/lyrics_only"),
     Path("./files/insights"),
+    Path("./files/manifests"),
 ]
 
 # Archivos de metadatos que deben ser eliminados para forzar el re-scrape
 FILES_TO_DELETE = [
     Path("./files/catalog.json"),
+    Path("./files/catalog.db"),
+    Path("./files/pipeline_state.json"),
 ]
 
 def cleanup_pipeline_outputs():